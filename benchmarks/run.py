@@ -0,0 +1,326 @@
+"""
+Benchmark the data, analysis, training-preparation and serving hot paths on synthetic data.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run --sizes 10k,1m --output benchmarks/results/latest.json
+    python -m benchmarks.run --sizes 10k --save-baseline
+
+Results are written as JSON and compared against benchmarks/baseline.json; the
+exit status is 1 if any case is slower than the baseline by more than
+--tolerance. A missing baseline is only a warning locally; with --ci (the
+default when the CI environment variable is set) the first run records its
+results as the baseline, so later CI runs on the same runner compare against it.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")  # Importing scripts.analyzer loads pyplot; keep it off-screen
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import SIZES, brent_like_prices, indicator_data, write_dataset
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT / "oil-price-dashboard" / "backend"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+CASES = {}
+
+
+def case(name):
+    """Register a benchmark: a setup function that takes a BenchmarkData and returns the callable to time."""
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+class BenchmarkData:
+    """
+    Synthetic inputs for one dataset size, built lazily and shared by the cases.
+    """
+
+    def __init__(self, n_rows, workdir, seed=0):
+        self.n_rows = n_rows
+        self.workdir = Path(workdir)
+        self.seed = seed
+
+    @cached_property
+    def prices(self):
+        """The Brent-like price frame indexed by Date."""
+        return brent_like_prices(self.n_rows, self.seed)
+
+    @cached_property
+    def merged(self):
+        """Price, GDP, CPI and Exchange_Rate columns, as produced by PricePredictor.merge_data."""
+        return pd.concat([self.prices, indicator_data(self.prices.index, self.seed)], axis=1)
+
+    @cached_property
+    def data_dir(self):
+        """A directory with the input files written in CSV and the configured columnar format."""
+        from src.storage import DATA_FORMAT
+        return write_dataset(self.workdir / "data", self.n_rows, self.seed, DATA_FORMAT)
+
+    @cached_property
+    def event_date(self):
+        """A date in the middle of the series for the event window lookups."""
+        return self.prices.index[len(self.prices) // 2]
+
+
+def quiet(func, *args):
+    """Call a function with its printed output discarded."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+@case("load_data")
+def bench_load_data(data):
+    from src.data_loading import load_data
+    data_dir = str(data.data_dir)
+    return lambda: load_data("BrentOilPrices.csv", dataset_dir=data_dir)
+
+
+@case("compute_event_impacts")
+def bench_compute_event_impacts(data):
+    # analyze_events itself mostly measures its plots; this is the lookup it is built on
+    from scripts.analyzer import significant_events
+    from scripts.event_impact import compute_event_impacts
+    return lambda: compute_event_impacts(data.prices, significant_events)
+
+
+@case("get_prices_around_event")
+def bench_get_prices_around_event(data):
+    from scripts.analyzer import get_prices_around_event
+    return lambda: get_prices_around_event(data.prices, data.event_date)
+
+
+@case("statistical_analysis")
+def bench_statistical_analysis(data):
+    from scripts.analyzer import statistical_analysis
+    return lambda: quiet(statistical_analysis, data.prices)
+
+
+@case("preprocess_data")
+def bench_preprocess_data(data):
+    from scripts.analyzer import preprocess_data
+    return lambda: preprocess_data(data.prices)
+
+
+@case("create_features")
+def bench_create_features(data):
+    from scripts.AdaptingModel import PricePredictor
+    predictor = PricePredictor()
+    return lambda: predictor.create_features(data.merged)
+
+
+@case("calculate_statistics")
+def bench_calculate_statistics(data):
+    from scripts.oil_price_analysis import OilPriceAnalyzer
+    analyzer = OilPriceAnalyzer(data.prices)
+    merged = data.merged[['GDP', 'Price']]
+    return lambda: analyzer.calculate_statistics(merged.copy(), 'GDP')
+
+
+def flask_client(data):
+    """
+    Return a test client of the dashboard backend serving this size's synthetic data.
+
+    The backend reads data/ and models/ relative to the working directory, so
+    the process moves into the benchmark directory (with models/ linked to the
+    repository's) and the registries are reloaded for every dataset size.
+    """
+    os.environ.setdefault("ARTIFACT_POLL_SECONDS", "0")
+    data.data_dir  # Write the input files before the backend looks for them
+    models = data.workdir / "models"
+    if (ROOT / "models").is_dir() and not models.exists():
+        models.symlink_to(ROOT / "models", target_is_directory=True)  # Serve the repository's trained model
+    os.chdir(data.workdir)
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    backend = importlib.import_module("app")
+    for registry in (backend.data_registry, backend.feature_registry, backend.model_registry):
+        registry.reload(force=True)
+    return backend.app.test_client()
+
+
+def endpoint_case(name, url):
+    """Register a benchmark of one GET request through the Flask test client."""
+    @case(name)
+    def setup(data):
+        client = flask_client(data)
+        if client.get(url).status_code != 200:
+            return None  # e.g. no trained model in models/
+        return lambda: client.get(url).get_data()
+    return setup
+
+
+endpoint_case("api_data_records", "/api/data")
+endpoint_case("api_data_columnar", "/api/data?format=columnar")
+endpoint_case("api_data_downsampled", "/api/data?max_points=1000")
+endpoint_case("api_events", "/api/events")
+endpoint_case("api_predict_range", "/api/predict?start_date=1900-01-01")
+endpoint_case("api_forecast", "/api/forecast?horizon=180")
+
+
+def time_case(func, repeat=5, max_seconds=30.0):
+    """
+    Time a callable after one warm-up call.
+
+    Returns:
+    --------
+    list: Wall-clock seconds of each timed call (fewer than ``repeat`` once ``max_seconds`` is spent).
+    """
+    func()
+    timings = []
+    spent = 0.0
+    while len(timings) < repeat and (not timings or spent < max_seconds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+        spent += timings[-1]
+    return timings
+
+
+def run_benchmarks(sizes, cases=None, repeat=5, seed=0):
+    """
+    Run the selected cases for every dataset size.
+
+    Returns:
+    --------
+    dict: 'case[size]' -> {'median', 'min', 'mean', 'timings'} in seconds (or {'skipped': reason}).
+    """
+    results = {}
+    names = cases or list(CASES)
+    cwd = os.getcwd()
+    try:
+        for size in sizes:
+            with tempfile.TemporaryDirectory(prefix=f"brent-bench-{size}-") as workdir:
+                data = BenchmarkData(SIZES[size], workdir, seed)
+                for name in names:
+                    key = f"{name}[{size}]"
+                    try:
+                        func = CASES[name](data)
+                        if func is None:
+                            results[key] = {'skipped': 'not available'}
+                            continue
+                        timings = time_case(func, repeat)
+                    except Exception as e:
+                        logger.error(f"{key} failed: {e}")
+                        results[key] = {'skipped': f"error: {e}"}
+                        continue
+                    results[key] = {
+                        'median': statistics.median(timings),
+                        'min': min(timings),
+                        'mean': statistics.fmean(timings),
+                        'timings': timings,
+                    }
+                    logger.info(f"{key}: median {results[key]['median'] * 1000:.2f} ms over {len(timings)} runs")
+                os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def environment():
+    """Describe the machine and library versions the results were measured with."""
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compare median timings with a baseline.
+
+    Returns:
+    --------
+    pd.DataFrame: One row per case present in both, with the ratio to the baseline and a Regression flag.
+    """
+    rows = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if 'median' not in result or not reference or 'median' not in reference:
+            continue
+        ratio = result['median'] / reference['median']
+        rows.append({'Case': key, 'Baseline': reference['median'], 'Current': result['median'],
+                     'Ratio': ratio, 'Regression': ratio > 1 + tolerance})
+    return pd.DataFrame(rows, columns=['Case', 'Baseline', 'Current', 'Ratio', 'Regression'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Brent analysis benchmarks on synthetic data.")
+    parser.add_argument("--sizes", default="10k", help=f"Comma-separated dataset sizes from {sorted(SIZES)}.")
+    parser.add_argument("--cases", help=f"Comma-separated cases (default: all of {sorted(CASES)}).")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmarks/results/latest.json")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs the baseline (0.2 = 20%%).")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument("--ci", action="store_true", default=bool(os.environ.get("CI")),
+                        help="Record a missing baseline from this run (default: on when $CI is set).")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    sizes = args.sizes.split(',')
+    cases = args.cases.split(',') if args.cases else None
+    for name in cases or []:
+        if name not in CASES:
+            parser.error(f"Unknown case: {name}")
+
+    results = run_benchmarks(sizes, cases, args.repeat, args.seed)
+    report = {'environment': environment(), 'results': results}
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    logger.info(f"Wrote results to {output}.")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2))
+        logger.info(f"Saved baseline to {baseline_path}.")
+        return 0
+    if not baseline_path.exists():
+        if args.ci:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(report, indent=2))
+            logger.warning(f"No baseline at {baseline_path}; recorded this run as the baseline.")
+            return 0
+        logger.warning(f"No baseline at {baseline_path}; run with --save-baseline to create one.")
+        return 0
+
+    comparison = compare(results, json.loads(baseline_path.read_text())['results'], args.tolerance)
+    print(comparison.to_string(index=False))
+    regressions = comparison[comparison['Regression']]
+    if len(regressions):
+        logger.error(f"{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
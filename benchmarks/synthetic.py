@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from scripts.feature_store import INPUT_FILES
+from src.storage import write_frame
+
+# Benchmark dataset sizes in rows
+SIZES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+# Span of the real Brent data, which the event tables refer to
+START_DATE = '1987-05-20'
+END_DATE = '2022-11-14'
+
+
+def synthetic_dates(n_rows, start=START_DATE, end=END_DATE):
+    """
+    Dates for a synthetic series: daily from the start while they fit before the end date,
+    otherwise evenly spaced timestamps over the whole span, so every size covers the events.
+    """
+    if n_rows <= (pd.Timestamp(end) - pd.Timestamp(start)).days + 1:
+        return pd.date_range(start, periods=n_rows, freq='D', name='Date')
+    return pd.date_range(start, end, periods=n_rows, name='Date')
+
+
+def brent_like_prices(n_rows, seed=0, start=START_DATE):
+    """
+    Generate a Brent-like price series.
+
+    Log prices follow a slowly mean-reverting random walk around $60 with
+    volatility regimes (calm/normal/crisis, ~250 rows each) and rare jumps.
+
+    Parameters:
+    -----------
+    n_rows (int): Number of rows.
+    seed (int): Random seed; the same seed always gives the same series.
+    start (str): First date.
+
+    Returns:
+    --------
+    pd.DataFrame: A 'Price' column indexed by 'Date'.
+    """
+    rng = np.random.default_rng(seed)
+    regimes = rng.choice([0.01, 0.02, 0.04], size=n_rows // 250 + 1, p=[0.5, 0.35, 0.15])
+    volatility = np.repeat(regimes, 250)[:n_rows]
+    jumps = rng.standard_normal(n_rows) * 0.08 * (rng.random(n_rows) < 0.002)
+    shocks = rng.standard_normal(n_rows) * volatility + jumps
+    log_deviation = lfilter([1.0], [1.0, -0.999], shocks)
+    prices = np.maximum(60.0 * np.exp(log_deviation), 5.0).round(2)
+    return pd.DataFrame({'Price': prices}, index=synthetic_dates(n_rows, start))
+
+
+def indicator_data(dates, seed=0):
+    """
+    Generate GDP, CPI and Exchange_Rate series on the given dates.
+
+    GDP and CPI change in steps (roughly yearly and monthly) with positive
+    drift; the exchange rate is a small random walk.
+
+    Returns:
+    --------
+    pd.DataFrame: GDP, CPI and Exchange_Rate columns indexed by the dates.
+    """
+    rng = np.random.default_rng(seed + 1)
+    n_rows = len(dates)
+    gdp_steps = np.repeat(1.0 + rng.normal(0.03, 0.02, n_rows // 365 + 1), 365)[:n_rows]
+    cpi_steps = np.repeat(1.0 + rng.normal(0.002, 0.003, n_rows // 30 + 1), 30)[:n_rows]
+    gdp = 1.5e12 * np.cumprod(np.where(np.arange(n_rows) % 365 == 0, gdp_steps, 1.0))
+    cpi = 100.0 * np.cumprod(np.where(np.arange(n_rows) % 30 == 0, cpi_steps, 1.0))
+    exchange_rate = np.exp(np.cumsum(rng.normal(0.0, 0.003, n_rows)))
+    return pd.DataFrame({'GDP': gdp, 'CPI': cpi, 'Exchange_Rate': exchange_rate}, index=dates)
+
+
+def write_dataset(directory, n_rows, seed=0, fmt='csv'):
+    """
+    Write the price and indicator input files (see scripts.feature_store.INPUT_FILES) to a directory.
+
+    Parameters:
+    -----------
+    directory (str or Path): Target directory.
+    n_rows (int): Number of rows.
+    seed (int): Random seed.
+    fmt (str): 'csv', 'parquet' or 'feather' (a CSV copy is always written).
+
+    Returns:
+    --------
+    Path: The directory.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    prices = brent_like_prices(n_rows, seed)
+    columns = pd.concat([prices, indicator_data(prices.index, seed)], axis=1)
+    for column, file_name in INPUT_FILES.items():
+        # The CSV goes first so the columnar copy is the fresher one (see src.storage.read_frame)
+        for output_format in ['csv'] + ([fmt] if fmt != 'csv' else []):
+            write_frame(columns[[column]], directory / file_name, output_format)
+    return directory
@@ -1,19 +1,47 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import pandas as pd
+import io
+import os
+import sys
+import json
+import hashlib
 import joblib
-from tensorflow.keras.models import load_model
-from tensorflow.keras.metrics import MeanSquaredError
 import numpy as np
 from pathlib import Path
 import logging
+from collections import namedtuple
 from datetime import timedelta
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None  # Arrow IPC output for /api/data is disabled
+
+# Make the project's analysis scripts importable from the backend
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scripts.event_impact import DEFAULT_HORIZONS, compute_event_impacts, event_changes_wide
+from scripts.downsample import PricePyramid, align_date
+from scripts.lstm_runtime import load_lstm_runtime
+from scripts.online_regime import OnlineChangePointDetector
+from scripts.feature_store import FEATURE_COLUMNS, FEATURE_LOOKBACK, INPUT_FILES, load_features
+from scripts.forecasting import FORECAST_HORIZONS, HELD_INDICATORS, forecast_features, horizon_steps
+from src.storage import DATA_FORMAT, read_frame, resolve_path
+from src.price_store import PriceStore, data_digest
+from batching import MicroBatcher
+from registry import ArtifactRegistry
+from metrics import Metrics
+from regime_state import RegimeState
+
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
+# Per-route latency, size and stage metrics at /metrics; SERVER_TIMING=1 also adds a Server-Timing header
+metrics = Metrics()
+metrics.init_app(app, server_timing=os.environ.get("SERVER_TIMING", "0") == "1")
+
 @app.route('/')
 def home():
     return "Oil Price Analysis API is running!", 200
@@ -34,33 +62,41 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logger.info("Logging initialized.")
 
-# Load the LSTM model and scalers
-model = None
-X_scaler = None
-y_scaler = None
+# Micro-batching knobs for concurrent single-row /api/predict requests
+PREDICT_MAX_BATCH_SIZE = int(os.environ.get("PREDICT_MAX_BATCH_SIZE", 64))
+PREDICT_MAX_WAIT_MS = float(os.environ.get("PREDICT_MAX_WAIT_MS", 5))
 
-try:
-    logger.info("Loading LSTM model and scalers...")
-    model = load_model("models/lstm_model.h5", custom_objects={'mse': MeanSquaredError()})
-    X_scaler = joblib.load("models/X_scaler.pkl")
-    y_scaler = joblib.load("models/y_scaler.pkl")
-    logger.info("Model and scalers loaded successfully.")
-except Exception as e:
-    logger.error(f"Error loading model or scalers: {str(e)}")
-    logger.warning("Model or scalers not found. Predictions will not work.")
+# Seconds between checks of data/ and models/ for new artifacts (0 disables hot reload)
+ARTIFACT_POLL_SECONDS = float(os.environ.get("ARTIFACT_POLL_SECONDS", 5))
 
-# Load datasets
-oil_data = None
-data_dir = Path("data")
-try:
-    logger.info("Loading datasets...")
-    oil_data = pd.read_csv(data_dir / "BrentOilPrices.csv")
-    oil_data['Date'] = pd.to_datetime(oil_data['Date'])
-    oil_data.set_index('Date', inplace=True)
-    logger.info("Datasets loaded successfully.")
-except Exception as e:
-    logger.error(f"Error loading datasets: {str(e)}")
-    logger.warning("Dataset not found. Historical data and event analysis will not work.")
+model_dir = Path("models")
+
+# The LSTM model and its scalers, swapped as one unit on reload
+ModelBundle = namedtuple('ModelBundle', ['model', 'X_scaler', 'y_scaler'])
+
+def load_model_artifacts():
+    """
+    Load the LSTM model and scalers.
+    """
+    npz_path = model_dir / "lstm_model.npz"
+    sources = [path for path in (model_dir / "lstm_model.h5", model_dir / "X_scaler.pkl", model_dir / "y_scaler.pkl")
+               if path.exists()]
+    if npz_path.exists() and all(npz_path.stat().st_mtime >= path.stat().st_mtime for path in sources):
+        # Exported NumPy runtime (python -m scripts.lstm_runtime); avoids importing TensorFlow
+        bundle = ModelBundle(*load_lstm_runtime(npz_path))
+    else:
+        if npz_path.exists():
+            logger.warning(f"{npz_path} is older than the Keras model or scalers; loading those instead. "
+                           "Re-run python -m scripts.lstm_runtime to refresh it.")
+        from tensorflow.keras.models import load_model
+        from tensorflow.keras.metrics import MeanSquaredError
+        bundle = ModelBundle(
+            load_model(model_dir / "lstm_model.h5", custom_objects={'mse': MeanSquaredError()}),
+            joblib.load(model_dir / "X_scaler.pkl"),
+            joblib.load(model_dir / "y_scaler.pkl"),
+        )
+    logger.info("Model and scalers loaded successfully.")
+    return bundle
 
 # Define significant events
 significant_events = {
@@ -76,6 +112,115 @@ significant_events = {
     '2022-02-24': 'Russian Invasion of Ukraine',
 }
 
+data_dir = Path("data")
+DATA_CHUNK_ROWS = 10000
+
+# Event analysis results keyed by (dataset fingerprint, horizons)
+event_results_cache = {}
+EVENT_CACHE_MAX_ENTRIES = 64
+# Longest event horizon /api/events will compute, in days
+MAX_EVENT_HORIZON_DAYS = int(os.environ.get("MAX_EVENT_HORIZON_DAYS", 3650))
+
+def dataset_fingerprint(digest, events):
+    """
+    Combine the price data digest with a hash of the event table.
+    """
+    fingerprint = hashlib.sha256(digest.encode("ascii"))
+    fingerprint.update(json.dumps(events, sort_keys=True).encode("utf-8"))
+    return fingerprint.hexdigest()
+
+def store_is_fresh(source_path, store_path):
+    """
+    Check whether the price store is at least as new as every version of the source file.
+    """
+    sources = [path for path in (source_path, resolve_path(source_path, DATA_FORMAT)) if path.exists()]
+    return store_path.exists() and all(store_path.stat().st_mtime >= path.stat().st_mtime for path in sources)
+
+class PriceData:
+    """
+    The loaded Brent price dataset and the structures derived from it.
+
+    Opened from the price store, the dates, prices and chart pyramid are
+    read-only memory maps shared by every worker process.
+    """
+
+    def __init__(self, dates, prices, pyramid, digest):
+        # Sorted column arrays used by the /api/data fast path
+        self.dates = dates
+        self.prices = prices
+        self.daily = dates.dtype == np.dtype('datetime64[D]') or bool(
+            (dates.astype('datetime64[ns]').view('int64') % 86_400_000_000_000 == 0).all())
+        self.pyramid = pyramid  # Multi-resolution aggregates for charts
+        self.fingerprint = dataset_fingerprint(digest, significant_events)
+        self.regime_baseline = None  # Detector warmed up on the history, set by load_price_data
+
+    @classmethod
+    def from_store(cls, store_path):
+        """
+        Map the price store and its pyramid sidecar, building the sidecar if it is missing or stale.
+        """
+        store = PriceStore(store_path)
+        pyramid_path = store_path.with_suffix(".pyramid")
+        try:
+            pyramid = PricePyramid.load(pyramid_path, store.digest)
+        except (OSError, ValueError):
+            logger.info(f"Building price pyramid {pyramid_path}.")
+            pyramid = PricePyramid.build(store.dates, store.prices)
+            try:
+                pyramid = PricePyramid.load(pyramid.save(pyramid_path, store.digest))
+            except OSError as e:
+                logger.warning(f"Could not write {pyramid_path}; keeping the pyramid in memory: {e}")
+        return cls(store.dates, store.prices, pyramid, store.digest)
+
+    @classmethod
+    def from_source(cls, source_path):
+        """
+        Read the price data file into memory.
+        """
+        frame = read_frame(source_path).sort_index()
+        dates = frame.index.values.astype('datetime64[ns]')
+        if (dates.view('int64') % 86_400_000_000_000 == 0).all():
+            dates = dates.astype('datetime64[D]')  # Daily data is stored and hashed as days, as in the store
+        prices = frame['Price'].to_numpy(dtype='float64')
+        return cls(dates, prices, PricePyramid.build(dates, prices), data_digest(dates, prices))
+
+# Live ticks kept for replay after the dataset is reloaded
+MAX_LIVE_TICKS = 10000
+# An online regime detector state warmed up on a dataset's history, and its prior variance
+RegimeBaseline = namedtuple('RegimeBaseline', ['prior_var', 'state'])
+
+def warm_up_regime_detector(prices):
+    """
+    Warm up a new online regime detector on the price history.
+    """
+    prices = prices[~np.isnan(prices)]
+    prior_var = float(np.var(np.diff(prices))) if len(prices) > 2 else 1.0
+    prior_var = prior_var or 1.0
+    logger.info(f"Warming up regime detector on {len(prices)} prices.")
+    detector = OnlineChangePointDetector(prior_var=prior_var)
+    detector.update_many(prices)
+    return RegimeBaseline(prior_var, detector.get_state())
+
+def load_price_data():
+    """
+    Load the Brent price dataset, warm its event analysis cache and warm up its regime detector.
+    """
+    logger.info("Loading datasets...")
+    source_path, store_path = data_dir / "BrentOilPrices.csv", data_dir / "BrentOilPrices.bin"
+    price_data = None
+    if store_is_fresh(source_path, store_path):
+        try:
+            logger.info(f"Opening memory-mapped price store {store_path}.")
+            price_data = PriceData.from_store(store_path)
+        except ValueError as e:
+            logger.warning(f"{e}; reading {source_path} instead. Re-run python -m src.price_store to rebuild it.")
+    if price_data is None:
+        price_data = PriceData.from_source(source_path)
+    get_event_results(price_data)  # Warm the cache for the dashboard's default request
+    price_data.regime_baseline = warm_up_regime_detector(price_data.prices)
+    logger.info("Datasets loaded successfully.")
+    return price_data
+
 def get_prices_around_event(df, event_date, days_before=180, days_after=180):
     """
     Extract Brent oil prices for a specified period before and after an event.
@@ -84,75 +229,205 @@ def get_prices_around_event(df, event_date, days_before=180, days_after=180):
     end_date = event_date + timedelta(days=days_after)
     return df.loc[start_date:end_date]
 
-def analyze_events(df):
+def analyze_events(price_data, horizons=DEFAULT_HORIZONS):
     """
     Analyze the impact of significant events on Brent oil prices.
     """
-    results = []
-    for date_str, event_name in significant_events.items():
-        event_date = pd.to_datetime(date_str)
-        prices_around_event = get_prices_around_event(df, event_date)
+    df = pd.DataFrame({'Price': price_data.prices}, index=pd.DatetimeIndex(price_data.dates.astype('datetime64[ns]')))
+    changes = event_changes_wide(compute_event_impacts(df, significant_events, horizons))
+    # Missing horizons are reported as null rather than NaN
+    changes = changes.astype(object).where(changes.notna(), None)
+    return changes.to_dict(orient="records")
 
-        # Calculate percentage changes
-        try:
-            nearest_before_1m = df.index[df.index <= event_date - timedelta(days=30)][-1]
-            nearest_after_1m = df.index[df.index >= event_date + timedelta(days=30)][0]
-            price_before_1m = df.loc[nearest_before_1m, 'Price']
-            price_after_1m = df.loc[nearest_after_1m, 'Price']
-            change_1m = ((price_after_1m - price_before_1m) / price_before_1m) * 100
-        except (IndexError, KeyError):
-            change_1m = None
+def get_event_results(price_data, horizons=DEFAULT_HORIZONS):
+    """
+    Return cached event analysis results and their ETag for a dataset version.
+    """
+    horizons = tuple(dict.fromkeys(int(days) for days in horizons))  # Repeated horizons are one column
+    key = (price_data.fingerprint, horizons)
+    cached = event_results_cache.get(key)
+    if cached is None:
+        logger.info(f"Computing event analysis for horizons {horizons}.")
+        if len(event_results_cache) >= EVENT_CACHE_MAX_ENTRIES:
+            event_results_cache.clear()
+        etag = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        cached = (analyze_events(price_data, horizons), etag)
+        event_results_cache[key] = cached
+    return cached
 
-        try:
-            nearest_before_3m = df.index[df.index <= event_date - timedelta(days=90)][-1]
-            nearest_after_3m = df.index[df.index >= event_date + timedelta(days=90)][0]
-            price_before_3m = df.loc[nearest_before_3m, 'Price']
-            price_after_3m = df.loc[nearest_after_3m, 'Price']
-            change_3m = ((price_after_3m - price_before_3m) / price_before_3m) * 100
-        except (IndexError, KeyError):
-            change_3m = None
+class FeatureTable:
+    """
+    The engineered model features (see scripts.feature_store), indexed by date for /api/predict.
+    """
 
-        try:
-            nearest_before_6m = df.index[df.index <= event_date - timedelta(days=180)][-1]
-            nearest_after_6m = df.index[df.index >= event_date + timedelta(days=180)][0]
-            price_before_6m = df.loc[nearest_before_6m, 'Price']
-            price_after_6m = df.loc[nearest_after_6m, 'Price']
-            change_6m = ((price_after_6m - price_before_6m) / price_before_6m) * 100
-        except (IndexError, KeyError):
-            change_6m = None
-
-        # Store results
-        results.append({
-            "Event": event_name,
-            "Date": date_str,
-            "Change_1M": change_1m,
-            "Change_3M": change_3m,
-            "Change_6M": change_6m,
-        })
+    def __init__(self, frame):
+        frame = frame.sort_index()
+        self.dates = frame.index.values.astype('datetime64[ns]')
+        self.values = np.ascontiguousarray(frame[FEATURE_COLUMNS].to_numpy(dtype='float64'))  # Model input rows
+        self.prices = frame['Price'].to_numpy(dtype='float64')
+
+    def position_asof(self, date):
+        """
+        Return the row of the latest date on or before the given date (None if there is none).
+        """
+        position = int(np.searchsorted(self.dates, pd.to_datetime(date).to_datetime64(), side='right')) - 1
+        return position if position >= 0 else None
+
+def load_feature_table():
+    """
+    Load the feature rows for every date, computing only what the feature store doesn't have yet.
+    """
+    logger.info("Loading model features...")
+    feature_table = FeatureTable(load_features(data_dir))
+    logger.info(f"Loaded features for {len(feature_table.dates)} dates.")
+    return feature_table
+
+# Versioned artifacts, reloaded in the background when the input files in data/ or models/ change
+price_files = [data_dir / "BrentOilPrices.csv", resolve_path(data_dir / "BrentOilPrices.csv", DATA_FORMAT),
+               data_dir / "BrentOilPrices.bin"]
+feature_input_files = [path for file_name in INPUT_FILES.values()
+                       for path in (data_dir / file_name, resolve_path(data_dir / file_name, DATA_FORMAT))]
+data_registry = ArtifactRegistry("data", load_price_data, price_files, ARTIFACT_POLL_SECONDS)
+feature_registry = ArtifactRegistry("features", load_feature_table, feature_input_files, ARTIFACT_POLL_SECONDS)
+model_registry = ArtifactRegistry("model", load_model_artifacts, [model_dir], ARTIFACT_POLL_SECONDS)
+for registry in (data_registry, feature_registry, model_registry):
+    registry.reload(force=True)
+    registry.start()
+if data_registry.get() is None:
+    logger.warning("Dataset not found. Historical data and event analysis will not work.")
+if feature_registry.get() is None:
+    logger.warning("Feature data not found. Date-based predictions will not work.")
+if model_registry.get() is None:
+    logger.warning("Model or scalers not found. Predictions will not work.")
+
+def date_range_positions(dates, start_date=None, end_date=None):
+    """
+    Resolve an inclusive date range to a [start, stop) slice of the sorted dates.
+    """
+    start = 0
+    stop = len(dates)
+    if start_date:
+        start_date = align_date(pd.to_datetime(start_date).to_datetime64(), dates.dtype, round_up=True)
+        start = int(np.searchsorted(dates, start_date, side='left'))
+    if end_date:
+        end_date = align_date(pd.to_datetime(end_date).to_datetime64(), dates.dtype)
+        stop = int(np.searchsorted(dates, end_date, side='right'))
+    return start, max(start, stop)
+
+def format_dates(dates, daily=True):
+    """
+    Format datetime64 values as ISO strings (dates only for daily data).
+    """
+    return np.datetime_as_string(dates, unit='D' if daily else 's')
 
-    return results
+def format_prices(prices):
+    """
+    Format float values as JSON numbers, writing NaN as null.
+    """
+    return ['null' if price != price else repr(price) for price in prices.tolist()]
+
+def stream_columnar(dates, prices, daily, chunk_rows=DATA_CHUNK_ROWS):
+    """
+    Stream {"Date": [...], "Price": [...]} in chunks of rows.
+    """
+    yield '{"Date":['
+    for start in range(0, len(dates), chunk_rows):
+        chunk = format_dates(dates[start:start + chunk_rows], daily)
+        yield (',' if start else '') + ','.join(f'"{date}"' for date in chunk)
+    yield '],"Price":['
+    for start in range(0, len(prices), chunk_rows):
+        yield (',' if start else '') + ','.join(format_prices(prices[start:start + chunk_rows]))
+    yield ']}'
+
+def stream_ndjson(dates, prices, daily, chunk_rows=DATA_CHUNK_ROWS):
+    """
+    Stream one {"Date": ..., "Price": ...} JSON object per line.
+    """
+    for start in range(0, len(dates), chunk_rows):
+        chunk_dates = format_dates(dates[start:start + chunk_rows], daily)
+        chunk_prices = format_prices(prices[start:start + chunk_rows])
+        yield ''.join(
+            f'{{"Date":"{date}","Price":{price}}}\n' for date, price in zip(chunk_dates, chunk_prices)
+        )
+
+def stream_arrow(dates, prices, chunk_rows=DATA_CHUNK_ROWS):
+    """
+    Stream the rows as Arrow IPC record batches.
+    """
+    schema = pa.schema([('Date', pa.timestamp('ns')), ('Price', pa.float64())])
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for start in range(0, len(dates), chunk_rows):
+            writer.write_batch(pa.record_batch(
+                [pa.array(dates[start:start + chunk_rows].astype('datetime64[ns]')),
+                 pa.array(prices[start:start + chunk_rows])],
+                schema=schema,
+            ))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+def downsampled_data(price_data, start_date, end_date, max_points, agg, output_format):
+    """
+    Serve at most max_points aggregated rows from the price pyramid.
+    """
+    start = pd.to_datetime(start_date).to_datetime64() if start_date else None
+    end = pd.to_datetime(end_date).to_datetime64() if end_date else None
+    columns = price_data.pyramid.query(start, end, max_points, agg)
+
+    payload = {'Date': format_dates(columns.pop('Date'), price_data.daily).tolist()}
+    for name, values in columns.items():
+        payload[name] = np.where(np.isnan(values), None, values).tolist()
+
+    logger.info(f"Returning {len(payload['Date'])} {agg} points as {output_format}.")
+    with metrics.timer('serialization'):
+        if output_format == 'columnar':
+            return jsonify(payload)
+        return jsonify([dict(zip(payload, row)) for row in zip(*payload.values())])
 
 @app.route('/api/data', methods=['GET'])
 def get_data():
     """Return historical oil price data, optionally filtered by date range."""
     try:
-        if oil_data is None:
+        price_data = data_registry.get()
+        if price_data is None:
             logger.error("Dataset not loaded.")
             return jsonify({"error": "Dataset not found. Please ensure the data file is available."}), 404
 
         logger.info("Received request for historical data.")
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
-        filtered_data = oil_data.copy()
+        output_format = request.args.get('format', 'records')
+        max_points = request.args.get('max_points', type=int)
+        agg = request.args.get('agg', 'lttb')
+
+        if max_points:
+            if agg not in PricePyramid.AGGREGATIONS or output_format not in ('records', 'columnar'):
+                return jsonify({"error": "Downsampling supports agg=lttb|mean|ohlc with format=records|columnar."}), 400
+            return downsampled_data(price_data, start_date, end_date, max_points, agg, output_format)
 
-        if start_date and end_date:
+        # Slice the sorted arrays by position; slices are views, not copies
+        dates, prices, daily = price_data.dates, price_data.prices, price_data.daily
+        if start_date or end_date:
             logger.info(f"Filtering data from {start_date} to {end_date}.")
-            filtered_data = filtered_data[
-                (filtered_data.index >= pd.to_datetime(start_date)) & (filtered_data.index <= pd.to_datetime(end_date))
-            ]
+        start, stop = date_range_positions(dates, start_date, end_date)
+        dates, prices = dates[start:stop], prices[start:stop]
 
-        logger.info("Returning filtered data.")
-        return jsonify(filtered_data.reset_index().to_dict(orient="records"))
+        logger.info(f"Returning {stop - start} rows as {output_format}.")
+        if output_format == 'columnar':
+            return Response(stream_columnar(dates, prices, daily), mimetype='application/json')
+        if output_format == 'ndjson':
+            return Response(stream_ndjson(dates, prices, daily), mimetype='application/x-ndjson')
+        if output_format == 'arrow':
+            if pa is None:
+                return jsonify({"error": "Arrow output requires pyarrow to be installed."}), 400
+            return Response(stream_arrow(dates, prices), mimetype='application/vnd.apache.arrow.stream')
+        if output_format != 'records':
+            return jsonify({"error": f"Unsupported format: {output_format}"}), 400
+        with metrics.timer('serialization'):
+            records = pd.DataFrame({'Date': dates.astype('datetime64[ns]'), 'Price': prices})
+            return jsonify(records.to_dict(orient="records"))
     except Exception as e:
         logger.error(f"Error in /api/data: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -161,57 +436,269 @@ def get_data():
 def get_events():
     """Return event analysis results."""
     try:
-        if oil_data is None:
+        price_data = data_registry.get()
+        if price_data is None:
             logger.error("Dataset not loaded.")
             return jsonify({"error": "Dataset not found. Please ensure the data file is available."}), 404
 
         logger.info("Received request for event analysis.")
-        event_results = analyze_events(oil_data)
+        horizons = request.args.get('horizons')
+        if horizons:
+            try:
+                horizons = [int(days) for days in horizons.split(',')]
+            except ValueError:
+                return jsonify({"error": "horizons must be a comma-separated list of whole days."}), 400
+            if not all(0 < days <= MAX_EVENT_HORIZON_DAYS for days in horizons):
+                return jsonify({"error": f"horizons must be between 1 and {MAX_EVENT_HORIZON_DAYS} days."}), 400
+        else:
+            horizons = DEFAULT_HORIZONS
+        event_results, etag = get_event_results(price_data, horizons)
         logger.info("Returning event analysis results.")
-        return jsonify(event_results)
+        with metrics.timer('serialization'):
+            response = jsonify(event_results)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
     except Exception as e:
         logger.error(f"Error in /api/events: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/predict', methods=['POST'])
+# Online regime detector state and live tick log, shared by all worker processes through files
+regime_state = RegimeState(os.environ.get("REGIME_STATE_PATH", data_dir / "regime_state.bin"),
+                           max_live_ticks=MAX_LIVE_TICKS)
+
+def parse_ticks(data):
+    """
+    Return the prices of a {"price": ...} or {"prices": [...]} body, or None if they aren't all finite numbers.
+    """
+    if not isinstance(data, dict):
+        return None
+    prices = data['prices'] if 'prices' in data else [data.get('price')]
+    if not isinstance(prices, list) or not prices:
+        return None
+    if not all(isinstance(price, (int, float)) and not isinstance(price, bool) for price in prices):
+        return None
+    prices = np.asarray(prices, dtype='float64')
+    return prices if np.isfinite(prices).all() else None
+
+@app.route('/api/regime', methods=['GET', 'POST'])
+def regime():
+    """Report the current regime; POST {"price": ...} or {"prices": [...]} to feed new ticks."""
+    try:
+        price_data = data_registry.get()
+        if price_data is None:
+            logger.error("Dataset not loaded.")
+            return jsonify({"error": "Dataset not found. Please ensure the data file is available."}), 404
+
+        prices = None
+        if request.method == 'POST':
+            prices = parse_ticks(request.get_json(silent=True))
+            if prices is None:
+                return jsonify({"error": "Send a finite number as price or a non-empty list of them as prices."}), 400
+
+        with regime_state.locked():
+            stored = regime_state.read()
+            if stored is None or stored.data_version != price_data.fingerprint:
+                # New dataset version: start from its warmed-up detector and replay the ticks it doesn't cover.
+                # Ticks received on or before the last date of the history are assumed to be part of it.
+                prior_var, state = price_data.regime_baseline
+                detector = OnlineChangePointDetector(prior_var=prior_var)
+                detector.set_state(state)
+                live_ticks = regime_state.live_ticks(after=price_data.dates[-1] if len(price_data.dates) else None)
+                if len(live_ticks):
+                    logger.info(f"Replaying {len(live_ticks)} live ticks.")
+                    detector.update_many(live_ticks['price'])
+                regime_state.replace_ticks(live_ticks)
+                changed = True
+            else:
+                prior_var = stored.prior_var
+                detector = OnlineChangePointDetector(prior_var=prior_var)
+                detector.set_state(stored.state)
+                changed = False
+
+            if prices is not None:
+                summary = detector.update_many(prices)
+                regime_state.append_ticks(np.datetime64('today', 'D'), prices)
+                changed = True
+            else:
+                summary = detector.summary()
+
+            if changed:
+                regime_state.write(price_data.fingerprint, prior_var, detector.get_state())
+
+        if summary["alert"]:
+            logger.warning(f"Regime change alert: {summary}")
+        return jsonify(summary)
+    except Exception as e:
+        logger.error(f"Error in /api/regime: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+def predict_prices(input_data):
+    """
+    Predict oil prices for a 2-D array of feature rows in one model call.
+    """
+    model, X_scaler, y_scaler = model_registry.get()
+    with metrics.timer('scaler'):
+        input_data_scaled = X_scaler.transform(input_data)
+    input_data_reshaped = input_data_scaled.reshape((input_data_scaled.shape[0], 1, input_data_scaled.shape[1]))
+    with metrics.timer('inference'):
+        predictions_scaled = np.asarray(model.predict_on_batch(input_data_reshaped))
+    with metrics.timer('scaler'):
+        return y_scaler.inverse_transform(predictions_scaled.reshape(-1, 1)).ravel()
+
+predict_batcher = MicroBatcher(predict_prices, PREDICT_MAX_BATCH_SIZE, PREDICT_MAX_WAIT_MS,
+                               collect_stages=metrics.collect_stages)
+
+def predict_single(row):
+    """
+    Predict one feature row through the micro-batcher.
+
+    The batch runs in the batcher's thread, so its queue wait, scaler and
+    inference times are credited to this request here.
+    """
+    prediction, timings = predict_batcher.submit(row)
+    metrics.record_stage('queue_wait', timings.pop('queue_wait'))
+    metrics.add_request_timings(timings)
+    return prediction
+
+def predict_from_features():
+    """
+    Predict from the stored feature rows of one date (?date=) or a date range (?start_date=&end_date=).
+    """
+    feature_table = feature_registry.get()
+    if feature_table is None:
+        logger.error("Feature data not loaded.")
+        return jsonify({"error": "Feature data not found. Please ensure the data files are available."}), 404
+
+    date = request.args.get('date')
+    if date:
+        # Weekends and holidays use the latest trading day before them
+        try:
+            position = feature_table.position_asof(date)
+        except ValueError:
+            return jsonify({"error": f"Invalid date: {date}"}), 400
+        if position is None:
+            return jsonify({"error": f"No feature data on or before {date}."}), 404
+        prediction = predict_single(feature_table.values[position])
+        logger.info(f"Prediction successful for {date}: {prediction}")
+        with metrics.timer('serialization'):
+            return jsonify({
+                "date": str(format_dates(feature_table.dates[position:position + 1])[0]),
+                "predicted_oil_price": prediction,
+                "actual_oil_price": float(feature_table.prices[position]),
+            })
+
+    start_date, end_date = request.args.get('start_date'), request.args.get('end_date')
+    try:
+        start, stop = date_range_positions(feature_table.dates, start_date, end_date)
+    except ValueError:
+        return jsonify({"error": f"Invalid date range: {start_date} to {end_date}"}), 400
+    logger.info(f"Making predictions for {stop - start} dates.")
+    predictions = predict_prices(feature_table.values[start:stop]) if stop > start else np.empty(0)
+    with metrics.timer('serialization'):
+        return jsonify({
+            "dates": format_dates(feature_table.dates[start:stop]).tolist(),
+            "predicted_oil_prices": predictions.tolist(),
+            "actual_oil_prices": feature_table.prices[start:stop].tolist(),
+        })
+
+@app.route('/api/predict', methods=['GET', 'POST'])
 def predict():
-    """Make predictions using the LSTM model."""
+    """Make predictions using the LSTM model (GET: from stored features by date; POST: from feature values)."""
     try:
-        if model is None or X_scaler is None or y_scaler is None:
+        if model_registry.get() is None:
             logger.error("Model or scalers not loaded.")
             return jsonify({"error": "Model or scalers not found. Please ensure the model files are available."}), 404
 
         logger.info("Received prediction request.")
+        if request.method == 'GET':
+            return predict_from_features()
         data = request.get_json()
-        input_data = np.array([[
-            data['GDP'],
-            data['CPI'],
-            data['Exchange_Rate'],
-            data['Price_Pct_Change'],
-            data['GDP_Pct_Change'],
-            data['CPI_Pct_Change'],
-            data['Exchange_Rate_Pct_Change'],
-            data['Price_MA7'],
-            data['Price_MA30'],
-            data['Price_Volatility']
-        ]])
-
-        # Preprocess the input data
-        logger.info("Preprocessing input data.")
-        input_data_scaled = X_scaler.transform(input_data)
-        input_data_reshaped = input_data_scaled.reshape((input_data_scaled.shape[0], 1, input_data_scaled.shape[1]))
 
-        # Make predictions
+        # A list of feature records is predicted as one batch
+        if isinstance(data, list):
+            input_data = np.array([[record[name] for name in FEATURE_COLUMNS] for record in data], dtype='float64')
+            logger.info(f"Making predictions for {len(input_data)} records.")
+            predictions = predict_prices(input_data) if len(input_data) else np.empty(0)
+            with metrics.timer('serialization'):
+                return jsonify({"predicted_oil_prices": predictions.tolist()})
+
+        # Single records are micro-batched with concurrent requests
+        input_data = [data[name] for name in FEATURE_COLUMNS]
         logger.info("Making predictions.")
-        predictions_scaled = model.predict(input_data_reshaped)
-        predictions = y_scaler.inverse_transform(predictions_scaled)
+        prediction = predict_single(input_data)
 
-        logger.info(f"Prediction successful: {predictions[0][0]}")
-        return jsonify({"predicted_oil_price": predictions[0][0]})
+        logger.info(f"Prediction successful: {prediction}")
+        with metrics.timer('serialization'):
+            return jsonify({"predicted_oil_price": prediction})
     except Exception as e:
         logger.error(f"Error in /api/predict: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Longest forecast /api/forecast will roll out, in calendar days
+MAX_FORECAST_DAYS = int(os.environ.get("MAX_FORECAST_DAYS", 365))
+
+@app.route('/api/forecast', methods=['GET'])
+def forecast():
+    """
+    Forecast price paths from one or more starting dates (?start_dates=a,b&horizon=30|90|180).
+
+    The horizon is in calendar days, as in the event analysis; each path has one price per
+    trading day within it.
+    """
+    try:
+        bundle = model_registry.get()
+        feature_table = feature_registry.get()
+        if bundle is None or feature_table is None:
+            logger.error("Model or feature data not loaded.")
+            return jsonify({"error": "Model or feature data not found. Please ensure the files are available."}), 404
+
+        horizon = request.args.get('horizon', FORECAST_HORIZONS[0], type=int)
+        if not 0 < horizon <= MAX_FORECAST_DAYS:
+            return jsonify({"error": f"horizon must be between 1 and {MAX_FORECAST_DAYS} days."}), 400
+        start_dates = request.args.get('start_dates')
+        start_dates = start_dates.split(',') if start_dates else [feature_table.dates[-1]]
+
+        # Every scenario starts from the latest trading day on or before its start date
+        try:
+            positions = [feature_table.position_asof(date) for date in start_dates]
+        except ValueError:
+            return jsonify({"error": "start_dates must be a comma-separated list of dates."}), 400
+        if any(position is None or position + 1 < FEATURE_LOOKBACK for position in positions):
+            return jsonify({"error": f"Each start date needs {FEATURE_LOOKBACK} days of feature history."}), 400
+        positions = np.array(positions)
+        history = feature_table.prices[positions[:, None] + np.arange(1 - FEATURE_LOOKBACK, 1)]
+        indicators = feature_table.values[positions][:, [FEATURE_COLUMNS.index(name) for name in HELD_INDICATORS]]
+
+        # Forecast steps are trading days; scenarios share one rollout to the longest of them
+        start_days = feature_table.dates[positions].astype('datetime64[D]')
+        steps, step_dates = horizon_steps(start_days, horizon)
+        logger.info(f"Forecasting {horizon} days ({steps.max()} trading days) for {len(positions)} scenarios.")
+        with metrics.timer('inference'):
+            paths = forecast_features(bundle.model, bundle.X_scaler, bundle.y_scaler, history, indicators,
+                                      int(steps.max()))
+
+        scenarios = []
+        for start_day, n_steps, dates, path in zip(start_days, steps, step_dates, paths):
+            scenarios.append({
+                "start_date": str(start_day),
+                "dates": format_dates(dates).tolist(),
+                "predicted_oil_prices": path[:n_steps].tolist(),
+            })
+        with metrics.timer('serialization'):
+            return jsonify({"horizon": horizon, "scenarios": scenarios})
+    except Exception as e:
+        logger.error(f"Error in /api/forecast: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/version', methods=['GET'])
+def get_version():
+    """Return the active data, feature and model artifact versions."""
+    return jsonify({
+        registry.name: {"version": registry.active.version, "loaded_at": registry.active.loaded_at}
+        for registry in (data_registry, feature_registry, model_registry)
+    })
+
 @app.route('/api/metrics', methods=['GET'])
 def get_metrics():
     """Return model performance metrics."""
@@ -233,13 +720,13 @@ def get_metrics():
         mae = mean_absolute_error(y_true, y_pred)  # Mean Absolute Error
         r2 = r2_score(y_true, y_pred)  # R-squared
 
-        metrics = {
+        summary = {
             "RMSE": rmse,
             "MAE": mae,
             "R2": r2
         }
         logger.info("Returning model metrics.")
-        return jsonify(metrics)
+        return jsonify(summary)
     except Exception as e:
         logger.error(f"Error in /api/metrics: {str(e)}")
         return jsonify({"error": str(e)}), 500
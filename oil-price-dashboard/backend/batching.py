@@ -0,0 +1,101 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-row requests and run them as one batched call.
+
+    A background thread takes the first queued row, then keeps collecting rows
+    until either ``max_batch_size`` rows are queued or ``max_wait_ms`` has
+    passed since the first one arrived, and calls ``predict_fn`` once on the
+    stacked rows.
+
+    The worker runs outside the callers' threads, so every result comes back
+    with the time the row spent queued (``queue_wait``) and the stage timings
+    ``collect_stages`` gathered during its batch's call.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=5.0, collect_stages=None):
+        """
+        Initialize the batcher.
+
+        Args:
+            predict_fn (callable): Maps a 2-D array of rows to a 1-D array of results.
+            max_batch_size (int): Largest number of rows run in one call.
+            max_wait_ms (float): Longest time the first row of a batch waits for others.
+            collect_stages (callable, optional): Returns a context manager yielding a dict of
+                stage name -> seconds recorded while predict_fn runs (e.g. Metrics.collect_stages).
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.max_wait = max(float(max_wait_ms), 0.0) / 1000.0
+        self.collect_stages = collect_stages
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, row, timeout=30.0):
+        """
+        Queue one feature row and block until its result is available.
+
+        Args:
+            row (array-like): A single feature row.
+            timeout (float): Seconds to wait for the result.
+
+        Returns:
+            tuple: The result for this row (float) and its timings (dict of stage name -> seconds,
+            including 'queue_wait').
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(row, dtype='float64'), future, time.perf_counter()))
+        return future.result(timeout=timeout)
+
+    def _ensure_worker(self):
+        """Start the worker thread on first use (after any fork of the server)."""
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name="predict-batcher", daemon=True)
+                    self._worker.start()
+
+    def _collect(self):
+        """Wait for one row, then gather more until the batch is full or the wait expires."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """Worker loop: run each collected batch through predict_fn."""
+        while True:
+            batch = self._collect()
+            rows = np.vstack([row for row, _, _ in batch])
+            started = time.perf_counter()
+            try:
+                with self.collect_stages() if self.collect_stages else nullcontext({}) as stages:
+                    results = np.asarray(self.predict_fn(rows)).ravel()
+            except Exception as e:
+                logger.error(f"Batched prediction failed: {str(e)}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            logger.info(f"Ran batched prediction for {len(batch)} requests.")
+            for (_, future, queued), result in zip(batch, results):
+                future.set_result((float(result), {'queue_wait': started - queued, **stages}))
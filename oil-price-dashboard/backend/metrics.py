@@ -0,0 +1,242 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+
+# Histogram buckets for latencies (seconds) and payload sizes (bytes)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+
+class Metrics:
+    """
+    Request metrics collected without locks on the request path.
+
+    Every thread writes to its own shard (a plain dict only that thread
+    mutates), so recording a value is a dict lookup and a few additions. The
+    shards are only combined when ``/metrics`` is scraped. The shard list is
+    locked only when a thread registers its shard and during a scrape; shards
+    of finished threads are folded into a retired total at both points, so the
+    list stays as long as the number of live threads even when the server
+    starts a thread per request and nothing scrapes.
+    """
+
+    def __init__(self):
+        self._descriptions = {}  # name -> (type, help, buckets)
+        self._local = threading.local()
+        self._shards = []  # (thread, shard) pairs; appended once per thread
+        self._retired = {}
+        self._shards_lock = threading.Lock()  # Guards _shards and _retired; never taken to record a value
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        self.describe('http_requests_total', 'counter', 'Requests handled, by route, method and status.')
+        self.describe('http_request_duration_seconds', 'histogram', 'Time spent in the request handler.',
+                      LATENCY_BUCKETS)
+        self.describe('http_request_size_bytes', 'histogram', 'Request body sizes.', SIZE_BUCKETS)
+        self.describe('http_response_size_bytes', 'histogram', 'Response body sizes (streamed bodies excluded).',
+                      SIZE_BUCKETS)
+        self.describe('stage_duration_seconds', 'histogram',
+                      'Time spent in request stages (queue_wait, inference, scaler, serialization).',
+                      LATENCY_BUCKETS)
+
+    def describe(self, name, kind, help_text, buckets=None):
+        """Register a metric's type ('counter' or 'histogram'), help text and buckets."""
+        self._descriptions[name] = (kind, help_text, tuple(buckets) if buckets else None)
+
+    def _shard(self):
+        """Return the calling thread's shard, creating it on first use."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def _retire_dead_shards(self):
+        """Fold the shards of finished threads into the retired total; call with _shards_lock held."""
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                # The thread has exited, so nothing writes to its shard any more
+                for key, value in shard.items():
+                    self._merge(self._retired, key, value)
+        self._shards[:] = live
+
+    def _after_fork(self):
+        """Reset the lock in a forked child; a scrape may have held it at the fork."""
+        self._shards_lock = threading.Lock()
+
+    def inc(self, name, labels=(), amount=1):
+        """Add to a counter; labels is a tuple of (name, value) pairs."""
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def observe(self, name, value, labels=()):
+        """Record one value in a histogram."""
+        shard = self._shard()
+        key = (name, labels)
+        entry = shard.get(key)
+        if entry is None:
+            buckets = self._descriptions[name][2]
+            entry = shard[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self._descriptions[name][2], value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    @contextmanager
+    def timer(self, stage):
+        """
+        Time a block as a request stage.
+
+        The duration is recorded in ``stage_duration_seconds`` and, inside a
+        request, added to that request's Server-Timing entries.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start)
+
+    def record_stage(self, stage, seconds):
+        """
+        Record the duration of a request stage measured elsewhere.
+
+        Outside a request (e.g. in the prediction batcher's thread) the time is
+        also added to the calling thread's ``collect_stages`` block, if any.
+        """
+        self.observe('stage_duration_seconds', seconds, (('stage', stage),))
+        collected = getattr(self._local, 'collected', None)
+        if collected is not None:
+            collected[stage] = collected.get(stage, 0.0) + seconds
+        self.add_request_timings({stage: seconds})
+
+    def add_request_timings(self, timings):
+        """Add stage durations to the current request's Server-Timing entries (without recording them again)."""
+        if has_request_context() and hasattr(g, 'stage_timings'):
+            for stage, seconds in timings.items():
+                g.stage_timings[stage] = g.stage_timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def collect_stages(self):
+        """
+        Collect the stage durations recorded by this thread within a block.
+
+        Yields:
+            dict: Stage name -> seconds, filled in as the stages complete.
+        """
+        previous = getattr(self._local, 'collected', None)
+        collected = self._local.collected = {}
+        try:
+            yield collected
+        finally:
+            self._local.collected = previous
+
+    @staticmethod
+    def _merge(total, key, value):
+        """Add one shard entry into a combined table."""
+        if not isinstance(value, list):
+            total[key] = total.get(key, 0) + value
+            return
+        merged = total.get(key)
+        if merged is None:
+            total[key] = [list(value[0]), value[1], value[2]]
+        else:
+            merged[0] = [a + b for a, b in zip(merged[0], value[0])]
+            merged[1] += value[1]
+            merged[2] += value[2]
+
+    def snapshot(self):
+        """
+        Combine all shards.
+
+        Returns:
+            dict: (name, labels) -> counter value or [bucket counts, sum, count].
+        """
+        with self._shards_lock:
+            self._retire_dead_shards()
+            live = list(self._shards)
+
+            total = {}
+            for key, value in self._retired.items():
+                self._merge(total, key, value)
+            for _, shard in live:
+                # Copying the items is atomic under the GIL even while the owner keeps writing
+                for key, value in list(shard.items()):
+                    self._merge(total, key, value)
+            return total
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, (kind, help_text, buckets) in self._descriptions.items():
+            series = sorted((labels, value) for (metric, labels), value in snapshot.items() if metric == name)
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in series:
+                if kind == 'counter':
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total!r}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def init_app(self, app, server_timing=False):
+        """
+        Record every request of a Flask app and serve the metrics at /metrics.
+
+        Args:
+            app (Flask): The application.
+            server_timing (bool): Add a Server-Timing header with the stage and total times.
+        """
+        @app.before_request
+        def start_request():
+            g.request_start = time.perf_counter()
+            g.stage_timings = {}
+
+        @app.after_request
+        def record_request(response):
+            seconds = time.perf_counter() - g.get('request_start', time.perf_counter())
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            labels = (('route', route), ('method', request.method))
+            self.inc('http_requests_total', labels + (('status', str(response.status_code)),))
+            self.observe('http_request_duration_seconds', seconds, labels)
+            if request.content_length:
+                self.observe('http_request_size_bytes', request.content_length, labels)
+            if not response.is_streamed and response.content_length is not None:
+                self.observe('http_response_size_bytes', response.content_length, labels)
+            if server_timing:
+                entries = [f"{stage};dur={stage_seconds * 1000:.2f}"
+                           for stage, stage_seconds in g.get('stage_timings', {}).items()]
+                entries.append(f"total;dur={seconds * 1000:.2f}")
+                response.headers['Server-Timing'] = ', '.join(entries)
+            return response
+
+        @app.route('/metrics', methods=['GET'])
+        def prometheus_metrics():
+            """Return the request metrics in Prometheus text format."""
+            return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _format_labels(labels):
+    """Format (name, value) label pairs as {name="value",...}."""
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
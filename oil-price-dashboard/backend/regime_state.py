@@ -0,0 +1,231 @@
+import logging
+import os
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # No cross-process locking (e.g. Windows); threads of one process are still serialized
+
+logger = logging.getLogger(__name__)
+
+# State file layout: a 128-byte header, then the detector's run-length arrays, capacity float64 values each
+MAGIC = b'BOCPDST1'
+VERSION = 1
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('capacity', '<u4'),  # Run lengths each array has room for
+    ('length', '<u4'),  # Run lengths in use
+    ('reserved', '<u4'),
+    ('data_version', 'S64'),  # Fingerprint of the dataset the detector was warmed up on
+    ('prior_var', '<f8'),
+    ('last_price', '<f8'),  # NaN before the first price
+    ('n_ticks', '<u8'),
+    ('padding', 'V16'),
+])
+STATE_ARRAYS = ('log_probs', 'mu', 'kappa', 'alpha', 'beta')
+# Tick log records, appended as ticks arrive
+TICK_DTYPE = np.dtype([('day', '<i8'), ('price', '<f8')])
+
+# A stored detector state
+StoredRegime = namedtuple('StoredRegime', ['data_version', 'prior_var', 'state'])
+
+
+class RegimeState:
+    """
+    Online regime detector state shared by every server process through files.
+
+    The detector state is a fixed-size binary record that is memory-mapped and
+    updated in place, so a tick costs O(max_run_length) no matter how long the
+    server has run. Live ticks go to an append-only log that is only read back
+    when the detector is rebuilt for a new dataset version. Readers and writers
+    hold an exclusive lock on ``<path>.lock`` (flock), so a read-modify-write
+    cycle inside ``locked()`` is atomic across gunicorn workers.
+    """
+
+    def __init__(self, path, capacity=500, max_live_ticks=10000):
+        """
+        Initialize the shared state.
+
+        Args:
+            path (str or Path): The state file; the tick log and lock file are kept next to it.
+            capacity (int): Run lengths the state file holds (the detector's max_run_length).
+            max_live_ticks (int): Live ticks kept for replay; the log is compacted past twice this.
+        """
+        self.path = Path(path)
+        self.ticks_path = self.path.with_name(self.path.name + ".ticks")
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.capacity = capacity
+        self.max_live_ticks = max_live_ticks
+        self._buffer = None  # The state file's memory map while the lock is held
+        self._thread_lock = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    @property
+    def size(self):
+        """Size of the state file in bytes."""
+        return HEADER_DTYPE.itemsize + len(STATE_ARRAYS) * 8 * self.capacity
+
+    @contextmanager
+    def locked(self):
+        """Hold the lock for a read-modify-write cycle of ``read``, ``write`` and the tick log."""
+        with self._thread_lock:
+            try:
+                self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+                lock_file = open(self.lock_path, 'a')
+            except OSError as e:
+                logger.warning(f"Cannot open {self.lock_path}; state is not shared between processes: {e}")
+                lock_file = None
+            try:
+                if lock_file is not None and fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._buffer = self._map()
+                yield self
+            finally:
+                self._buffer = None
+                if lock_file is not None:
+                    lock_file.close()  # Also releases the flock
+
+    def _map(self):
+        """Memory-map the state file, (re)creating it if it is missing or has another layout."""
+        try:
+            if self.path.stat().st_size == self.size:
+                buffer = np.memmap(self.path, dtype='u1', mode='r+')
+                header = buffer[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+                if (header['magic'][0] == MAGIC and header['version'][0] == VERSION
+                        and header['capacity'][0] == self.capacity):
+                    return buffer
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Replacing unreadable state file {self.path}: {e}")
+
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['magic'] = MAGIC
+        header['version'] = VERSION
+        header['capacity'] = self.capacity
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(header.tobytes())
+                f.truncate(self.size)
+            os.replace(tmp_path, self.path)
+            return np.memmap(self.path, dtype='u1', mode='r+')
+        except OSError as e:
+            logger.error(f"Could not create state file {self.path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return None
+
+    def _header(self):
+        return self._buffer[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+
+    def _array(self, name):
+        start = HEADER_DTYPE.itemsize + STATE_ARRAYS.index(name) * 8 * self.capacity
+        return self._buffer[start:start + 8 * self.capacity].view('<f8')
+
+    def read(self):
+        """
+        Return the stored detector state; call inside ``locked()``.
+
+        Returns:
+            StoredRegime: (data_version, prior_var, state for ``set_state``), or None if nothing is stored.
+        """
+        if self._buffer is None:
+            return None
+        header = self._header()
+        length = int(header['length'][0])
+        if not length:
+            return None
+        last_price = float(header['last_price'][0])
+        state = {name: self._array(name)[:length].copy() for name in STATE_ARRAYS}
+        state['last_price'] = None if np.isnan(last_price) else last_price
+        state['n_ticks'] = int(header['n_ticks'][0])
+        return StoredRegime(header['data_version'][0].decode('ascii'), float(header['prior_var'][0]), state)
+
+    def write(self, data_version, prior_var, state):
+        """
+        Overwrite the stored detector state in place; call inside ``locked()``.
+
+        Args:
+            data_version (str): Fingerprint of the dataset the detector was warmed up on.
+            prior_var (float): The detector's prior variance.
+            state (dict): The detector's ``get_state()``.
+        """
+        if self._buffer is None:
+            return
+        length = len(state['log_probs'])
+        if length > self.capacity:
+            raise ValueError(f"Detector state has {length} run lengths; the state file holds {self.capacity}")
+        header = self._header()
+        header['length'] = 0  # Marks the record invalid while it is rewritten
+        for name in STATE_ARRAYS:
+            self._array(name)[:length] = state[name]
+        header['data_version'] = data_version.encode('ascii')
+        header['prior_var'] = prior_var
+        header['last_price'] = np.nan if state['last_price'] is None else state['last_price']
+        header['n_ticks'] = state['n_ticks']
+        header['length'] = length
+
+    def append_ticks(self, day, prices):
+        """
+        Append live ticks received on one day to the tick log; call inside ``locked()``.
+
+        Args:
+            day (np.datetime64): The day the ticks were received.
+            prices (np.ndarray): The tick prices, in order.
+        """
+        ticks = np.zeros(len(prices), dtype=TICK_DTYPE)
+        ticks['day'] = np.datetime64(day, 'D').astype('int64')
+        ticks['price'] = prices
+        try:
+            with open(self.ticks_path, 'ab') as f:
+                f.write(ticks.tobytes())
+                n_logged = f.tell() // TICK_DTYPE.itemsize
+        except OSError as e:
+            logger.error(f"Could not append to tick log {self.ticks_path}: {e}")
+            return
+        if n_logged > 2 * self.max_live_ticks:
+            self.replace_ticks(self.live_ticks())  # Keep the log at most twice the replay window
+
+    def live_ticks(self, after=None):
+        """
+        Return the most recent logged ticks, at most ``max_live_ticks`` of them; call inside ``locked()``.
+
+        Args:
+            after (np.datetime64 or None): Only return ticks received after this day.
+
+        Returns:
+            np.ndarray: Records with 'day' (epoch days) and 'price' fields, oldest first.
+        """
+        try:
+            ticks = np.fromfile(self.ticks_path, dtype=TICK_DTYPE)
+        except FileNotFoundError:
+            ticks = np.zeros(0, dtype=TICK_DTYPE)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tick log {self.ticks_path}: {e}")
+            ticks = np.zeros(0, dtype=TICK_DTYPE)
+        ticks = ticks[-self.max_live_ticks:]
+        if after is not None:
+            ticks = ticks[ticks['day'] > np.datetime64(after, 'D').astype('int64')]
+        return ticks
+
+    def replace_ticks(self, ticks):
+        """Rewrite the tick log with the given records; call inside ``locked()``."""
+        tmp_path = self.ticks_path.with_name(f"{self.ticks_path.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(np.ascontiguousarray(ticks, dtype=TICK_DTYPE).tobytes())
+            os.replace(tmp_path, self.ticks_path)
+        except OSError as e:
+            logger.error(f"Could not rewrite tick log {self.ticks_path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _after_fork(self):
+        """Reset the thread lock in a forked child; another thread may have held it at the fork."""
+        self._thread_lock = threading.Lock()
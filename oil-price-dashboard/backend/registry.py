@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# The loaded artifact together with the version it was built from
+ActiveArtifact = namedtuple('ActiveArtifact', ['value', 'version', 'loaded_at'])
+
+
+class ArtifactRegistry:
+    """
+    Hold the active version of an artifact and reload it when its files change.
+
+    Readers only dereference ``active`` (a single immutable tuple), so they
+    never take a lock; a reload builds the new value in the background and
+    then replaces the reference in one assignment. The watcher thread does not
+    survive a fork (e.g. gunicorn --preload), so it is restarted on the first
+    read in the child.
+    """
+
+    def __init__(self, name, loader, watch_paths, poll_interval=5.0):
+        """
+        Initialize the registry.
+
+        Args:
+            name (str): Name used in logs and version reports.
+            loader (callable): Builds a new artifact value from disk.
+            watch_paths (list): Files or directories whose changes trigger a reload.
+            poll_interval (float): Seconds between change checks (0 disables watching).
+        """
+        self.name = name
+        self.loader = loader
+        self.watch_paths = [Path(path) for path in watch_paths]
+        self.poll_interval = poll_interval
+        self.active = ActiveArtifact(None, None, None)
+        self._signature = None
+        self._reload_lock = threading.Lock()  # Serializes reloads only; readers never wait on it
+        self._start_lock = threading.Lock()
+        self._watching = False  # Set by start(); the watcher is restarted after a fork while set
+        self._watcher = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def get(self):
+        """Return the active artifact value (None if loading failed)."""
+        if self._watching and not self._watcher.is_alive():
+            self._start_watcher()
+        return self.active.value
+
+    def signature(self):
+        """Return (path, mtime, size) for every watched file."""
+        entries = []
+        for root in self.watch_paths:
+            if root.is_file():
+                files = [root]
+            elif root.is_dir():
+                files = sorted(path for path in root.iterdir() if path.is_file())
+            else:
+                files = []
+            for path in files:
+                stat = path.stat()
+                entries.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    def reload(self, force=False):
+        """
+        Load a new version if the watched files changed since the last load.
+
+        Returns:
+            bool: True if a new version was swapped in.
+        """
+        with self._reload_lock:
+            signature = self.signature()
+            if not force and signature == self._signature:
+                return False
+            # Record the signature first so a failing version is retried only after another change
+            self._signature = signature
+            try:
+                logger.info(f"Loading {self.name} artifacts...")
+                value = self.loader()
+            except Exception as e:
+                logger.error(f"Error loading {self.name} artifacts: {str(e)}")
+                return False
+            version = hashlib.sha256(repr(signature).encode("utf-8")).hexdigest()[:12]
+            self.active = ActiveArtifact(value, version, datetime.now().isoformat(timespec='seconds'))
+            logger.info(f"Activated {self.name} version {version}.")
+            return True
+
+    def start(self):
+        """Start the background thread that polls the watched paths."""
+        if self.poll_interval:
+            self._start_watcher()
+            self._watching = True
+
+    def _start_watcher(self):
+        """Start the watcher thread unless it is already running in this process."""
+        with self._start_lock:
+            if self._watcher is None or not self._watcher.is_alive():
+                self._watcher = threading.Thread(target=self._watch, name=f"{self.name}-watcher", daemon=True)
+                self._watcher.start()
+
+    def _after_fork(self):
+        """Reset the locks in a forked child; the parent's watcher may have held one at the fork."""
+        self._reload_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+
+    def _watch(self):
+        """Poll the watched paths and reload on change."""
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Error checking {self.name} artifacts: {str(e)}")
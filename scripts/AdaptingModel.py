@@ -3,6 +3,19 @@ import numpy as np
 import logging
 from pathlib import Path
 import joblib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import multiprocessing
+import sys
+import tensorflow as tf
+
+# Make the project packages importable when run as a script (python scripts/AdaptingModel.py)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.storage import read_frame
+from scripts.windowing import DEFAULT_SHUFFLE_SEED, make_window_dataset
+from scripts.process_env import scoped_environ
+from scripts.feature_store import FEATURE_COLUMNS, FeatureStore, compute_features, merge_inputs
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.metrics import mean_squared_error
 from sklearn.model_selection import TimeSeriesSplit
@@ -11,8 +24,17 @@ from tensorflow.keras.layers import LSTM, Dense
 from tensorflow.keras.optimizers import Adam
 
 class PricePredictor:
-    def __init__(self):
-        """Initialize the OilPricePredictor class."""
+    def __init__(self, input_pipeline=False, shuffle_seed=DEFAULT_SHUFFLE_SEED):
+        """
+        Initialize the OilPricePredictor class.
+
+        Args:
+            input_pipeline (bool): Train from a streaming tf.data pipeline instead of in-memory arrays.
+            shuffle_seed (int, optional): Seed of the pipeline's per-epoch window shuffle, which matches
+                the in-memory path's shuffling (None trains on the rows in time order).
+        """
+        self.input_pipeline = input_pipeline
+        self.shuffle_seed = shuffle_seed
         self.merged_data = None  # Merged dataset
         self.feature_data = None  # Dataset with engineered features
         self.X = None  # Features for model training
@@ -35,39 +57,37 @@ class PricePredictor:
         self.logger = logging.getLogger(__name__)
         self.logger.info("Logging initialized.")
 
-    def load_data(self, data_path="../data"):
-        """Load and prepare the data from CSV files."""
+    def load_data(self, data_path="../data", use_feature_store=True):
+        """
+        Load and prepare the data files (Parquet/Feather or CSV, see src.storage).
+
+        Args:
+            data_path (str): Directory with the data files.
+            use_feature_store (bool): Reuse the features persisted in <data_path>/features when the
+                merged inputs are unchanged, computing only appended rows.
+        """
         try:
-            self.logger.info("Loading data from CSV files...")
+            self.logger.info("Loading data files...")
 
-            # Load individual datasets
-            gdp_data_daily = pd.read_csv(f"{data_path}/GDP_cleaned_data_daily.csv")
-            gdp_data_daily['Date'] = pd.to_datetime(gdp_data_daily['Date'])
-            gdp_data_daily.set_index('Date', inplace=True)
-            
-            cpi_data_daily = pd.read_csv(f"{data_path}/CPI_cleaned_data_daily.csv")
-            cpi_data_daily['Date'] = pd.to_datetime(cpi_data_daily['Date'])
-            cpi_data_daily.set_index('Date', inplace=True)
-            
-            exchange_rate_data_daily = pd.read_csv(f"{data_path}/Exchange_Rate_cleaned_data_daily.csv")
-            exchange_rate_data_daily['Date'] = pd.to_datetime(exchange_rate_data_daily['Date'])
-            exchange_rate_data_daily.set_index('Date', inplace=True)
-            
-            oil_data_daily = pd.read_csv(f"{data_path}/BrentOilPrices.csv")
-            oil_data_daily['Date'] = pd.to_datetime(oil_data_daily['Date'])
-            oil_data_daily.set_index('Date', inplace=True)
+            # Load individual datasets (columnar copies are used when available)
+            gdp_data_daily = read_frame(f"{data_path}/GDP_cleaned_data_daily.csv")
+            cpi_data_daily = read_frame(f"{data_path}/CPI_cleaned_data_daily.csv")
+            exchange_rate_data_daily = read_frame(f"{data_path}/Exchange_Rate_cleaned_data_daily.csv")
+            oil_data_daily = read_frame(f"{data_path}/BrentOilPrices.csv")
             
             self.logger.info("Data loaded successfully!")
 
             # Merge data
             self.merged_data = self.merge_data(oil_data_daily, gdp_data_daily, 
                                              cpi_data_daily, exchange_rate_data_daily)
-            self.feature_data = self.create_features(self.merged_data)
+            if use_feature_store:
+                self.logger.info("Loading features from the feature store...")
+                self.feature_data = FeatureStore(f"{data_path}/features").features(self.merged_data)
+            else:
+                self.feature_data = self.create_features(self.merged_data)
             
             # Prepare features and target
-            self.X = self.feature_data[['GDP', 'CPI', 'Exchange_Rate', 'Price_Pct_Change',
-                                      'GDP_Pct_Change', 'CPI_Pct_Change', 'Exchange_Rate_Pct_Change',
-                                      'Price_MA7', 'Price_MA30', 'Price_Volatility']]
+            self.X = self.feature_data[FEATURE_COLUMNS]
             self.y = self.feature_data['Price']
             
             self.logger.info("Data preprocessing completed.")
@@ -81,30 +101,12 @@ class PricePredictor:
     def merge_data(self, oil_data, gdp_data, cpi_data, exchange_rate_data):
         """Merge all datasets into a single DataFrame."""
         self.logger.info("Merging datasets...")
-        merged_data = pd.concat([oil_data, gdp_data, cpi_data, exchange_rate_data], 
-                              axis=1, join='inner')
-        merged_data.columns = ['Price', 'GDP', 'CPI', 'Exchange_Rate']
-        return merged_data.dropna()
+        return merge_inputs(oil_data, gdp_data, cpi_data, exchange_rate_data)
 
     def create_features(self, data):
-        """Create additional features from the merged data."""
+        """Create additional features from the merged data (see scripts.feature_store.compute_features)."""
         self.logger.info("Creating features...")
-        feature_data = data.copy()
-        
-        # Calculate percentage changes
-        feature_data['Price_Pct_Change'] = feature_data['Price'].pct_change()
-        feature_data['GDP_Pct_Change'] = feature_data['GDP'].pct_change()
-        feature_data['CPI_Pct_Change'] = feature_data['CPI'].pct_change()
-        feature_data['Exchange_Rate_Pct_Change'] = feature_data['Exchange_Rate'].pct_change()
-        
-        # Moving averages
-        feature_data['Price_MA7'] = feature_data['Price'].rolling(window=7).mean()
-        feature_data['Price_MA30'] = feature_data['Price'].rolling(window=30).mean()
-        
-        # Volatility
-        feature_data['Price_Volatility'] = feature_data['Price'].rolling(window=30).std()
-        
-        return feature_data.dropna()
+        return compute_features(data)
 
     def build_lstm_model(self, X_train, y_train):
         """Build and train the LSTM model."""
@@ -118,9 +120,6 @@ class PricePredictor:
             X_scaled = X_scaler.fit_transform(X_train)
             y_scaled = y_scaler.fit_transform(y_train.values.reshape(-1, 1))
             
-            # Reshape input for LSTM
-            X_lstm = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
-            
             # Build the LSTM model
             model = Sequential([
                 LSTM(50, activation='relu', input_shape=(1, X_train.shape[1])),
@@ -132,7 +131,15 @@ class PricePredictor:
             
             # Train the model
             self.logger.info("Training LSTM model...")
-            model.fit(X_lstm, y_scaled, epochs=100, batch_size=32, verbose=0)
+            if self.input_pipeline:
+                # One-row windows are sliced from the scaled features as batches are requested
+                dataset = make_window_dataset(X_scaled, time_step=1, batch_size=32, targets=y_scaled,
+                                              shuffle_seed=self.shuffle_seed)
+                model.fit(dataset, epochs=100, verbose=0)
+            else:
+                # Reshape input for LSTM
+                X_lstm = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
+                model.fit(X_lstm, y_scaled, epochs=100, batch_size=32, verbose=0)
             
             self.logger.info("LSTM model training completed.")
             return model, X_scaler, y_scaler
@@ -141,39 +148,79 @@ class PricePredictor:
             return None, None, None
             
 
-    def train_and_evaluate(self, n_splits=5):
-        """Train and evaluate the LSTM model using time series cross-validation."""
+    def evaluate_fold(self, X_train, y_train, X_test, y_test, seed=None):
+        """Train on one fold and return (y_true, y_pred, mse), or None if training failed."""
+        if seed is not None:
+            tf.keras.utils.set_random_seed(seed)
+            # Seeding alone leaves the order of parallel reductions (and their low bits) to the thread pools
+            tf.config.experimental.enable_op_determinism()
+
+        # LSTM Model
+        lstm_model, X_scaler, y_scaler = self.build_lstm_model(X_train, y_train)
+        if lstm_model is None:
+            return None
+
+        # Prepare test data
+        X_test_scaled = X_scaler.transform(X_test)
+        X_test_lstm = X_test_scaled.reshape((X_test_scaled.shape[0], 1, X_test_scaled.shape[1]))
+        
+        # Make predictions
+        lstm_forecast = lstm_model.predict(X_test_lstm)
+        lstm_forecast = y_scaler.inverse_transform(lstm_forecast)
+        
+        # Evaluate performance
+        mse = mean_squared_error(y_test, lstm_forecast.flatten())
+        return list(y_test.values), list(lstm_forecast.flatten()), mse
+
+    def train_and_evaluate(self, n_splits=5, n_jobs=1, random_state=None):
+        """
+        Train and evaluate the LSTM model using time series cross-validation.
+
+        Args:
+            n_splits (int): Number of TimeSeriesSplit folds.
+            n_jobs (int): Number of folds trained in parallel worker processes (-1 for one per CPU).
+            random_state (int, optional): Base seed; fold i is trained with seed random_state + i and
+                TensorFlow's deterministic ops, so serial and parallel runs train identical models.
+                Required when n_jobs != 1.
+        """
         if self.X is None or self.y is None:
             self.logger.error("Data not loaded. Please load data first using load_data().")
             return None
+        if n_jobs != 1 and random_state is None:
+            raise ValueError("random_state is required with n_jobs != 1 so parallel folds match a serial run.")
 
         self.logger.info("Starting time series cross-validation...")
         tscv = TimeSeriesSplit(n_splits=n_splits)
+        folds = []
+        for fold, (train_index, test_index) in enumerate(tscv.split(self.X)):
+            seed = None if random_state is None else random_state + fold
+            folds.append((self.X.iloc[train_index], self.y.iloc[train_index],
+                          self.X.iloc[test_index], self.y.iloc[test_index], seed))
+
+        n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        n_jobs = max(1, min(n_jobs or 1, len(folds)))
+        if n_jobs > 1:
+            # Give each worker an equal share of the cores so TF thread pools don't oversubscribe
+            threads = max(1, (os.cpu_count() or 1) // n_jobs)
+            self.logger.info(f"Training {len(folds)} folds in {n_jobs} processes with {threads} threads each...")
+            # BLAS reads OMP_NUM_THREADS when it is loaded, so it must be in the environment the workers start with
+            with scoped_environ(OMP_NUM_THREADS=str(threads)), \
+                    ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_fold_worker, initargs=(threads,)) as executor:
+                evaluate = partial(_evaluate_fold, input_pipeline=self.input_pipeline, shuffle_seed=self.shuffle_seed)
+                fold_results = list(executor.map(evaluate, folds))  # map keeps fold order
+        else:
+            fold_results = [self.evaluate_fold(*fold) for fold in folds]
+
         lstm_scores = []
         y_true_list = []  # Store actual values
         y_pred_list = []  # Store predicted values
-
-        for train_index, test_index in tscv.split(self.X):
-            X_train, X_test = self.X.iloc[train_index], self.X.iloc[test_index]
-            y_train, y_test = self.y.iloc[train_index], self.y.iloc[test_index]
-
-            # LSTM Model
-            lstm_model, X_scaler, y_scaler = self.build_lstm_model(X_train, y_train)
-            if lstm_model is not None:
-                # Prepare test data
-                X_test_scaled = X_scaler.transform(X_test)
-                X_test_lstm = X_test_scaled.reshape((X_test_scaled.shape[0], 1, X_test_scaled.shape[1]))
-                
-                # Make predictions
-                lstm_forecast = lstm_model.predict(X_test_lstm)
-                lstm_forecast = y_scaler.inverse_transform(lstm_forecast)
-                
+        for result in fold_results:
+            if result is not None:
+                y_true, y_pred, mse = result
                 # Store actual and predicted values
-                y_true_list.extend(y_test.values)
-                y_pred_list.extend(lstm_forecast.flatten())
-                
-                # Evaluate performance
-                mse = mean_squared_error(y_test, lstm_forecast.flatten())
+                y_true_list.extend(y_true)
+                y_pred_list.extend(y_pred)
                 lstm_scores.append(mse)
                 self.logger.info(f"Fold MSE: {mse:.4f}")
 
@@ -193,6 +240,17 @@ class PricePredictor:
         joblib.dump(evaluation_results, "evaluation_results.pkl")
         self.logger.info("Evaluation results saved to 'evaluation_results.pkl'.")
 
+
+def _init_fold_worker(threads):
+    """Pin the TensorFlow thread pools of a cross-validation worker."""
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _evaluate_fold(fold, input_pipeline=False, shuffle_seed=DEFAULT_SHUFFLE_SEED):
+    """Train and evaluate one cross-validation fold in a worker process."""
+    return PricePredictor(input_pipeline, shuffle_seed).evaluate_fold(*fold)
+
 # Example usage
 if __name__ == "__main__":
     predictor = PricePredictor()
@@ -2,6 +2,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import logging
 import os
+import time
+from collections import OrderedDict
+import joblib
 import numpy as np
 import seaborn as sns
 from datetime import timedelta
@@ -11,6 +14,9 @@ from sklearn.preprocessing import MinMaxScaler
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense
 from sklearn.metrics import mean_squared_error, mean_absolute_error
+from scripts.windowing import DEFAULT_SHUFFLE_SEED, make_window_dataset, sliding_windows
+from scripts.event_impact import DEFAULT_HORIZONS, compute_event_impacts, event_changes_wide
+from scripts.hashing import hash_rows
 # Set up logging
 log_file_path = 'logs/analysis.log'
 os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
@@ -55,47 +61,27 @@ def get_prices_around_event(df, event_date, days_before=180, days_after=180):
     end_date = event_date + timedelta(days=days_after)
     return df.loc[start_date:end_date]
 
-def analyze_events(df):
+def analyze_events(df, horizons=DEFAULT_HORIZONS):
     """
     Analyze the impact of significant events on Brent oil prices.
 
     Parameters:
     -----------
     df (pd.DataFrame): The dataset containing the 'Price' column with 'Date' as the index.
+    horizons (iterable of int): Horizons in days for the before/after percentage changes.
+
+    Returns:
+    --------
+    pd.DataFrame: The event impact results.
     """
+    # Resolve every (event, horizon) percentage change in one batched lookup
+    changes = event_changes_wide(compute_event_impacts(df, significant_events, horizons))
+
     results = []
     for date_str, event_name in significant_events.items():
         event_date = pd.to_datetime(date_str)
         prices_around_event = get_prices_around_event(df, event_date)
 
-        # Calculate percentage changes
-        try:
-            nearest_before_1m = df.index[df.index <= event_date - timedelta(days=30)][-1]
-            nearest_after_1m = df.index[df.index >= event_date + timedelta(days=30)][0]
-            price_before_1m = df.loc[nearest_before_1m, 'Price']
-            price_after_1m = df.loc[nearest_after_1m, 'Price']
-            change_1m = ((price_after_1m - price_before_1m) / price_before_1m) * 100
-        except (IndexError, KeyError):
-            change_1m = None
-
-        try:
-            nearest_before_3m = df.index[df.index <= event_date - timedelta(days=90)][-1]
-            nearest_after_3m = df.index[df.index >= event_date + timedelta(days=90)][0]
-            price_before_3m = df.loc[nearest_before_3m, 'Price']
-            price_after_3m = df.loc[nearest_after_3m, 'Price']
-            change_3m = ((price_after_3m - price_before_3m) / price_before_3m) * 100
-        except (IndexError, KeyError):
-            change_3m = None
-
-        try:
-            nearest_before_6m = df.index[df.index <= event_date - timedelta(days=180)][-1]
-            nearest_after_6m = df.index[df.index >= event_date + timedelta(days=180)][0]
-            price_before_6m = df.loc[nearest_before_6m, 'Price']
-            price_after_6m = df.loc[nearest_after_6m, 'Price']
-            change_6m = ((price_after_6m - price_before_6m) / price_before_6m) * 100
-        except (IndexError, KeyError):
-            change_6m = None
-
         # Calculate cumulative returns
         if not prices_around_event.empty:
             try:
@@ -114,21 +100,17 @@ def analyze_events(df):
 
         # Store results
         results.append({
-            "Event": event_name,
-            "Date": date_str,
-            "Change_1M": change_1m,
-            "Change_3M": change_3m,
-            "Change_6M": change_6m,
             "Cumulative Return Before": cum_return_before,
             "Cumulative Return After": cum_return_after
         })
 
     # Create DataFrame and log results
-    event_impact_df = pd.DataFrame(results)
+    event_impact_df = pd.concat([changes, pd.DataFrame(results)], axis=1)
     logging.info("Event Impact Analysis: \n%s", event_impact_df)
 
     # Visualize results
     visualize_event_impact(event_impact_df, df)
+    return event_impact_df
 
 def visualize_event_impact(event_impact_df, df):
     """
@@ -159,8 +141,9 @@ def visualize_event_impact(event_impact_df, df):
     plt.show()
 
     # Bar plot for percentage changes
+    change_columns = [col for col in event_impact_df.columns if col.startswith("Change_")]
     changes_data = event_impact_df.melt(id_vars=["Event", "Date"], 
-                                          value_vars=["Change_1M", "Change_3M", "Change_6M"])
+                                          value_vars=change_columns)
     fig, axes = plt.subplots(2, 1, figsize=(12, 10))
 
     sns.barplot(data=changes_data, x="Event", y="value", hue="variable", ax=axes[0])
@@ -227,21 +210,126 @@ def process_data(data):
     diff_data = data['Price'].diff().dropna()
     logging.info('Data differenced successfully.')
     return diff_data
-def fit_markov_switching_model(diff_data):
+# Fitted Markov-switching parameters, keyed by (model configuration, data hash)
+MARKOV_FIT_CACHE_MAX_ENTRIES = 32
+_markov_fit_cache = {'fits': OrderedDict(), 'cold': {}}
+
+
+def _load_markov_cache(cache_path):
+    """Return the in-memory fit cache, or the one persisted at cache_path."""
+    if cache_path is None:
+        return _markov_fit_cache
+    if os.path.exists(cache_path):
+        return joblib.load(cache_path)
+    return {'fits': OrderedDict(), 'cold': {}}
+
+
+def _warm_start_entry(cache, config, row_hashes, rolling=False):
     """
-    Fit a Markov-Switching AR model (2 regimes, AR(1)).
-    
+    Find the cached fit to warm-start from.
+
+    Prefers the longest cached series of the same configuration that the new
+    series extends; for rolling windows (whose start moves) falls back to the
+    most recent fit of the same configuration.
+    """
+    best = None
+    latest = None
+    for (entry_config, entry_hash), entry in cache['fits'].items():
+        if entry_config != config:
+            continue
+        latest = entry
+        n = entry['n_obs']
+        if n <= len(row_hashes) and (best is None or n > best['n_obs']) \
+                and hash_rows(row_hashes[:n]) == entry_hash:
+            best = entry
+    if best is None and rolling:
+        return latest
+    return best
+
+
+def _fit_iterations(results):
+    """Optimizer iterations of a fit (BFGS only reports function evaluations)."""
+    retvals = getattr(results, 'mle_retvals', None) or {}
+    return retvals.get('iterations', retvals.get('fcalls'))
+
+
+def fit_markov_switching_model(diff_data, k_regimes=2, order=1, switching_ar=True, switching_variance=False,
+                               window=None, use_cache=True, cache_path=None):
+    """
+    Fit a Markov-Switching AR model (2 regimes, AR(1) by default).
+
+    Fits are cached by a hash of the data. When the series extends a cached one
+    (e.g. a few days were appended) or a rolling window moved forward, the fit is
+    warm-started from the cached parameters instead of the default starting
+    values; an identical series reuses the cached parameters without optimizing.
+
     Parameters:
     diff_data (Series): The differenced data.
-    
+    k_regimes (int): Number of regimes.
+    order (int): Autoregressive order.
+    switching_ar (bool): Whether the AR coefficients switch between regimes.
+    switching_variance (bool): Whether the error variance switches between regimes.
+    window (int): Fit only the last ``window`` observations (rolling refits).
+    use_cache (bool): Reuse and warm-start from earlier fits.
+    cache_path (str): Optional joblib file that keeps the cache between runs (e.g. daily refits).
+
     Returns:
-    results (Result): The fitted model results.
+    results (Result): The fitted model results. ``results.fit_info`` holds the cache status
+    ('hit', 'warm' or 'cold'), iterations, seconds, and the iterations and seconds saved
+    compared with the last cold fit of the same configuration.
     """
     try:
-        logging.info('Fitting the Markov-Switching AR model.')
-        model = MarkovAutoregression(diff_data, k_regimes=2, order=1, switching_ar=True)
-        results = model.fit()
-        logging.info('Model fitted successfully.')
+        if window is not None:
+            diff_data = diff_data.iloc[-window:]
+        config = (k_regimes, order, switching_ar, switching_variance)
+        model = MarkovAutoregression(diff_data, k_regimes=k_regimes, order=order,
+                                     switching_ar=switching_ar, switching_variance=switching_variance)
+        cache = _load_markov_cache(cache_path) if use_cache else {'fits': OrderedDict(), 'cold': {}}
+        row_hashes = pd.util.hash_pandas_object(diff_data, index=True).to_numpy()
+        key = (config, hash_rows(row_hashes))
+
+        start = time.perf_counter()
+        entry = cache['fits'].get(key)
+        if entry is not None:
+            logging.info('Reusing the cached Markov-Switching AR fit.')
+            results = model.smooth(entry['params'])
+            status, iterations = 'hit', 0
+        else:
+            previous = _warm_start_entry(cache, config, row_hashes, rolling=window is not None)
+            if previous is not None:
+                logging.info('Warm-starting the Markov-Switching AR model from a cached fit.')
+                results = model.fit(start_params=previous['params'], em_iter=0)
+                status = 'warm'
+            else:
+                logging.info('Fitting the Markov-Switching AR model.')
+                results = model.fit()
+                status = 'cold'
+            iterations = _fit_iterations(results)
+        seconds = time.perf_counter() - start
+
+        if status == 'cold':
+            cache['cold'][config] = {'iterations': iterations, 'seconds': seconds}
+        baseline = cache['cold'].get(config)
+        results.fit_info = {
+            'cache': status,
+            'iterations': iterations,
+            'seconds': seconds,
+            'iterations_saved': baseline['iterations'] - iterations
+            if baseline and baseline['iterations'] is not None and iterations is not None else None,
+            'seconds_saved': baseline['seconds'] - seconds if baseline else None,
+        }
+
+        if use_cache:
+            cache['fits'][key] = {'n_obs': len(row_hashes), 'params': np.asarray(results.params)}
+            cache['fits'].move_to_end(key)
+            while len(cache['fits']) > MARKOV_FIT_CACHE_MAX_ENTRIES:
+                cache['fits'].popitem(last=False)
+            if cache_path is not None:
+                joblib.dump(cache, cache_path)
+
+        logging.info(f"Model fitted successfully ({status}: {iterations} iterations, {seconds:.2f}s; "
+                     f"saved {results.fit_info['iterations_saved']} iterations, "
+                     f"{results.fit_info['seconds_saved'] or 0.0:.2f}s).")
         return results
     except Exception as e:
         logging.error(f'Error fitting the model: {e}')
@@ -264,22 +352,17 @@ def preprocess_data(data):
     train_data = scaled_data[:train_size]
     test_data = scaled_data[train_size:]
     
-    # Create sequences for LSTM input
+    # Create sequences for LSTM input as zero-copy sliding-window views
     def create_dataset(data, time_step=60):
-        X, y = [], []
-        for i in range(len(data) - time_step - 1):
-            X.append(data[i:(i + time_step), 0])
-            y.append(data[i + time_step, 0])
-        return np.array(X), np.array(y)
+        X, y = sliding_windows(data, time_step)
+        n_samples = max(len(data) - time_step - 1, 0)  # Keep the original sample count
+        return X[:n_samples], y[:n_samples, 0]
     
     time_step = 60
+    # Windows already have the [samples, time steps, features] shape
     X_train, y_train = create_dataset(train_data, time_step)
     X_test, y_test = create_dataset(test_data, time_step)
     
-    # Reshape input to be [samples, time steps, features]
-    X_train = X_train.reshape(X_train.shape[0], X_train.shape[1], 1)
-    X_test = X_test.reshape(X_test.shape[0], X_test.shape[1], 1)
-    
     return X_train, y_train, X_test, y_test, scaler, train_size, time_step
 
 def build_lstm_model(input_shape):
@@ -307,6 +390,21 @@ def train_model(model, X_train, y_train, epochs=10, batch_size=32):
     history = model.fit(X_train, y_train, batch_size=batch_size, epochs=epochs, verbose=1)
     return history
 
+def train_model_streaming(model, train_data, time_step=60, epochs=10, batch_size=32,
+                          shuffle_seed=DEFAULT_SHUFFLE_SEED, cache=None):
+    """
+    Train the LSTM model from a streaming tf.data pipeline.
+
+    Windows are cut from the scaled training series on the fly instead of
+    materializing the full windowed array; pass the scaled series, e.g.
+    ``scaler.transform(data[['Price']].values)[:train_size]`` from ``preprocess_data``.
+    Windows are shuffled every epoch like ``train_model`` (shuffle_seed=None keeps time order).
+    """
+    logger.info("Training LSTM model from a streaming input pipeline...")
+    dataset = make_window_dataset(train_data, time_step, batch_size, shuffle_seed=shuffle_seed, cache=cache)
+    history = model.fit(dataset, epochs=epochs, verbose=1)
+    return history
+
 def evaluate_model(model, X_test, y_test, scaler):
     """
     Evaluate the LSTM model on the test data and calculate metrics.
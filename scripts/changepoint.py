@@ -0,0 +1,303 @@
+import heapq
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COST_MODELS = ('mean', 'meanvar')
+
+
+class SegmentCost:
+    """
+    Gaussian segment costs computed in O(1) per segment from cumulative sums.
+
+    'mean' is the within-segment sum of squared deviations (shift in mean with
+    constant variance); 'meanvar' is n * log(variance) (shift in mean and/or variance).
+    """
+
+    def __init__(self, x, model='meanvar'):
+        if model not in COST_MODELS:
+            raise ValueError(f"Unsupported cost model: {model}")
+        x = np.asarray(x, dtype='float64')
+        self.model = model
+        self.s1 = np.concatenate(([0.0], np.cumsum(x)))
+        self.s2 = np.concatenate(([0.0], np.cumsum(x * x)))
+        # Variance floor so constant stretches (repeated prices) don't give -inf costs
+        self.var_floor = max(float(np.var(x)) * 1e-6, 1e-12) if len(x) else 1e-12
+
+    def __call__(self, starts, ends):
+        """
+        Cost of the segments [starts, ends); either argument may be an array.
+        """
+        n = ends - starts
+        s1 = self.s1[ends] - self.s1[starts]
+        sse = np.maximum(self.s2[ends] - self.s2[starts] - s1 * s1 / n, 0.0)
+        if self.model == 'mean':
+            return sse
+        return n * np.log(np.maximum(sse / n, self.var_floor))
+
+
+def default_penalty(x, model='meanvar'):
+    """
+    BIC-style penalty: (parameters per segment + 1) * log(n), scaled by a robust
+    noise variance estimate for the 'mean' cost.
+    """
+    x = np.asarray(x, dtype='float64')
+    n = max(len(x), 2)
+    if model == 'mean':
+        mad = np.median(np.abs(np.diff(x) - np.median(np.diff(x)))) if len(x) > 2 else 0.0
+        sigma2 = (1.4826 * mad) ** 2 / 2 or float(np.var(x)) or 1.0
+        return 2 * np.log(n) * sigma2
+    return 3 * np.log(n)
+
+
+def pelt(x, penalty=None, model='meanvar', min_size=5):
+    """
+    Detect change points with PELT (Pruned Exact Linear Time).
+
+    Each step scores all surviving candidate segment starts with one vectorized
+    cost evaluation, and candidates that can no longer be optimal are pruned,
+    giving O(N) amortized work for series with regular changes.
+
+    Parameters:
+    -----------
+    x (array-like): The series.
+    penalty (float): Cost added per change point (default: default_penalty).
+    model (str): 'mean' or 'meanvar'.
+    min_size (int): Minimum segment length.
+
+    Returns:
+    --------
+    list: Positions where a new segment starts.
+    """
+    x = np.asarray(x, dtype='float64')
+    n = len(x)
+    if n < 2 * min_size:
+        return []
+    cost = SegmentCost(x, model)
+    penalty = default_penalty(x, model) if penalty is None else penalty
+
+    best = np.empty(n + 1)
+    best[0] = -penalty
+    last = np.zeros(n + 1, dtype='int64')
+    candidates = np.array([0], dtype='int64')
+    for t in range(min_size, n + 1):
+        values = best[candidates] + cost(candidates, t) + penalty
+        i = int(np.argmin(values))
+        best[t] = values[i]
+        last[t] = candidates[i]
+        # Prune starts that can never beat the current optimum
+        candidates = candidates[values - penalty <= best[t]]
+        new = t - min_size + 1
+        if new >= min_size:
+            candidates = np.append(candidates, new)
+
+    change_points = []
+    t = last[n]
+    while t > 0:
+        change_points.append(int(t))
+        t = last[t]
+    return sorted(change_points)
+
+
+def binary_segmentation(x, n_bkps=None, penalty=None, model='meanvar', min_size=5):
+    """
+    Detect change points by greedy binary segmentation.
+
+    The gain of every admissible split of a segment is computed in one
+    vectorized pass; the best split overall is accepted while its gain exceeds
+    the penalty (or until ``n_bkps`` change points are found).
+
+    Parameters:
+    -----------
+    x (array-like): The series.
+    n_bkps (int): Number of change points to find (overrides the penalty stop).
+    penalty (float): Minimum cost reduction per change point (default: default_penalty).
+    model (str): 'mean' or 'meanvar'.
+    min_size (int): Minimum segment length.
+
+    Returns:
+    --------
+    list: Positions where a new segment starts.
+    """
+    x = np.asarray(x, dtype='float64')
+    cost = SegmentCost(x, model)
+    penalty = default_penalty(x, model) if penalty is None else penalty
+
+    def best_split(start, end):
+        splits = np.arange(start + min_size, end - min_size + 1)
+        if len(splits) == 0:
+            return None
+        gains = cost(start, end) - cost(start, splits) - cost(splits, end)
+        i = int(np.argmax(gains))
+        return gains[i], int(splits[i])
+
+    heap = []
+    candidate = best_split(0, len(x))
+    if candidate is not None:
+        heapq.heappush(heap, (-candidate[0], candidate[1], 0, len(x)))
+
+    change_points = []
+    while heap and (n_bkps is None or len(change_points) < n_bkps):
+        neg_gain, split, start, end = heapq.heappop(heap)
+        if n_bkps is None and -neg_gain <= penalty:
+            break
+        change_points.append(split)
+        for segment in ((start, split), (split, end)):
+            candidate = best_split(*segment)
+            if candidate is not None:
+                heapq.heappush(heap, (-candidate[0], candidate[1], *segment))
+    return sorted(change_points)
+
+
+def cusum(x, threshold=5.0, drift=0.5, model='mean'):
+    """
+    Detect change points with a two-sided CUSUM control chart.
+
+    The series is standardized with robust (median/MAD) estimates. For
+    'meanvar' the chart monitors the squared standardized values, so it reacts
+    to volatility shifts. After an alarm the change is placed where the
+    triggering sum last left zero and both sums are reset.
+
+    Parameters:
+    -----------
+    x (array-like): The series.
+    threshold (float): Alarm level for the cumulative sums.
+    drift (float): Allowed slack per observation.
+    model (str): 'mean' or 'meanvar'.
+
+    Returns:
+    --------
+    list: Positions where a new segment starts.
+    """
+    x = np.asarray(x, dtype='float64')
+    if model not in COST_MODELS:
+        raise ValueError(f"Unsupported cost model: {model}")
+    center = np.median(x)
+    scale = 1.4826 * np.median(np.abs(x - center)) or np.std(x) or 1.0
+    z = (x - center) / scale
+    if model == 'meanvar':
+        z = (z * z - 1.0) / np.sqrt(2.0)
+
+    change_points = []
+    pos = neg = 0.0
+    pos_start = neg_start = 0
+    for t, value in enumerate(z.tolist()):
+        pos = max(0.0, pos + value - drift)
+        neg = max(0.0, neg - value - drift)
+        if pos == 0.0:
+            pos_start = t + 1
+        if neg == 0.0:
+            neg_start = t + 1
+        if pos > threshold or neg > threshold:
+            change_points.append(pos_start if pos > threshold else neg_start)
+            pos = neg = 0.0
+            pos_start = neg_start = t + 1
+    return sorted(set(point for point in change_points if point > 0))
+
+
+_DETECTORS = {'pelt': pelt, 'binseg': binary_segmentation, 'cusum': cusum}
+
+
+def detect_change_points(diff_data, method='pelt', **kwargs):
+    """
+    Detect change points in a series (e.g. the output of analyzer.process_data).
+
+    Parameters:
+    -----------
+    diff_data (pd.Series): The series with a DatetimeIndex.
+    method (str): 'pelt', 'binseg' or 'cusum'.
+    **kwargs: Passed to the detector (penalty, model, min_size, n_bkps, threshold, drift).
+
+    Returns:
+    --------
+    pd.DataFrame: One row per change point with its Date, position and the mean and
+    standard deviation of the segments before and after it.
+    """
+    if method not in _DETECTORS:
+        raise ValueError(f"Unsupported change point method: {method}")
+    values = diff_data.to_numpy(dtype='float64')
+    logger.info(f"Detecting change points with {method}.")
+    points = _DETECTORS[method](values, **kwargs)
+
+    bounds = np.array([0] + points + [len(values)], dtype='int64')
+    s1 = np.concatenate(([0.0], np.cumsum(values)))
+    s2 = np.concatenate(([0.0], np.cumsum(values * values)))
+    lengths = np.diff(bounds)
+    means = np.diff(s1[bounds]) / lengths
+    stds = np.sqrt(np.maximum(np.diff(s2[bounds]) / lengths - means ** 2, 0.0))
+
+    breakpoints = pd.DataFrame({
+        "Date": diff_data.index[points] if points else pd.DatetimeIndex([]),
+        "Position": points,
+        "Method": method,
+        "Mean_Before": means[:-1],
+        "Mean_After": means[1:],
+        "Std_Before": stds[:-1],
+        "Std_After": stds[1:],
+    })
+    logger.info(f"Detected {len(breakpoints)} change points.")
+    return breakpoints
+
+
+def join_with_events(breakpoints, events, tolerance_days=30):
+    """
+    Attach the nearest significant event (within a tolerance) to each change point.
+
+    Parameters:
+    -----------
+    breakpoints (pd.DataFrame): Output of detect_change_points.
+    events (dict): Mapping of event date -> event name (e.g. analyzer.significant_events).
+    tolerance_days (int): Largest distance in days between a change point and its event.
+
+    Returns:
+    --------
+    pd.DataFrame: The breakpoints with Event, Event_Date and Days_From_Event columns
+    (empty where no event is close enough).
+    """
+    event_table = pd.DataFrame({
+        "Event_Date": pd.to_datetime(list(events.keys())),
+        "Event": list(events.values()),
+    }).sort_values("Event_Date")
+    joined = pd.merge_asof(
+        breakpoints.sort_values("Date"), event_table,
+        left_on="Date", right_on="Event_Date",
+        direction="nearest", tolerance=pd.Timedelta(days=tolerance_days),
+    )
+    joined["Days_From_Event"] = (joined["Date"] - joined["Event_Date"]).dt.days
+    return joined
+
+
+def benchmark_change_points(diff_data, methods=('pelt', 'binseg', 'cusum'), include_markov=True):
+    """
+    Time each change point detector against the Markov-switching fit on the same series.
+
+    Returns:
+    --------
+    pd.DataFrame: Method, Seconds and Change_Points (regime switches for the Markov model).
+    """
+    rows = []
+    for method in methods:
+        start = time.perf_counter()
+        breakpoints = detect_change_points(diff_data, method)
+        rows.append({"Method": method, "Seconds": time.perf_counter() - start,
+                     "Change_Points": len(breakpoints)})
+
+    if include_markov:
+        from scripts.analyzer import fit_markov_switching_model
+
+        start = time.perf_counter()
+        results = fit_markov_switching_model(diff_data, use_cache=False)  # Time the fit, not a cache hit
+        seconds = time.perf_counter() - start
+        switches = None
+        if results is not None:
+            regimes = np.asarray(results.smoothed_marginal_probabilities)[:, 1] > 0.5
+            switches = int(np.count_nonzero(np.diff(regimes)))
+        rows.append({"Method": "markov_switching", "Seconds": seconds, "Change_Points": switches})
+
+    benchmark = pd.DataFrame(rows)
+    logger.info("Change point benchmark: \n%s", benchmark)
+    return benchmark
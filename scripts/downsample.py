@@ -0,0 +1,370 @@
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+def bucket_edges(n, n_buckets):
+    """
+    Split ``n`` consecutive rows into ``n_buckets`` contiguous, non-empty buckets.
+
+    Parameters:
+    -----------
+    n (int): Number of rows.
+    n_buckets (int): Requested number of buckets (capped at ``n``).
+
+    Returns:
+    --------
+    np.ndarray: ``n_buckets + 1`` increasing bucket edges, starting at 0 and ending at ``n``.
+    """
+    n_buckets = max(1, min(int(n_buckets), int(n)))
+    return (np.arange(n_buckets + 1, dtype='int64') * n) // n_buckets
+
+
+def ohlc_buckets(dates, opens, highs, lows, closes, n_buckets):
+    """
+    Aggregate OHLC rows into at most ``n_buckets`` OHLC buckets.
+
+    Each bucket is stamped with the date of its first row.
+
+    Returns:
+    --------
+    tuple: (dates, opens, highs, lows, closes) arrays of the buckets.
+    """
+    edges = bucket_edges(len(dates), n_buckets)
+    starts = edges[:-1]
+    return (
+        dates[starts],
+        opens[starts],
+        np.fmax.reduceat(highs, starts),
+        np.fmin.reduceat(lows, starts),
+        closes[edges[1:] - 1],
+    )
+
+
+def mean_buckets(dates, sums, counts, n_buckets):
+    """
+    Aggregate (sum, count) rows into at most ``n_buckets`` bucket means.
+
+    Returns:
+    --------
+    tuple: (dates, means) arrays of the buckets; empty buckets are NaN.
+    """
+    edges = bucket_edges(len(dates), n_buckets)
+    starts = edges[:-1]
+    totals = np.add.reduceat(sums, starts)
+    counts = np.add.reduceat(counts, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = totals / counts
+    return dates[starts], means
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Select ``n_out`` representative points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept and the interior is split into
+    ``n_out - 2`` buckets. From each bucket the point forming the largest
+    triangle with the neighbouring buckets' average points is kept. Using the
+    previous bucket's average (rather than its selected point) as the left
+    anchor removes the sequential dependency, so all buckets are scored in one
+    vectorized pass.
+
+    Parameters:
+    -----------
+    x (np.ndarray): Sorted x coordinates (numeric or datetime64).
+    y (np.ndarray): Values.
+    n_out (int): Number of points to keep.
+
+    Returns:
+    --------
+    np.ndarray: Sorted positions of the selected points.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 1)])
+
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').view('int64')
+    x = (x - x[0]).astype('float64')
+    y = np.asarray(y, dtype='float64')
+
+    # Interior buckets over positions 1 .. n - 2
+    edges = 1 + bucket_edges(n - 2, n_out - 2)
+    starts, stops = edges[:-1], edges[1:]
+    sizes = stops - starts
+    avg_x = np.add.reduceat(x, starts) / sizes
+    avg_y = np.add.reduceat(y, starts) / sizes
+
+    # Left anchors: first point, then previous bucket averages; right anchors: next bucket averages, then last point
+    left_x = np.concatenate(([x[0]], avg_x[:-1]))
+    left_y = np.concatenate(([y[0]], avg_y[:-1]))
+    right_x = np.concatenate((avg_x[1:], [x[-1]]))
+    right_y = np.concatenate((avg_y[1:], [y[-1]]))
+
+    # Score every candidate of every bucket in a padded (buckets x width) grid
+    positions = starts[:, None] + np.arange(sizes.max())[None, :]
+    in_bucket = positions < stops[:, None]
+    positions = np.minimum(positions, n - 2)
+    areas = np.abs(
+        (left_x[:, None] - right_x[:, None]) * (y[positions] - left_y[:, None])
+        - (left_x[:, None] - x[positions]) * (right_y[:, None] - left_y[:, None])
+    )
+    areas = np.where(in_bucket & ~np.isnan(areas), areas, -1.0)
+    chosen = positions[np.arange(len(starts)), areas.argmax(axis=1)]
+    return np.concatenate(([0], chosen, [n - 1]))
+
+
+# Pyramid file layout: a 128-byte header, a (n_rows, offset) entry per level,
+# then each level's columns in COLUMNS order, n_rows 8-byte values each
+PYRAMID_MAGIC = b'PXPYRMD1'
+PYRAMID_VERSION = 1
+PYRAMID_HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('n_levels', '<u4'),
+    ('date_unit', 'S8'),
+    ('source_digest', 'S64'),  # Digest of the data the levels were built from
+    ('padding', 'V40'),
+])
+PYRAMID_LEVEL_DTYPE = np.dtype([('n_rows', '<u8'), ('offset', '<u8')])
+# Columns stored as int64; dates as integers in the header's unit, the rest are float64
+_INT_COLUMNS = ('Date', 'Count')
+
+
+def align_date(value, dtype, round_up=False):
+    """
+    Convert a date to the unit of a datetime64 array so searches don't cast the array.
+
+    Parameters:
+    -----------
+    value (np.datetime64): The date.
+    dtype (np.dtype): The datetime64 dtype of the array being searched.
+    round_up (bool): Round a value between two units up instead of down, which keeps
+        an inclusive lower bound exact (e.g. 2020-01-01T12:00 -> 2020-01-02 for days).
+
+    Returns:
+    --------
+    np.datetime64: The date in the array's unit.
+    """
+    value = np.datetime64(value)
+    aligned = value.astype(dtype)
+    if round_up and aligned < value:
+        aligned = aligned + np.timedelta64(1, np.datetime_data(dtype)[0])
+    return aligned
+
+
+class PricePyramid:
+    """
+    Multi-resolution aggregates of a sorted price series for fast chart queries.
+
+    Level 0 holds the raw rows and each following level merges pairs of
+    buckets of the previous one, so level ``k`` aggregates ``2**k`` rows. A
+    query reads the finest level that holds at most ``oversample * max_points``
+    rows in the requested range and reduces only that slice to ``max_points``.
+
+    Pyramids can be saved to a file and memory-mapped back (``save``/``load``),
+    so server processes share one copy of the levels through the page cache.
+    """
+
+    AGGREGATIONS = ('lttb', 'mean', 'ohlc')
+    COLUMNS = ('Date', 'Open', 'High', 'Low', 'Close', 'Sum', 'Count')
+
+    def __init__(self, levels):
+        """
+        Wrap prebuilt levels; use ``build`` or ``load`` to create a pyramid.
+
+        Parameters:
+        -----------
+        levels (list of dict): Column name -> array for each level, finest first.
+        """
+        self.levels = list(levels)
+
+    @classmethod
+    def build(cls, dates, prices, min_points=256):
+        """
+        Build the pyramid.
+
+        Parameters:
+        -----------
+        dates (np.ndarray): Sorted datetime64 dates.
+        prices (np.ndarray): Prices aligned with ``dates``.
+        min_points (int): Stop coarsening once a level has at most this many rows.
+
+        Returns:
+        --------
+        PricePyramid: The pyramid.
+        """
+        prices = np.asarray(prices, dtype='float64')
+        missing = np.isnan(prices)
+        level = {
+            'Date': np.asarray(dates),
+            'Open': prices,
+            'High': prices,
+            'Low': prices,
+            'Close': prices,
+            'Sum': np.where(missing, 0.0, prices),
+            'Count': (~missing).astype('int64'),
+        }
+        levels = [level]
+        while len(level['Date']) > min_points:
+            level = cls._coarsen(level)
+            levels.append(level)
+        return cls(levels)
+
+    def save(self, path, source_digest=''):
+        """
+        Write the levels to a file, replacing it atomically.
+
+        Parameters:
+        -----------
+        path (str or Path): Destination file.
+        source_digest (str): Digest of the source data, checked by ``load``.
+
+        Returns:
+        --------
+        Path: The written file.
+        """
+        date_dtype = self.levels[0]['Date'].dtype
+        header = np.zeros(1, dtype=PYRAMID_HEADER_DTYPE)
+        header['magic'] = PYRAMID_MAGIC
+        header['version'] = PYRAMID_VERSION
+        header['n_levels'] = len(self.levels)
+        header['date_unit'] = np.datetime_data(date_dtype)[0].encode('ascii')
+        header['source_digest'] = source_digest.encode('ascii')
+
+        sizes = np.array([len(level['Date']) for level in self.levels], dtype='int64')
+        entries = np.zeros(len(self.levels), dtype=PYRAMID_LEVEL_DTYPE)
+        entries['n_rows'] = sizes
+        row_bytes = 8 * len(self.COLUMNS)
+        entries['offset'] = header.nbytes + entries.nbytes + row_bytes * np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(header.tobytes())
+                f.write(entries.tobytes())
+                for level in self.levels:
+                    for name in self.COLUMNS:
+                        values = level[name].view('int64') if name == 'Date' else level[name]
+                        dtype = '<i8' if name in _INT_COLUMNS else '<f8'
+                        f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return path
+
+    @classmethod
+    def load(cls, path, source_digest=None):
+        """
+        Memory-map a pyramid written by ``save``.
+
+        Parameters:
+        -----------
+        path (str or Path): The pyramid file.
+        source_digest (str or None): Expected digest of the source data (None skips the check).
+
+        Returns:
+        --------
+        PricePyramid: A pyramid whose levels are read-only memory maps.
+
+        Raises:
+        -------
+        ValueError: If the file is not a pyramid or was built from other data.
+        """
+        path = Path(path)
+        header = np.fromfile(path, dtype=PYRAMID_HEADER_DTYPE, count=1)
+        if len(header) != 1 or header['magic'][0] != PYRAMID_MAGIC:
+            raise ValueError(f"Not a price pyramid file: {path}")
+        if header['version'][0] != PYRAMID_VERSION:
+            raise ValueError(f"Unsupported price pyramid version {header['version'][0]} in {path}")
+        if source_digest is not None and header['source_digest'][0].decode('ascii') != source_digest:
+            raise ValueError(f"{path} was built from different data")
+
+        date_dtype = np.dtype(f"datetime64[{header['date_unit'][0].decode('ascii')}]")
+        entries = np.fromfile(path, dtype=PYRAMID_LEVEL_DTYPE, count=int(header['n_levels'][0]),
+                              offset=PYRAMID_HEADER_DTYPE.itemsize)
+        buffer = np.memmap(path, dtype='u1', mode='r')  # One mapping; the columns are views into it
+        levels = []
+        for n_rows, offset in entries.tolist():
+            level = {}
+            for j, name in enumerate(cls.COLUMNS):
+                start = offset + 8 * j * n_rows
+                values = buffer[start:start + 8 * n_rows].view('<i8' if name in _INT_COLUMNS else '<f8')
+                level[name] = values.view(date_dtype) if name == 'Date' else values
+            levels.append(level)
+        return cls(levels)
+
+    @staticmethod
+    def _coarsen(level):
+        """Merge consecutive pairs of buckets into the next level."""
+        size = len(level['Date'])
+        starts = np.arange(0, size, 2)
+        return {
+            'Date': level['Date'][starts],
+            'Open': level['Open'][starts],
+            'High': np.fmax.reduceat(level['High'], starts),
+            'Low': np.fmin.reduceat(level['Low'], starts),
+            'Close': level['Close'][np.minimum(starts + 1, size - 1)],
+            'Sum': np.add.reduceat(level['Sum'], starts),
+            'Count': np.add.reduceat(level['Count'], starts),
+        }
+
+    def query(self, start=None, end=None, max_points=1000, agg='lttb', oversample=4):
+        """
+        Return at most ``max_points`` aggregated points for an inclusive date range.
+
+        At coarse levels a bucket is included when its first date lies in the range.
+
+        Parameters:
+        -----------
+        start (np.datetime64 or None): Range start (inclusive).
+        end (np.datetime64 or None): Range end (inclusive).
+        max_points (int): Maximum number of points to return.
+        agg (str): One of 'lttb', 'mean' or 'ohlc'.
+        oversample (int): How many source rows per output point the chosen level may hold.
+
+        Returns:
+        --------
+        dict: Column name -> array; 'Date' and 'Price' for lttb/mean,
+        'Date', 'Open', 'High', 'Low' and 'Close' for ohlc.
+        """
+        if agg not in self.AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation: {agg}")
+        max_points = max(int(max_points), 1)
+
+        date_dtype = self.levels[0]['Date'].dtype
+        start = None if start is None else align_date(start, date_dtype, round_up=True)
+        end = None if end is None else align_date(end, date_dtype)
+
+        for level in self.levels:
+            dates = level['Date']
+            lo = 0 if start is None else int(np.searchsorted(dates, start, side='left'))
+            hi = len(dates) if end is None else int(np.searchsorted(dates, end, side='right'))
+            hi = max(lo, hi)
+            if hi - lo <= max_points * oversample:
+                break
+        rows = {name: values[lo:hi] for name, values in level.items()}
+        n = hi - lo
+
+        if agg == 'ohlc':
+            columns = (rows['Date'], rows['Open'], rows['High'], rows['Low'], rows['Close'])
+            if n > max_points:
+                columns = ohlc_buckets(*columns, max_points)
+            return dict(zip(('Date', 'Open', 'High', 'Low', 'Close'), columns))
+
+        if agg == 'mean' and n > max_points:
+            dates, means = mean_buckets(rows['Date'], rows['Sum'], rows['Count'], max_points)
+            return {'Date': dates, 'Price': means}
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = rows['Sum'] / rows['Count']
+        if agg == 'mean':
+            return {'Date': rows['Date'], 'Price': means}
+        keep = lttb_indices(rows['Date'], means, max_points)
+        return {'Date': rows['Date'][keep], 'Price': means[keep]}
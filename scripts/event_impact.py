@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+# Default event horizons in days (1, 3 and 6 months)
+DEFAULT_HORIZONS = (30, 90, 180)
+
+
+def horizon_label(days):
+    """
+    Build a short label for a horizon, e.g. 30 -> '1M', 90 -> '3M', 45 -> '45D'.
+
+    Parameters:
+    -----------
+    days (int): The horizon length in days.
+
+    Returns:
+    --------
+    str: The horizon label.
+    """
+    days = int(days)
+    if days > 0 and days % 30 == 0:
+        return f"{days // 30}M"
+    return f"{days}D"
+
+
+def _event_items(events):
+    """Return (date, name) pairs from a {date: name} mapping or an iterable of pairs."""
+    if hasattr(events, 'items'):
+        return list(events.items())
+    return list(events)
+
+
+def compute_event_impacts(df, events, horizons=DEFAULT_HORIZONS, column='Price'):
+    """
+    Compute the percentage price change around every event for every horizon.
+
+    For each (event, horizon) pair the price before is taken at the last
+    observation on or before ``event - horizon`` and the price after at the
+    first observation on or after ``event + horizon``. All pairs are resolved
+    with a single batched ``searchsorted`` over the sorted index, so the cost
+    is O((events x horizons) log N) instead of a boolean mask per lookup.
+
+    Parameters:
+    -----------
+    df (pd.DataFrame): The dataset containing the price column with a DatetimeIndex.
+    events (dict or iterable): Mapping of event date -> event name, or (date, name) pairs.
+    horizons (iterable of int): Horizons in days to evaluate for each event (repeats are ignored).
+    column (str): The price column to use.
+
+    Returns:
+    --------
+    pd.DataFrame: One row per (event, horizon), ordered event-major, with the columns
+    Event, Date, Horizon, Horizon_Days, Date_Before, Date_After, Price_Before,
+    Price_After and Change (percent). Pairs that fall outside the data, or whose price
+    before is zero, are NaN/NaT.
+    """
+    items = _event_items(events)
+    horizons = np.asarray(list(dict.fromkeys(int(days) for days in horizons)), dtype='int64')
+    index = pd.DatetimeIndex(df.index)
+    prices = df[column].to_numpy(dtype='float64')
+
+    if not index.is_monotonic_increasing:
+        order = np.argsort(index.values, kind='stable')
+        index = index[order]
+        prices = prices[order]
+
+    event_dates = pd.to_datetime([date for date, _ in items])
+    if index.tz is not None:
+        event_dates = event_dates.tz_localize(index.tz)
+
+    stamps = index.values.astype('datetime64[ns]')
+    event_ns = event_dates.values.astype('datetime64[ns]')[:, None]
+    offsets = horizons.astype('timedelta64[D]').astype('timedelta64[ns]')[None, :]
+
+    before_pos = np.searchsorted(stamps, (event_ns - offsets).ravel(), side='right') - 1
+    after_pos = np.searchsorted(stamps, (event_ns + offsets).ravel(), side='left')
+    valid = (before_pos >= 0) & (after_pos < len(stamps))
+
+    n_pairs = len(valid)
+    price_before = np.full(n_pairs, np.nan)
+    price_after = np.full(n_pairs, np.nan)
+    date_before = np.full(n_pairs, np.datetime64('NaT'), dtype='datetime64[ns]')
+    date_after = np.full(n_pairs, np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    price_before[valid] = prices[before_pos[valid]]
+    price_after[valid] = prices[after_pos[valid]]
+    date_before[valid] = stamps[before_pos[valid]]
+    date_after[valid] = stamps[after_pos[valid]]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (price_after - price_before) / price_before * 100
+    change[~np.isfinite(change)] = np.nan  # A zero price before has no percentage change
+
+    n_horizons = len(horizons)
+    return pd.DataFrame({
+        "Event": np.repeat([name for _, name in items], n_horizons),
+        "Date": np.repeat([str(date) for date, _ in items], n_horizons),
+        "Horizon": np.tile([horizon_label(h) for h in horizons], len(items)),
+        "Horizon_Days": np.tile(horizons, len(items)),
+        "Date_Before": date_before,
+        "Date_After": date_after,
+        "Price_Before": price_before,
+        "Price_After": price_after,
+        "Change": change,
+    })
+
+
+def event_changes_wide(impacts):
+    """
+    Pivot the tidy output of ``compute_event_impacts`` into one row per event.
+
+    Parameters:
+    -----------
+    impacts (pd.DataFrame): The tidy event-impact table.
+
+    Returns:
+    --------
+    pd.DataFrame: Columns Event, Date and one ``Change_<Horizon>`` column per horizon,
+    in the original event order.
+    """
+    labels = list(pd.unique(impacts['Horizon']))
+    n_horizons = max(len(labels), 1)
+    wide = impacts.iloc[::n_horizons][['Event', 'Date']].reset_index(drop=True)
+    changes = impacts['Change'].to_numpy().reshape(-1, n_horizons)
+    for j, label in enumerate(labels):
+        wide[f"Change_{label}"] = changes[:, j]
+    return wide
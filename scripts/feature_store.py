@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from src.storage import read_frame, write_frame
+from scripts.hashing import hash_rows
+
+logger = logging.getLogger(__name__)
+
+# The model inputs, in the order the LSTM and the dashboard backend expect them
+FEATURE_COLUMNS = ['GDP', 'CPI', 'Exchange_Rate', 'Price_Pct_Change',
+                   'GDP_Pct_Change', 'CPI_Pct_Change', 'Exchange_Rate_Pct_Change',
+                   'Price_MA7', 'Price_MA30', 'Price_Volatility']
+# Rows of history the widest rolling feature needs (Price_MA30 / Price_Volatility)
+FEATURE_LOOKBACK = 30
+# Bump when compute_features or the store layout changes so stored features are rebuilt
+FEATURE_VERSION = 2
+# Input data files and the column each one contributes to the merged data
+INPUT_FILES = {
+    'Price': 'BrentOilPrices.csv',
+    'GDP': 'GDP_cleaned_data_daily.csv',
+    'CPI': 'CPI_cleaned_data_daily.csv',
+    'Exchange_Rate': 'Exchange_Rate_cleaned_data_daily.csv',
+}
+
+
+def merge_inputs(oil_data, gdp_data, cpi_data, exchange_rate_data):
+    """
+    Merge the price and indicator data on their common dates.
+
+    Returns:
+        pd.DataFrame: Price, GDP, CPI and Exchange_Rate columns without missing values.
+    """
+    merged_data = pd.concat([oil_data, gdp_data, cpi_data, exchange_rate_data],
+                            axis=1, join='inner')
+    merged_data.columns = list(INPUT_FILES)
+    return merged_data.dropna()
+
+
+def compute_features(data):
+    """
+    Engineer the model features from the merged Price/GDP/CPI/Exchange_Rate data.
+
+    Args:
+        data (pd.DataFrame): Output of PricePredictor.merge_data.
+
+    Returns:
+        pd.DataFrame: The input columns plus the engineered features, without incomplete rows.
+    """
+    feature_data = data.copy()
+
+    # Calculate percentage changes
+    feature_data['Price_Pct_Change'] = feature_data['Price'].pct_change()
+    feature_data['GDP_Pct_Change'] = feature_data['GDP'].pct_change()
+    feature_data['CPI_Pct_Change'] = feature_data['CPI'].pct_change()
+    feature_data['Exchange_Rate_Pct_Change'] = feature_data['Exchange_Rate'].pct_change()
+
+    # Moving averages
+    feature_data['Price_MA7'] = feature_data['Price'].rolling(window=7).mean()
+    feature_data['Price_MA30'] = feature_data['Price'].rolling(window=30).mean()
+
+    # Volatility
+    feature_data['Price_Volatility'] = feature_data['Price'].rolling(window=30).std()
+
+    return feature_data.dropna()
+
+
+class FeatureStore:
+    """
+    Persisted feature matrix keyed by a content hash of the merged input data.
+
+    Unchanged inputs reuse the stored features as they are. When the inputs
+    only gained rows at the end, just the new rows are computed, from a slice
+    that starts ``lookback`` rows before them; any other change rebuilds
+    everything.
+
+    Several processes may share a store (e.g. the backend workers). Every
+    version of the features goes to its own file named after the input hash,
+    and the metadata that points to it is renamed into place last, so a reader
+    always sees a matching pair of metadata and features.
+    """
+
+    def __init__(self, path="data/features", lookback=FEATURE_LOOKBACK):
+        """
+        Initialize the store.
+
+        Args:
+            path (str or Path): Base path of the store: the features are written to <path>-<input hash>
+                (the extension follows src.storage.DATA_FORMAT) and the metadata to <path>.json.
+            lookback (int): Rows of history needed to compute the features of one new row.
+        """
+        self.path = Path(path)
+        self.meta_path = self.path.with_name(self.path.name + ".json")
+        self.lookback = lookback
+        self.last_status = None  # 'hit', 'append' or 'rebuild' for the last call to features()
+
+    def _read_meta(self):
+        """Return the stored metadata, or None if there is no usable store."""
+        try:
+            meta = json.loads(self.meta_path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read feature store metadata: {e}")
+            return None
+        return meta if meta.get('version') == FEATURE_VERSION else None
+
+    def _save(self, features, row_hashes):
+        """
+        Write the features and the hash of the inputs they were built from.
+
+        Both files are written under temporary names and renamed into place,
+        the metadata last; older feature files are removed afterwards.
+        """
+        input_hash = hash_rows(row_hashes)
+        base = f"{self.path.name}-{input_hash[:16]}"
+        tmp_path = write_frame(features, self.path.with_name(f"{base}.{os.getpid()}.tmp"))
+        data_path = self.path.with_name(base + tmp_path.suffix)
+        os.replace(tmp_path, data_path)
+
+        tmp_meta_path = self.meta_path.with_name(f"{self.meta_path.name}.{os.getpid()}.tmp")
+        tmp_meta_path.write_text(json.dumps({
+            'version': FEATURE_VERSION,
+            'file': data_path.name,
+            'input_hash': input_hash,
+            'n_input_rows': len(row_hashes),
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+        }))
+        os.replace(tmp_meta_path, self.meta_path)
+
+        for old_path in self.path.parent.glob(f"{self.path.name}-*"):
+            if old_path != data_path and '.tmp' not in old_path.suffixes:
+                old_path.unlink(missing_ok=True)
+
+    def features(self, merged_data):
+        """
+        Return the feature matrix for the merged data, reusing stored features where possible.
+
+        Args:
+            merged_data (pd.DataFrame): Output of PricePredictor.merge_data.
+
+        Returns:
+            pd.DataFrame: Same result as compute_features(merged_data).
+        """
+        row_hashes = pd.util.hash_pandas_object(merged_data, index=True).to_numpy()
+        meta = self._read_meta()
+        stored = None
+        n_stored = 0
+        if meta is not None and meta['n_input_rows'] <= len(row_hashes) \
+                and hash_rows(row_hashes[:meta['n_input_rows']]) == meta['input_hash']:
+            try:
+                stored = read_frame(self.path.with_name(meta['file']))
+                n_stored = meta['n_input_rows']
+            except (FileNotFoundError, OSError, ValueError) as e:
+                logger.warning(f"Could not read stored features: {e}")
+
+        if stored is not None and n_stored == len(merged_data):
+            self.last_status = 'hit'
+            logger.info("Inputs unchanged; using stored features.")
+            return stored
+
+        if stored is not None and n_stored >= self.lookback:
+            self.last_status = 'append'
+            new_index = merged_data.index[n_stored:]
+            tail = compute_features(merged_data.iloc[n_stored - self.lookback:])
+            tail = tail[tail.index.isin(new_index)]
+            features = pd.concat([stored, tail[stored.columns]])
+            logger.info(f"Computed features for {len(new_index)} appended rows.")
+        else:
+            self.last_status = 'rebuild'
+            features = compute_features(merged_data)
+            logger.info(f"Rebuilt features for {len(merged_data)} rows.")
+
+        try:
+            self._save(features, row_hashes)
+        except Exception as e:
+            # The features are still valid; they are just recomputed next time
+            logger.error(f"Could not save features to {self.path}: {e}")
+        return features
+
+
+def load_features(data_path="data", store_path=None):
+    """
+    Read the input files from a data directory and return their feature matrix via the feature store.
+
+    Args:
+        data_path (str or Path): Directory with the input files (columnar copies are used when available).
+        store_path (str or Path): Feature store base path (default: <data_path>/features).
+
+    Returns:
+        pd.DataFrame: The merged inputs and engineered features indexed by Date.
+    """
+    data_path = Path(data_path)
+    frames = [read_frame(data_path / file_name) for file_name in INPUT_FILES.values()]
+    store = FeatureStore(store_path or data_path / "features")
+    return store.features(merge_inputs(*frames))
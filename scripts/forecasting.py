@@ -0,0 +1,152 @@
+import logging
+
+import numpy as np
+
+from scripts.event_impact import DEFAULT_HORIZONS
+from scripts.feature_store import FEATURE_COLUMNS, FEATURE_LOOKBACK
+from scripts.lstm_runtime import NumpyLSTM
+
+logger = logging.getLogger(__name__)
+
+# Forecast lengths offered by default in calendar days, matching the event analysis horizons
+FORECAST_HORIZONS = DEFAULT_HORIZONS
+# Default number of forecast steps: about six months of trading days
+FORECAST_STEPS = 126
+# Indicator columns held at their last known value over a feature-model forecast
+HELD_INDICATORS = ['GDP', 'CPI', 'Exchange_Rate']
+
+
+def horizon_steps(start_dates, horizon_days):
+    """
+    Convert a horizon in calendar days into forecast steps (trading days) for each start date.
+
+    The models step one trading day at a time, so a 30-day horizon from a
+    Friday covers the weekdays in the 30 calendar days that follow it.
+
+    Parameters:
+    -----------
+    start_dates (array-like): Start dates (datetime64 or date strings).
+    horizon_days (int): The horizon in calendar days.
+
+    Returns:
+    --------
+    tuple: (steps, dates) where steps is an int array with one entry per start date and dates
+    holds each start's trading dates (datetime64[D] arrays of length steps).
+    """
+    start_days = np.asarray(start_dates, dtype='datetime64[D]')
+    steps = np.busday_count(start_days + 1, start_days + int(horizon_days) + 1)
+    dates = [np.busday_offset(start, np.arange(1, n + 1), roll='forward') for start, n in zip(start_days, steps)]
+    return steps, dates
+
+
+def _as_runtime(model):
+    """Return a NumpyLSTM for a runtime or a trained Keras model."""
+    return model if isinstance(model, NumpyLSTM) else NumpyLSTM.from_keras(model)
+
+
+def forecast_sequence(model, history, steps=FORECAST_STEPS, scaler=None, mode='stateful'):
+    """
+    Roll the price sequence model (analyzer.build_lstm_model) forward recursively.
+
+    Each predicted price is fed back as the next input. In 'stateful' mode the
+    starting windows are run once and only the newest value is fed per step,
+    carrying the LSTM states forward, so a step costs one cell update per layer
+    instead of a full window; the state then summarizes the whole path rather
+    than exactly the last ``time_step`` values. 'window' mode re-runs the
+    sliding window at every step, exactly as the model was trained.
+
+    Parameters:
+    -----------
+    model (NumpyLSTM or keras.Model): The trained sequence model.
+    history (np.ndarray): The last time_step prices before each starting point, shape (time_step,)
+        for one scenario or (n_scenarios, time_step) for a batch.
+    steps (int): Number of trading days to forecast (see horizon_steps for calendar-day horizons).
+    scaler (MinMaxScaler): The price scaler from preprocess_data (None if history is already scaled).
+    mode (str): 'stateful' or 'window'.
+
+    Returns:
+    --------
+    np.ndarray: Forecast paths of shape (n_scenarios, steps) (or (steps,) for a single scenario).
+    """
+    if mode not in ('stateful', 'window'):
+        raise ValueError(f"Unsupported forecast mode: {mode}")
+    history = np.asarray(history, dtype='float64')
+    single = history.ndim == 1
+    x = np.atleast_2d(history)
+    if scaler is not None:
+        x = scaler.transform(x.reshape(-1, 1)).reshape(x.shape)
+
+    runtime = _as_runtime(model)
+    path = np.empty((len(x), steps))
+    if mode == 'stateful':
+        out, states = runtime.run(x[..., None])
+        for step in range(steps):
+            path[:, step] = out[:, 0]
+            if step + 1 < steps:
+                out, states = runtime.run(out[:, None, :1], states)
+    else:
+        window = x.copy()
+        for step in range(steps):
+            path[:, step] = runtime.predict_on_batch(window[..., None])[:, 0]
+            window = np.concatenate([window[:, 1:], path[:, step:step + 1]], axis=1)
+
+    if scaler is not None:
+        path = scaler.inverse_transform(path.reshape(-1, 1)).reshape(path.shape)
+    return path[0] if single else path
+
+
+def _price_features(window, indicators):
+    """
+    Build the model feature rows from each scenario's recent prices and held indicator values.
+
+    The price features follow scripts.feature_store.compute_features; the held
+    indicators have zero percentage change.
+    """
+    features = {
+        **dict(zip(HELD_INDICATORS, indicators.T)),
+        'Price_Pct_Change': window[:, -1] / window[:, -2] - 1.0,
+        'GDP_Pct_Change': np.zeros(len(window)),
+        'CPI_Pct_Change': np.zeros(len(window)),
+        'Exchange_Rate_Pct_Change': np.zeros(len(window)),
+        'Price_MA7': window[:, -7:].mean(axis=1),
+        'Price_MA30': window[:, -30:].mean(axis=1),
+        'Price_Volatility': window[:, -30:].std(axis=1, ddof=1),
+    }
+    return np.column_stack([features[name] for name in FEATURE_COLUMNS])
+
+
+def forecast_features(model, X_scaler, y_scaler, prices, indicators, steps=FORECAST_STEPS):
+    """
+    Roll the feature model (AdaptingModel.PricePredictor) forward recursively.
+
+    At each step the price features (percentage change, MA7, MA30, 30-day
+    volatility) are recomputed from the path so far, GDP, CPI and the exchange
+    rate are held at their last values, and the prediction becomes the next
+    price. All scenarios advance together in one model call per step. The model
+    sees one-row sequences from a zero state, as in training, so there is no
+    LSTM state to carry between steps.
+
+    Parameters:
+    -----------
+    model: The trained feature model (NumpyLSTM or keras.Model; anything with predict_on_batch).
+    X_scaler, y_scaler: The fitted feature and price scalers.
+    prices (np.ndarray): At least FEATURE_LOOKBACK recent prices per scenario, shape (n_scenarios, n).
+    indicators (np.ndarray): The last GDP, CPI and Exchange_Rate per scenario, shape (n_scenarios, 3).
+    steps (int): Number of trading days to forecast (see horizon_steps for calendar-day horizons).
+
+    Returns:
+    --------
+    np.ndarray: Forecast paths of shape (n_scenarios, steps).
+    """
+    window = np.atleast_2d(np.asarray(prices, dtype='float64'))[:, -FEATURE_LOOKBACK:]
+    indicators = np.atleast_2d(np.asarray(indicators, dtype='float64'))
+    if window.shape[1] < FEATURE_LOOKBACK:
+        raise ValueError(f"At least {FEATURE_LOOKBACK} prices of history are needed per scenario.")
+
+    path = np.empty((len(window), steps))
+    for step in range(steps):
+        X = X_scaler.transform(_price_features(window, indicators))
+        predictions = np.asarray(model.predict_on_batch(X[:, None, :])).reshape(-1, 1)
+        path[:, step] = np.asarray(y_scaler.inverse_transform(predictions)).ravel()
+        window = np.concatenate([window[:, 1:], path[:, step:step + 1]], axis=1)
+    return path
@@ -0,0 +1,209 @@
+import logging
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import stats
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ('indicator->price', 'price->indicator')
+
+# F statistics and p-values with shape (indicator, lag, direction); df_resid has one entry per indicator and lag
+GrangerResults = namedtuple('GrangerResults', ['indicators', 'lags', 'directions', 'f_stat', 'p_value', 'df_resid'])
+
+
+def lag_matrix(x, max_lag):
+    """
+    Build the lagged copies of one or more series as a strided view.
+
+    Parameters:
+    -----------
+    x (np.ndarray): Series of shape (N,) or (m, N).
+    max_lag (int): Number of lags.
+
+    Returns:
+    --------
+    np.ndarray: Read-only view of shape (..., N - max_lag, max_lag) where column j holds
+    x[t - j - 1] for t = max_lag .. N - 1.
+    """
+    x = np.asarray(x, dtype='float64')
+    return sliding_window_view(x[..., :-1], max_lag, axis=-1)[..., ::-1]
+
+
+def _prefix_ssr(design, targets, tol=1e-10):
+    """
+    Residual sums of squares of every leading-column sub-model from one QR factorization.
+
+    With design = QR, regressing on the first j + 1 columns leaves
+    |t|^2 - sum((Q^T t)[:j + 1]^2), so one factorization scores all nested models.
+
+    Parameters:
+    -----------
+    design (np.ndarray): Regressors of shape (..., n, k).
+    targets (np.ndarray): Targets of shape (..., n, t).
+
+    Returns:
+    --------
+    np.ndarray: Shape (..., k, t); entry j is the SSR using the first j + 1 columns
+    (NaN once a column is collinear with the ones before it).
+    """
+    q, r = np.linalg.qr(design)
+    qty = np.swapaxes(q, -1, -2) @ targets
+    total = np.sum(targets ** 2, axis=-2, keepdims=True)
+    ssr = np.maximum(total - np.cumsum(qty ** 2, axis=-2), 0.0)
+
+    diag = np.abs(np.diagonal(r, axis1=-2, axis2=-1))
+    singular = np.cumsum(diag <= tol * np.max(diag, axis=-1, keepdims=True), axis=-1) > 0
+    return np.where(singular[..., None], np.nan, ssr)
+
+
+def _granger_block(price, indicators, max_lag):
+    """
+    Granger F-tests for a block of indicators observed on the same rows as the price.
+
+    Parameters:
+    -----------
+    price (np.ndarray): Price series of shape (N,).
+    indicators (np.ndarray): Indicator series of shape (m, N).
+    max_lag (int): Largest lag order.
+
+    Returns:
+    --------
+    tuple: (f_stat, p_value) of shape (m, max_lag, 2) and df_resid of shape (max_lag,).
+    """
+    m, N = indicators.shape
+    lags = np.arange(1, max_lag + 1)
+    n = N - max_lag
+    df_resid = n - 2 * lags - 1
+    if m == 0 or np.any(df_resid <= 0):
+        return np.full((m, max_lag, 2), np.nan), np.full((m, max_lag, 2), np.nan), df_resid
+
+    # Centered targets give the same SSRs (every model has a constant) with less cancellation
+    y = price[max_lag:] - price[max_lag:].mean()
+    x = indicators[:, max_lag:] - indicators[:, max_lag:].mean(axis=1, keepdims=True)
+    y_lags = lag_matrix(price, max_lag)
+    x_lags = lag_matrix(indicators, max_lag)
+    ones = np.ones((n, 1))
+
+    # Restricted models regress each series on its own lags; the price one is shared by every indicator
+    ssr_price_own = _prefix_ssr(np.hstack([ones, y_lags]), y[:, None])[1:, 0]
+    own_design = np.concatenate([np.broadcast_to(ones, (m, n, 1)), x_lags], axis=-1)
+    ssr_indicator_own = _prefix_ssr(own_design, x[..., None])[:, 1:, 0]
+    restricted = np.stack([np.broadcast_to(ssr_price_own, (m, max_lag)), ssr_indicator_own], axis=-1)
+
+    # Unrestricted models: the leading 1 + 2p columns of [1, y_1, x_1, ..., y_p, x_p] span the
+    # lag-p model of either direction, so one factorization serves both targets and all lags
+    design = np.empty((m, n, 1 + 2 * max_lag))
+    design[..., 0] = 1.0
+    design[..., 1::2] = y_lags
+    design[..., 2::2] = x_lags
+    targets = np.stack([np.broadcast_to(y, (m, n)), x], axis=-1)
+    unrestricted = _prefix_ssr(design, targets)[:, 2::2, :]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_stat = ((restricted - unrestricted) / lags[:, None]) / (unrestricted / df_resid[:, None])
+    p_value = stats.f.sf(f_stat, lags[:, None], df_resid[:, None])
+    return f_stat, p_value, df_resid
+
+
+def _granger_tasks(data, indicators, target, chunk_size):
+    """
+    Split the indicators into blocks that share their valid rows with the target.
+
+    Yields:
+    -------
+    tuple: (positions, price, indicator matrix) for each block of at most chunk_size indicators.
+    """
+    target_valid = data[target].notna().to_numpy()
+    groups = {}
+    for position, name in enumerate(indicators):
+        valid = target_valid & data[name].notna().to_numpy()
+        groups.setdefault(np.packbits(valid).tobytes(), (valid, []))[1].append(position)
+
+    for valid, positions in groups.values():
+        price = data[target].to_numpy(dtype='float64')[valid]
+        for start in range(0, len(positions), chunk_size):
+            block = positions[start:start + chunk_size]
+            values = data[[indicators[i] for i in block]].to_numpy(dtype='float64')[valid].T
+            yield block, price, np.ascontiguousarray(values)
+
+
+def batch_granger_causality(data, indicators=None, target='Price', max_lag=12, n_jobs=1, chunk_size=32):
+    """
+    Run Granger causality F-tests for many indicators, both directions and all lags at once.
+
+    The lag design matrices are strided views of each series, and every lag
+    order of a test is read off a single QR factorization, so each indicator
+    costs three factorizations instead of 4 * max_lag separate OLS fits. All lag
+    orders use the same estimation sample (rows max_lag onwards), so results for
+    lags below max_lag differ slightly from statsmodels' grangercausalitytests,
+    which trims each lag order separately. F-tests are invariant to rescaling the
+    series, so no standardization is needed.
+
+    Parameters:
+    -----------
+    data (pd.DataFrame): The target price and indicator columns, aligned on the same index.
+    indicators (list): Indicator columns to test (default: every column except the target).
+    target (str): The price column.
+    max_lag (int): Largest lag order.
+    n_jobs (int): Worker processes for the blocks of indicators (1 runs in-process).
+    chunk_size (int): Indicators factorized together in one stacked QR.
+
+    Returns:
+    --------
+    GrangerResults: F statistics and p-values of shape (indicator, lag, direction), where
+    direction 0 tests indicator -> price and direction 1 tests price -> indicator.
+    """
+    indicators = [c for c in data.columns if c != target] if indicators is None else list(indicators)
+    f_stat = np.full((len(indicators), max_lag, 2), np.nan)
+    p_value = np.full((len(indicators), max_lag, 2), np.nan)
+    df_resid = np.zeros((len(indicators), max_lag), dtype='int64')
+
+    tasks = list(_granger_tasks(data, indicators, target, chunk_size))
+    logger.info(f"Running Granger causality tests for {len(indicators)} indicators in {len(tasks)} blocks.")
+    if n_jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn")) as executor:
+            outputs = list(executor.map(_granger_block, [task[1] for task in tasks], [task[2] for task in tasks],
+                                        [max_lag] * len(tasks)))
+    else:
+        outputs = [_granger_block(price, values, max_lag) for _, price, values in tasks]
+
+    for (block, _, _), (block_f, block_p, block_df) in zip(tasks, outputs):
+        f_stat[block], p_value[block], df_resid[block] = block_f, block_p, block_df
+    return GrangerResults(indicators, np.arange(1, max_lag + 1), DIRECTIONS, f_stat, p_value, df_resid)
+
+
+def granger_table(results):
+    """
+    Flatten GrangerResults into a tidy DataFrame.
+
+    Returns:
+    --------
+    pd.DataFrame: Indicator, Lag, Direction, F_Stat, P_Value and DF_Resid, one row per test.
+    """
+    m, n_lags, n_directions = results.f_stat.shape
+    return pd.DataFrame({
+        "Indicator": np.repeat(results.indicators, n_lags * n_directions),
+        "Lag": np.tile(np.repeat(results.lags, n_directions), m),
+        "Direction": np.tile(results.directions, m * n_lags),
+        "F_Stat": results.f_stat.ravel(),
+        "P_Value": results.p_value.ravel(),
+        "DF_Resid": np.repeat(results.df_resid.ravel(), n_directions),
+    })
+
+
+def lagged_correlations(data, indicators=None, target='Price', max_lag=12):
+    """
+    Correlate each indicator, shifted by 0 .. max_lag rows, with the target.
+
+    Returns:
+    --------
+    pd.DataFrame: Indicators as rows and lags as columns.
+    """
+    indicators = [c for c in data.columns if c != target] if indicators is None else list(indicators)
+    values = data[indicators]
+    return pd.DataFrame({lag: values.shift(lag).corrwith(data[target]) for lag in range(max_lag + 1)})
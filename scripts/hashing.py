@@ -0,0 +1,21 @@
+import hashlib
+
+import numpy as np
+
+
+def hash_rows(row_hashes):
+    """
+    Hash a block of per-row hashes into one content hash.
+
+    Prefixes of the same rows hash the same way, so a cache keyed by this hash
+    can detect appended rows by rehashing only its own row count.
+
+    Parameters:
+    -----------
+    row_hashes (np.ndarray): Per-row hashes, e.g. from pd.util.hash_pandas_object.
+
+    Returns:
+    --------
+    str: The SHA-256 hex digest.
+    """
+    return hashlib.sha256(np.ascontiguousarray(row_hashes).tobytes()).hexdigest()
@@ -0,0 +1,345 @@
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Largest absolute difference from Keras (on the scaled output) an export may have
+PARITY_TOLERANCE = 1e-5
+
+_ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'tanh': np.tanh,
+    'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-x)),
+    'hard_sigmoid': lambda x: np.clip(0.2 * x + 0.5, 0.0, 1.0),
+}
+
+
+def _activation(name):
+    """Return the NumPy implementation of a Keras activation by name."""
+    if name not in _ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {name}")
+    return _ACTIVATIONS[name]
+
+
+class MinMaxParams:
+    """
+    The fitted parameters of a sklearn MinMaxScaler, without sklearn.
+    """
+
+    def __init__(self, scale, min_):
+        self.scale_ = np.asarray(scale, dtype='float64')
+        self.min_ = np.asarray(min_, dtype='float64')
+
+    @classmethod
+    def from_scaler(cls, scaler):
+        """Copy the parameters of a fitted MinMaxScaler."""
+        return cls(scaler.scale_, scaler.min_)
+
+    def transform(self, X):
+        """Scale X the same way MinMaxScaler.transform does."""
+        return np.asarray(X, dtype='float64') * self.scale_ + self.min_
+
+    def inverse_transform(self, X):
+        """Undo the scaling the same way MinMaxScaler.inverse_transform does."""
+        return (np.asarray(X, dtype='float64') - self.min_) / self.scale_
+
+
+class NumpyLSTM:
+    """
+    Pure-NumPy forward pass for a Sequential stack of Keras LSTM and Dense layers.
+    """
+
+    def __init__(self, layers):
+        """
+        Initialize the runtime.
+
+        Args:
+            layers (list): Layer dicts with a 'type' ('lstm' or 'dense'), its weight
+                arrays and activation names, as written by export_lstm_model.
+        """
+        self.layers = layers
+
+    @staticmethod
+    def lstm_step(z, c, units, activation, recurrent_activation):
+        """
+        Apply one LSTM cell update from the pre-activations z = x W + h U + b.
+
+        Returns:
+            tuple: The new (h, c) states.
+        """
+        i = recurrent_activation(z[:, :units])
+        f = recurrent_activation(z[:, units:2 * units])
+        g = activation(z[:, 2 * units:3 * units])
+        o = recurrent_activation(z[:, 3 * units:])
+        c = f * c + i * g
+        return o * activation(c), c
+
+    @classmethod
+    def from_keras(cls, model):
+        """Build the runtime directly from a trained Keras Sequential model."""
+        return cls(_build_layers(*_layer_arrays(model)))
+
+    def _lstm(self, layer, x, state=None, return_sequences=None):
+        """
+        Run one LSTM layer over a (batch, steps, features) input, starting from an optional (h, c) state.
+
+        Returns:
+            tuple: The layer output and the final (h, c) state.
+        """
+        units = layer['recurrent_kernel'].shape[0]
+        activation = _activation(layer['activation'])
+        recurrent_activation = _activation(layer['recurrent_activation'])
+        if return_sequences is None:
+            return_sequences = layer['return_sequences']
+
+        # Input projections for every time step in one matrix product
+        xw = x @ layer['kernel'] + layer['bias']
+        if state is None:
+            h = np.zeros((x.shape[0], units))
+            c = np.zeros((x.shape[0], units))
+        else:
+            h, c = state
+        outputs = []
+        for t in range(x.shape[1]):
+            z = xw[:, t] + h @ layer['recurrent_kernel']
+            h, c = self.lstm_step(z, c, units, activation, recurrent_activation)
+            if return_sequences:
+                outputs.append(h)
+        return (np.stack(outputs, axis=1) if return_sequences else h), (h, c)
+
+    def predict_on_batch(self, x):
+        """
+        Run the network on a (batch, steps, features) array.
+
+        Returns:
+            np.ndarray: The output of the last layer.
+        """
+        out = np.asarray(x, dtype='float64')
+        for layer in self.layers:
+            if layer['type'] == 'lstm':
+                out, _ = self._lstm(layer, out)
+            else:
+                out = _activation(layer['activation'])(out @ layer['kernel'] + layer['bias'])
+        return out
+
+    predict = predict_on_batch
+
+    def run(self, x, states=None):
+        """
+        Continue the network over more time steps from the LSTM states of an earlier call.
+
+        Every LSTM layer carries its (h, c) state across calls, so feeding a
+        sequence in pieces gives the same output as one predict_on_batch call
+        on the whole sequence.
+
+        Args:
+            x (np.ndarray): Inputs of shape (batch, steps, features).
+            states (list): Per-LSTM-layer (h, c) states returned by a previous call (None starts from zero).
+
+        Returns:
+            tuple: (output of the last layer after the last step, new states).
+        """
+        out = np.asarray(x, dtype='float64')
+        new_states = []
+        for layer in self.layers:
+            if layer['type'] == 'lstm':
+                state = states[len(new_states)] if states is not None else None
+                # Intermediate layers need the whole sequence; the last step is taken before the Dense head
+                out, state = self._lstm(layer, out, state, return_sequences=True)
+                new_states.append(state)
+            else:
+                if out.ndim == 3:
+                    out = out[:, -1]
+                out = _activation(layer['activation'])(out @ layer['kernel'] + layer['bias'])
+        if out.ndim == 3:
+            out = out[:, -1]
+        return out, new_states
+
+
+def _layer_arrays(model):
+    """
+    Collect the layer configs and float64 weights of a Keras Sequential model of LSTM and Dense layers.
+
+    Returns:
+        tuple: (list of layer config dicts, dict of 'layer{i}_{name}' -> weight array).
+    """
+    arrays = {}
+    config = []
+    for i, layer in enumerate(model.layers):
+        layer_config = layer.get_config()
+        weights = layer.get_weights()
+        kind = type(layer).__name__.lower()
+        if kind == 'lstm':
+            names = ('kernel', 'recurrent_kernel', 'bias')
+            config.append({
+                'type': 'lstm',
+                'activation': layer_config['activation'],
+                'recurrent_activation': layer_config['recurrent_activation'],
+                'return_sequences': layer_config['return_sequences'],
+            })
+        elif kind == 'dense':
+            names = ('kernel', 'bias')
+            config.append({'type': 'dense', 'activation': layer_config['activation']})
+        else:
+            raise ValueError(f"Unsupported layer type: {type(layer).__name__}")
+        for name, weight in zip(names, weights):
+            arrays[f"layer{i}_{name}"] = weight.astype('float64')
+    return config, arrays
+
+
+def _build_layers(config, arrays):
+    """Combine layer configs with their 'layer{i}_{name}' weight arrays into NumpyLSTM layer dicts."""
+    layers = []
+    for i, layer in enumerate(config):
+        names = ('kernel', 'recurrent_kernel', 'bias') if layer['type'] == 'lstm' else ('kernel', 'bias')
+        layers.append({**layer, **{name: arrays[f"layer{i}_{name}"] for name in names}})
+    return layers
+
+
+def export_lstm_model(model, X_scaler, y_scaler, output_path):
+    """
+    Write the weights of a trained Keras model and its MinMaxScaler parameters to an .npz file.
+
+    Args:
+        model (keras.Model): A Sequential model of LSTM and Dense layers.
+        X_scaler (MinMaxScaler): Fitted feature scaler.
+        y_scaler (MinMaxScaler): Fitted target scaler.
+        output_path (str or Path): Destination .npz file.
+    """
+    config, arrays = _layer_arrays(model)
+    np.savez_compressed(
+        output_path,
+        config=np.array(json.dumps(config)),
+        X_scale=X_scaler.scale_, X_min=X_scaler.min_,
+        y_scale=y_scaler.scale_, y_min=y_scaler.min_,
+        **arrays,
+    )
+    logger.info(f"Exported LSTM runtime to {output_path}.")
+
+
+def load_lstm_runtime(path):
+    """
+    Load an exported model.
+
+    Args:
+        path (str or Path): The .npz file written by export_lstm_model.
+
+    Returns:
+        tuple: (NumpyLSTM, X_scaler, y_scaler) with MinMaxParams scalers.
+    """
+    with np.load(path) as data:
+        layers = _build_layers(json.loads(str(data['config'])), data)
+        X_scaler = MinMaxParams(data['X_scale'], data['X_min'])
+        y_scaler = MinMaxParams(data['y_scale'], data['y_min'])
+    return NumpyLSTM(layers), X_scaler, y_scaler
+
+
+def check_parity(keras_model, runtime, X_scaler, n_samples=256, seed=0):
+    """
+    Compare NumPy and Keras predictions on random inputs within the scaler's fitted range.
+
+    Returns:
+        float: The largest absolute difference between the scaled predictions.
+    """
+    rng = np.random.default_rng(seed)
+    n_features = len(X_scaler.scale_)
+    steps = keras_model.input_shape[1] or 1
+    x = rng.uniform(0.0, 1.0, size=(n_samples, steps, n_features))
+    expected = np.asarray(keras_model.predict(x, verbose=0), dtype='float64')
+    actual = runtime.predict_on_batch(x)
+    return float(np.max(np.abs(expected - actual)))
+
+
+_STARTUP_SNIPPETS = {
+    'keras': (
+        "from tensorflow.keras.models import load_model\n"
+        "from tensorflow.keras.metrics import MeanSquaredError\n"
+        "load_model({model!r}, custom_objects={{'mse': MeanSquaredError()}})\n"
+    ),
+    'numpy': (
+        "import sys\n"
+        "sys.path.insert(0, {root!r})\n"
+        "from scripts.lstm_runtime import load_lstm_runtime\n"
+        "load_lstm_runtime({npz!r})\n"
+    ),
+}
+
+
+def compare_startup(model_path, npz_path):
+    """
+    Measure cold-start time and peak RSS of loading each runtime in a fresh interpreter.
+
+    Returns:
+        dict: Runtime name -> {'seconds': float, 'max_rss_mb': float}.
+    """
+    root = str(Path(__file__).resolve().parents[1])
+    results = {}
+    for name, snippet in _STARTUP_SNIPPETS.items():
+        code = (
+            "import resource, time\n"
+            "start = time.perf_counter()\n"
+            + snippet.format(model=str(model_path), npz=str(npz_path), root=root)
+            + "print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        seconds, max_rss_kb = output.stdout.split()[-2:]
+        results[name] = {'seconds': float(seconds), 'max_rss_mb': float(max_rss_kb) / 1024}
+        logger.info(f"{name} runtime: {results[name]['seconds']:.2f}s, {results[name]['max_rss_mb']:.0f} MB peak RSS")
+    return results
+
+
+def main():
+    """
+    Export models/lstm_model.h5 and its scalers, then check parity and startup cost.
+
+    The .npz file only replaces an earlier export when its predictions match
+    Keras within --tolerance; otherwise the exit status is 1.
+    """
+    import joblib
+    from tensorflow.keras.models import load_model
+    from tensorflow.keras.metrics import MeanSquaredError
+
+    parser = argparse.ArgumentParser(description="Export the dashboard LSTM to a NumPy runtime.")
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--tolerance", type=float, default=PARITY_TOLERANCE,
+                        help="Largest allowed absolute difference from Keras.")
+    parser.add_argument("--compare", action="store_true", help="Also compare startup time and RSS.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    model_dir = Path(args.model_dir)
+    model_path = model_dir / "lstm_model.h5"
+    npz_path = model_dir / "lstm_model.npz"
+    tmp_path = model_dir / "lstm_model.tmp.npz"
+
+    model = load_model(model_path, custom_objects={'mse': MeanSquaredError()})
+    X_scaler = joblib.load(model_dir / "X_scaler.pkl")
+    y_scaler = joblib.load(model_dir / "y_scaler.pkl")
+    export_lstm_model(model, X_scaler, y_scaler, tmp_path)
+
+    # Check the file as the backend will load it before it replaces the previous export
+    runtime, X_params, _ = load_lstm_runtime(tmp_path)
+    error = check_parity(model, runtime, X_params)
+    logger.info(f"Max absolute difference vs Keras (scaled output): {error:.3e}")
+    if not error <= args.tolerance:
+        tmp_path.unlink()
+        logger.error(f"Parity check failed ({error:.3e} > {args.tolerance:.0e}); {npz_path} was not written.")
+        return 1
+    os.replace(tmp_path, npz_path)
+    logger.info(f"Wrote {npz_path}.")
+
+    if args.compare:
+        compare_startup(model_path, npz_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
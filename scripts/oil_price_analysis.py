@@ -4,8 +4,8 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import stats
-from statsmodels.tsa.stattools import grangercausalitytests
-from sklearn.preprocessing import StandardScaler
+from scripts.granger import batch_granger_causality, granger_table
+from scripts.rolling_stats import rolling_statistics
 
 try:
     import seaborn as sns
@@ -56,7 +56,7 @@ class OilPriceAnalyzer:
         logging.info(f"Data merged and cleaned for {indicator_name}.")
         return merged_data
     
-    def calculate_statistics(self, merged_data, indicator_name):
+    def calculate_statistics(self, merged_data, indicator_name, windows=(180,)):
         """Calculate statistical correlation between indicator and oil prices."""
         logging.info(f"Calculating statistics for {indicator_name}.")
         stats_dict = {}
@@ -70,10 +70,12 @@ class OilPriceAnalyzer:
         stats_dict['p_value'] = p_value
         stats_dict['r_squared'] = correlation ** 2
         
-        # Compute rolling correlation
-        merged_data['rolling_corr'] = merged_data[indicator_name].rolling(
-            window=180
-        ).corr(merged_data['Price'])
+        # Compute rolling correlation for every window in one pass ('rolling_corr' is the first, plotted one)
+        rolling = rolling_statistics(merged_data[indicator_name].to_numpy(), merged_data['Price'].to_numpy(), windows)
+        for i, window in enumerate(rolling.windows):
+            merged_data[f'rolling_corr_{window}'] = rolling.corr[i, :, 0]
+        merged_data['rolling_corr'] = rolling.corr[0, :, 0]
+        stats_dict['rolling_window'] = int(rolling.windows[0])
         
         logging.info(f"Correlation: {correlation:.3f}, P-value: {p_value:.3e}, R-squared: {stats_dict['r_squared']:.3f}")
         return stats_dict, merged_data
@@ -93,7 +95,7 @@ class OilPriceAnalyzer:
         
         # Rolling correlation plot
         merged_data['rolling_corr'].plot(ax=axes[0, 1])
-        axes[0, 1].set_title('6-Month Rolling Correlation')
+        axes[0, 1].set_title(f"{stats_dict.get('rolling_window', 180)}-Day Rolling Correlation")
         
         # Joint distribution plot
         axes[1, 0].hist2d(merged_data[indicator_name], merged_data['Price'], bins=50)
@@ -110,24 +112,19 @@ class OilPriceAnalyzer:
         logging.info(f"Visualization completed for {indicator_name}.")
     
     def analyze_granger_causality(self, merged_data, indicator_name, max_lag=12):
-        """Perform Granger Causality test to check causal relationship."""
+        """Perform Granger Causality tests in both directions for lags 1..max_lag."""
         logging.info(f"Performing Granger Causality test for {indicator_name}.")
         data = pd.DataFrame({
-            'indicator': merged_data[indicator_name],
-            'oil_price': merged_data['Price']
+            indicator_name: merged_data[indicator_name],
+            'Price': merged_data['Price']
         })
         
-        # Normalize data
-        scaler = StandardScaler()
-        data_scaled = pd.DataFrame(
-            scaler.fit_transform(data),
-            columns=data.columns,
-            index=data.index
-        )
-        
-        grangercausalitytests(data_scaled[['indicator', 'oil_price']], maxlag=max_lag, verbose=False)
-        grangercausalitytests(data_scaled[['oil_price', 'indicator']], maxlag=max_lag, verbose=False)
+        results = granger_table(batch_granger_causality(data, [indicator_name], max_lag=max_lag))
+        for direction, tests in results.groupby('Direction'):
+            best = tests.sort_values('P_Value').iloc[0]
+            logging.info(f"{direction}: lowest p-value {best['P_Value']:.3e} at lag {best['Lag']}")
         logging.info(f"Granger Causality analysis completed for {indicator_name}.")
+        return results
     
     def analyze_indicator(self, indicator_data, indicator_name, x_label):
         """Analyze the relationship between an indicator and oil prices."""
@@ -0,0 +1,155 @@
+import numpy as np
+from scipy.special import gammaln
+
+
+class OnlineChangePointDetector:
+    """
+    Bayesian online change point detection (Adams & MacKay) over price changes.
+
+    Each tick's price change is modelled as Gaussian with unknown mean and
+    variance (Normal-Gamma prior). The run-length posterior is truncated to
+    ``max_run_length`` entries, so every update costs a fixed O(max_run_length)
+    vectorized step no matter how many ticks have been seen, and the whole
+    state is a handful of small arrays.
+    """
+
+    def __init__(self, hazard=1 / 250, max_run_length=500, prior_mean=0.0, prior_var=1.0,
+                 prior_strength=1.0, recent_window=5, alert_threshold=0.5):
+        """
+        Initialize the detector.
+
+        Args:
+            hazard (float): Prior probability of a change at each tick (1 / expected regime length).
+            max_run_length (int): Number of run lengths kept in the posterior.
+            prior_mean (float): Prior mean of a price change.
+            prior_var (float): Prior variance of a price change.
+            prior_strength (float): Pseudo-observations behind the prior.
+            recent_window (int): A change within this many ticks counts as a new regime.
+            alert_threshold (float): Change probability above which ``alert`` is raised.
+        """
+        self.hazard = hazard
+        self.max_run_length = max_run_length
+        self.recent_window = recent_window
+        self.alert_threshold = alert_threshold
+        self.prior = np.array([prior_mean, prior_strength, prior_strength, prior_strength * prior_var])
+        self.reset()
+
+    def reset(self):
+        """Forget all ticks and return to the prior."""
+        mu0, kappa0, alpha0, beta0 = self.prior
+        self.log_probs = np.zeros(1)  # log P(run length = r)
+        self.mu = np.array([mu0])
+        self.kappa = np.array([kappa0])
+        self.alpha = np.array([alpha0])
+        self.beta = np.array([beta0])
+        self.last_price = None
+        self.n_ticks = 0
+
+    def _log_predictive(self, x):
+        """Student-t log predictive density of x under every run length."""
+        nu = 2 * self.alpha
+        scale2 = self.beta * (self.kappa + 1) / (self.alpha * self.kappa)
+        return (gammaln((nu + 1) / 2) - gammaln(nu / 2) - 0.5 * np.log(nu * np.pi * scale2)
+                - (nu + 1) / 2 * np.log1p((x - self.mu) ** 2 / (nu * scale2)))
+
+    def update(self, price):
+        """
+        Feed one new price.
+
+        Args:
+            price (float): The latest price.
+
+        Returns:
+            dict: The current regime summary (see ``summary``).
+
+        Raises:
+            ValueError: If the price is NaN or infinite, which would poison the posterior.
+        """
+        price = float(price)
+        if not np.isfinite(price):
+            raise ValueError(f"Price must be finite, got {price}")
+        if self.last_price is None:
+            self.last_price = price
+            return self.summary()
+        x = price - self.last_price
+        self.last_price = price
+        self.n_ticks += 1
+
+        log_pred = self.log_probs + self._log_predictive(x)
+        log_growth = log_pred + np.log1p(-self.hazard)
+        log_change = np.logaddexp.reduce(log_pred) + np.log(self.hazard)
+        log_probs = np.concatenate(([log_change], log_growth))
+
+        # Conjugate updates; run length 0 restarts from the prior
+        mu0, kappa0, alpha0, beta0 = self.prior
+        beta = self.beta + self.kappa * (x - self.mu) ** 2 / (2 * (self.kappa + 1))
+        mu = (self.kappa * self.mu + x) / (self.kappa + 1)
+        self.mu = np.concatenate(([mu0], mu))
+        self.kappa = np.concatenate(([kappa0], self.kappa + 1))
+        self.alpha = np.concatenate(([alpha0], self.alpha + 0.5))
+        self.beta = np.concatenate(([beta0], beta))
+
+        # Truncate the run-length posterior and renormalize
+        keep = self.max_run_length
+        log_probs = log_probs[:keep]
+        self.mu, self.kappa, self.alpha, self.beta = (self.mu[:keep], self.kappa[:keep],
+                                                      self.alpha[:keep], self.beta[:keep])
+        self.log_probs = log_probs - np.logaddexp.reduce(log_probs)
+        return self.summary()
+
+    def update_many(self, prices):
+        """
+        Feed a sequence of prices in order.
+
+        Returns:
+            dict: The regime summary after the last price.
+        """
+        prices = np.asarray(prices, dtype='float64')
+        if not np.isfinite(prices).all():
+            raise ValueError("Prices must be finite")  # Checked up front so a batch is applied whole or not at all
+        summary = self.summary()
+        for price in prices.tolist():
+            summary = self.update(price)
+        return summary
+
+    def summary(self):
+        """
+        Summarize the current regime.
+
+        Returns:
+            dict: change_probability (a new regime started within ``recent_window`` ticks),
+            run_length (most likely ticks since the last change), regime_mean and regime_std
+            (expected mean and std of price changes in the current regime), and alert.
+        """
+        probs = np.exp(self.log_probs)
+        change_probability = float(probs[:self.recent_window + 1].sum()) if self.n_ticks else 0.0
+        variance = self.beta / np.maximum(self.alpha - 1, 1e-9)
+        return {
+            "ticks": self.n_ticks,
+            "change_probability": change_probability,
+            "run_length": int(np.argmax(probs)),
+            "regime_mean": float(probs @ self.mu),
+            "regime_std": float(np.sqrt(probs @ variance)),
+            "alert": change_probability > self.alert_threshold,
+        }
+
+    def get_state(self):
+        """
+        Return the detector state as plain Python values (e.g. to persist between processes).
+        """
+        return {
+            "log_probs": self.log_probs.tolist(),
+            "mu": self.mu.tolist(),
+            "kappa": self.kappa.tolist(),
+            "alpha": self.alpha.tolist(),
+            "beta": self.beta.tolist(),
+            "last_price": self.last_price,
+            "n_ticks": self.n_ticks,
+        }
+
+    def set_state(self, state):
+        """Restore a state returned by ``get_state``."""
+        for name in ("log_probs", "mu", "kappa", "alpha", "beta"):
+            setattr(self, name, np.asarray(state[name], dtype='float64'))
+        self.last_price = state["last_price"]
+        self.n_ticks = state["n_ticks"]
@@ -0,0 +1,27 @@
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def scoped_environ(**values):
+    """
+    Set environment variables for the duration of a block.
+
+    Processes started inside the block (e.g. spawned pool workers) inherit the
+    values, which is how thread limits such as OMP_NUM_THREADS reach libraries
+    that read them once when they are loaded.
+
+    Parameters:
+    -----------
+    **values (str): Variable name -> value.
+    """
+    previous = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
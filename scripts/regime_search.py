@@ -0,0 +1,145 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.regime_switching.markov_autoregression import MarkovAutoregression
+
+from scripts.process_env import scoped_environ
+
+logger = logging.getLogger(__name__)
+
+SELECTION_CRITERIA = ('bic', 'aic', 'llf')
+COMPARISON_COLUMNS = ['k_regimes', 'order', 'switching_ar', 'switching_variance',
+                      'status', 'llf', 'aic', 'bic', 'seconds']
+
+
+class FitTimeout(Exception):
+    """Raised inside a fit that runs past its deadline."""
+
+
+def model_grid(k_regimes=(2, 3, 4), orders=(1, 2), switching_variance=(False, True), switching_ar=True):
+    """
+    Build the list of Markov-switching AR configurations to compare.
+
+    Returns:
+    --------
+    list: One dict of MarkovAutoregression keyword arguments per configuration.
+    """
+    return [{'k_regimes': k, 'order': p, 'switching_ar': switching_ar, 'switching_variance': v}
+            for k, p, v in product(k_regimes, orders, switching_variance)]
+
+
+def _init_search_worker(threads):
+    """
+    Limit the BLAS thread pool of a search worker so parallel fits don't oversubscribe cores.
+
+    numpy is already loaded when the initializer runs, so setting OMP_NUM_THREADS
+    here would come too late; the limit is applied to the loaded pools through
+    threadpoolctl when it is installed (the parent also starts the workers with
+    OMP_NUM_THREADS set).
+    """
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(threads)
+
+
+def _fit_variant(diff_data, config, timeout=None):
+    """
+    Fit one configuration in a worker process.
+
+    Only the scores and the parameter vector are sent back; the smoothed
+    probabilities are rebuilt for the winning model alone.
+    """
+    row = dict(config)
+    start = time.perf_counter()
+    deadline = start + timeout if timeout else None
+
+    def check_deadline(*args):
+        if deadline is not None and time.perf_counter() > deadline:
+            raise FitTimeout()
+
+    try:
+        results = MarkovAutoregression(diff_data, **config).fit(callback=check_deadline)
+        row.update(status='ok', llf=float(results.llf), aic=float(results.aic), bic=float(results.bic),
+                   params=np.asarray(results.params))
+    except FitTimeout:
+        row['status'] = 'timeout'
+    except Exception as e:
+        row['status'] = f'error: {e}'
+    row['seconds'] = time.perf_counter() - start
+    return row
+
+
+def search_markov_switching_models(diff_data, grid=None, criterion='bic', max_workers=None,
+                                   fit_timeout=30.0, budget_seconds=60.0):
+    """
+    Fit a grid of Markov-switching AR models in parallel and select the best one.
+
+    Each configuration is fitted in its own process. A fit that is still
+    optimizing after ``fit_timeout`` seconds is abandoned, and fits that have
+    not finished when ``budget_seconds`` runs out are reported as timed out.
+
+    Parameters:
+    -----------
+    diff_data (pd.Series): The differenced data (see analyzer.process_data).
+    grid (list): Configurations to fit (default: model_grid(), i.e. 2-4 regimes, AR(1)/AR(2),
+        with and without switching variance).
+    criterion (str): 'bic', 'aic' (lowest wins) or 'llf' (highest wins).
+    max_workers (int): Number of worker processes (default: one per configuration, up to the CPU count).
+    fit_timeout (float): Seconds allowed per fit.
+    budget_seconds (float): Seconds allowed for the whole search.
+
+    Returns:
+    --------
+    tuple: (comparison, best_results) where comparison is a DataFrame with one row per
+    configuration (status, llf, aic, bic, seconds) sorted by the criterion, and best_results
+    holds the smoothed fit of the winning configuration (None if no fit succeeded).
+    """
+    if criterion not in SELECTION_CRITERIA:
+        raise ValueError(f"Unsupported selection criterion: {criterion}")
+    grid = model_grid() if grid is None else grid
+    max_workers = max_workers or min(len(grid), os.cpu_count() or 1)
+    logger.info(f"Fitting {len(grid)} Markov-switching models in {max_workers} processes.")
+
+    rows = []
+    pending = set()
+    executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_search_worker, initargs=(1,))
+    # Workers are spawned on submit and inherit the environment BLAS reads when it is loaded
+    try:
+        with scoped_environ(OMP_NUM_THREADS="1"):
+            futures = {executor.submit(_fit_variant, diff_data, config, fit_timeout): config for config in grid}
+        done, pending = wait(futures, timeout=budget_seconds)
+        for future in done:
+            rows.append({**future.result(), 'config': futures[future]})
+        for future in pending:
+            future.cancel()
+            rows.append({**futures[future], 'status': 'timeout', 'seconds': None, 'config': futures[future]})
+    finally:
+        # Don't block on fits past the budget; their own deadline stops them shortly
+        executor.shutdown(wait=not pending, cancel_futures=True)
+
+    comparison = pd.DataFrame(rows).reindex(columns=COMPARISON_COLUMNS + ['params', 'config'])
+    comparison = comparison.sort_values(criterion, ascending=criterion != 'llf', na_position='last')
+    comparison = comparison.reset_index(drop=True)
+
+    best_results = None
+    if comparison['status'].eq('ok').any():
+        best = comparison.iloc[0]
+        config = best['config']
+        # One filtering pass with the winning parameters; no other model's probabilities are kept
+        best_results = MarkovAutoregression(diff_data, **config).smooth(best['params'])
+        logger.info(f"Best model by {criterion}: {config}")
+    else:
+        logger.error("No Markov-switching model converged within the time budget.")
+
+    comparison = comparison.drop(columns=['params', 'config'])
+    logger.info("Markov-switching model comparison: \n%s", comparison)
+    return comparison, best_results
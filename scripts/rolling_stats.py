@@ -0,0 +1,109 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Each statistic has shape (window, row, indicator); row t covers rows t - window + 1 .. t
+RollingStatistics = namedtuple('RollingStatistics', ['windows', 'mean_x', 'mean_y', 'std_x', 'std_y', 'cov', 'corr'])
+
+
+def compensated_cumsum(x):
+    """
+    Prefix sums along the first axis with their rounding errors tracked separately.
+
+    np.cumsum rounds once per addition; the exact error of every addition is
+    recovered afterwards with the TwoSum identity (all vectorized) and summed
+    into a correction array, so prefix + correction carries roughly twice the
+    working precision.
+
+    Parameters:
+    -----------
+    x (np.ndarray): Array of shape (N, ...).
+
+    Returns:
+    --------
+    tuple: (prefix, correction), each of shape (N + 1, ...) with a leading row of zeros.
+    """
+    x = np.asarray(x, dtype='float64')
+    prefix = np.zeros((len(x) + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, out=prefix[1:])
+    previous, total = prefix[:-1], prefix[1:]
+    added = total - previous
+    error = (previous - (total - added)) + (x - added)
+    correction = np.zeros_like(prefix)
+    np.cumsum(error, axis=0, out=correction[1:])
+    return prefix, correction
+
+
+def _window_sums(sums, window):
+    """Sum over the trailing window ending at every row from compensated prefix sums."""
+    prefix, correction = sums
+    end = np.arange(1, len(prefix))
+    start = np.maximum(end - window, 0)
+    return (prefix[end] - prefix[start]) + (correction[end] - correction[start])
+
+
+def rolling_statistics(x, y, windows=(180,), min_periods=None):
+    """
+    Rolling mean, standard deviation, covariance and correlation for several windows in one pass.
+
+    The prefix sums of x, y, x^2, y^2 and xy are built once (on data shifted by
+    its column means, to avoid cancellation) and every window is then two
+    subtractions per statistic, so the cost is O(N) per window regardless of
+    its length. Rows where either series is missing are left out of the sums.
+
+    Parameters:
+    -----------
+    x (np.ndarray): Indicators of shape (N,) or (N, m).
+    y (np.ndarray): Target series of shape (N,) (e.g. the price), or (N, m) to pair column by column.
+    windows (iterable): Window lengths in rows.
+    min_periods (int): Valid rows a window needs (default: the full window, as in pandas).
+
+    Returns:
+    --------
+    RollingStatistics: Arrays of shape (len(windows), N, m) (sample statistics, ddof=1),
+    NaN where a window has too few valid rows.
+    """
+    x = np.asarray(x, dtype='float64')
+    x = x[:, None] if x.ndim == 1 else x
+    y = np.asarray(y, dtype='float64')
+    y = np.broadcast_to(y[:, None] if y.ndim == 1 else y, x.shape)
+    windows = [int(w) for w in windows]
+    n_rows, n_cols = x.shape
+
+    valid = ~(np.isnan(x) | np.isnan(y))
+    with np.errstate(invalid='ignore'):
+        shift_x = np.nanmean(np.where(valid, x, np.nan), axis=0)
+        shift_y = np.nanmean(np.where(valid, y, np.nan), axis=0)
+    shift_x, shift_y = np.nan_to_num(shift_x), np.nan_to_num(shift_y)
+    dx = np.where(valid, x - shift_x, 0.0)
+    dy = np.where(valid, y - shift_y, 0.0)
+
+    counts = np.zeros((n_rows + 1, n_cols), dtype='int64')
+    np.cumsum(valid, axis=0, out=counts[1:])
+    sums = {name: compensated_cumsum(values) for name, values in
+            (('x', dx), ('y', dy), ('xx', dx * dx), ('yy', dy * dy), ('xy', dx * dy))}
+
+    shape = (len(windows), n_rows, n_cols)
+    out = {name: np.empty(shape) for name in RollingStatistics._fields[1:]}
+    for i, window in enumerate(windows):
+        end = np.arange(1, n_rows + 1)
+        n = (counts[end] - counts[np.maximum(end - window, 0)]).astype('float64')
+        sx, sy, sxx, syy, sxy = (_window_sums(sums[name], window) for name in ('x', 'y', 'xx', 'yy', 'xy'))
+        enough = n >= (window if min_periods is None else min_periods)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var_x = np.maximum(sxx - sx * sx / n, 0.0) / (n - 1)
+            var_y = np.maximum(syy - sy * sy / n, 0.0) / (n - 1)
+            cov = (sxy - sx * sy / n) / (n - 1)
+            corr = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+            corr[(var_x == 0) | (var_y == 0)] = np.nan
+            stats = {
+                'mean_x': shift_x + sx / n,
+                'mean_y': shift_y + sy / n,
+                'std_x': np.sqrt(var_x),
+                'std_y': np.sqrt(var_y),
+                'cov': cov,
+                'corr': corr,
+            }
+        for name, values in stats.items():
+            out[name][i] = np.where(enough, values, np.nan)
+    return RollingStatistics(windows, **out)
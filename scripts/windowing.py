@@ -0,0 +1,128 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Seed of the default window shuffle, so streaming runs are reproducible and shuffle like Model.fit(X, y)
+DEFAULT_SHUFFLE_SEED = 0
+
+
+def sliding_windows(data, time_step=60, horizon=1, target_col=0):
+    """
+    Build LSTM input windows and targets as zero-copy views of a series.
+
+    Window ``i`` covers rows ``i .. i + time_step - 1`` and its target is the
+    next ``horizon`` values of ``target_col`` (rows ``i + time_step .. i + time_step + horizon - 1``).
+
+    Parameters:
+    -----------
+    data (np.ndarray): Array of shape (N,) or (N, n_features).
+    time_step (int): Number of rows in each input window.
+    horizon (int): Number of future target values per window.
+    target_col (int): Column of ``data`` used as the target.
+
+    Returns:
+    --------
+    tuple: (X, y) read-only views with shapes (n_windows, time_step, n_features)
+    and (n_windows, horizon), where n_windows = N - time_step - horizon + 1.
+    """
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data[:, None]
+    n_windows = max(len(data) - time_step - horizon + 1, 0)
+    if n_windows == 0:
+        return (np.empty((0, time_step, data.shape[1]), dtype=data.dtype),
+                np.empty((0, horizon), dtype=data.dtype))
+
+    X = np.moveaxis(sliding_window_view(data, time_step, axis=0), -1, 1)[:n_windows]
+    y = sliding_window_view(data[time_step:, target_col], horizon)[:n_windows]
+    return X, y
+
+
+def iter_window_batches(data, time_step=60, batch_size=32, horizon=1, target_col=0, n_windows=None):
+    """
+    Lazily yield (X, y) batches of windows, materializing one batch at a time.
+
+    Parameters:
+    -----------
+    data (np.ndarray): Array of shape (N,) or (N, n_features).
+    time_step (int): Number of rows in each input window.
+    batch_size (int): Number of windows per batch.
+    horizon (int): Number of future target values per window.
+    target_col (int): Column of ``data`` used as the target.
+    n_windows (int): Only use the first ``n_windows`` windows (default: all).
+
+    Yields:
+    -------
+    tuple: Contiguous (X, y) arrays of at most ``batch_size`` windows.
+    """
+    X, y = sliding_windows(data, time_step, horizon, target_col)
+    if n_windows is not None:
+        X, y = X[:n_windows], y[:n_windows]
+    for start in range(0, len(X), batch_size):
+        yield np.ascontiguousarray(X[start:start + batch_size]), np.ascontiguousarray(y[start:start + batch_size])
+
+
+def make_window_dataset(data, time_step=60, batch_size=32, targets=None, horizon=1, target_col=0,
+                        shuffle_seed=DEFAULT_SHUFFLE_SEED, shuffle_buffer=10000, cache=None, prefetch=True):
+    """
+    Build a streaming tf.data pipeline that cuts windows from the series on the fly.
+
+    Only the series itself is held in memory; each window is sliced when its
+    batch is requested, and batches are prefetched while the model trains.
+
+    Parameters:
+    -----------
+    data (np.ndarray): Scaled series of shape (N,) or (N, n_features).
+    time_step (int): Number of rows in each input window.
+    batch_size (int): Number of windows per batch.
+    targets (np.ndarray): Optional target series aligned with ``data``. When given, window ``i``
+        is labelled with the ``horizon`` targets starting at its last row; otherwise with the
+        next ``horizon`` values of ``target_col``, as in ``sliding_windows``.
+    horizon (int): Number of target values per window.
+    target_col (int): Column of ``data`` used as the target when ``targets`` is None.
+    shuffle_seed (int): Seed of the window order shuffle, redrawn every epoch as Model.fit does for
+        in-memory arrays (None keeps the windows in time order). Each window keeps its internal
+        time order and only windows of this series are mixed, so shuffling a training split never
+        leaks later test data into it.
+    shuffle_buffer (int): Shuffle buffer size in windows when ``cache`` is set; otherwise the window
+        indices are shuffled in full before slicing.
+    cache (bool or str): Cache the sliced windows in memory (True) or in a file (path) after the
+        first epoch.
+    prefetch (bool): Prefetch batches in the background (AUTOTUNE).
+
+    Returns:
+    --------
+    tf.data.Dataset: Batches of (windows, targets) with shapes (batch, time_step, n_features)
+    and (batch, horizon).
+    """
+    import tensorflow as tf
+
+    data = np.asarray(data, dtype='float32')
+    if data.ndim == 1:
+        data = data[:, None]
+    if targets is None:
+        target_series = data[:, target_col]
+        target_start = time_step
+    else:
+        target_series = np.asarray(targets, dtype='float32').reshape(len(data), -1)[:, 0]
+        target_start = time_step - 1
+    n_windows = max(min(len(data) - target_start - horizon + 1, len(data) - time_step + 1), 0)
+
+    series = tf.constant(data)
+    target_series = tf.constant(target_series)
+
+    def make_window(i):
+        return series[i:i + time_step], target_series[i + target_start:i + target_start + horizon]
+
+    dataset = tf.data.Dataset.range(n_windows)
+    if shuffle_seed is not None and not cache:
+        # A full shuffle of the indices only buffers integers, not windows
+        dataset = dataset.shuffle(max(n_windows, 1), seed=shuffle_seed, reshuffle_each_iteration=True)
+    dataset = dataset.map(make_window, num_parallel_calls=tf.data.AUTOTUNE, deterministic=True)
+    if cache:
+        dataset = dataset.cache(cache if isinstance(cache, str) else "")
+        if shuffle_seed is not None:
+            dataset = dataset.shuffle(shuffle_buffer, seed=shuffle_seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+    if prefetch:
+        dataset = dataset.prefetch(tf.data.AUTOTUNE)
+    return dataset
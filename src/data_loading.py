@@ -5,6 +5,7 @@ import sys
 
 # Add the parent directory to the system path
 sys.path.append(os.path.join(os.path.abspath('../')))
+from src.storage import read_frame, resolve_path, DATA_FORMAT
 
 # Ensure the logs directory exists
 def create_directory_if_not_exists(directory_path):
@@ -54,14 +55,20 @@ def load_data(file_path, dataset_dir=_DATASET_DIR):
     """
     full_file_path = os.path.join(dataset_dir, file_path)
     
-    # Check if the file exists
-    if not os.path.exists(full_file_path):
+    # Check if the file (or its columnar copy) exists
+    if not os.path.exists(full_file_path) and not resolve_path(full_file_path, DATA_FORMAT).exists():
         logging.error(f"File not found: {full_file_path}")
         raise FileNotFoundError(f"File not found: {full_file_path}")
     
     try:
         logging.info(f"Attempting to load data from: {full_file_path}")
-        data = pd.read_csv(full_file_path)
+        if full_file_path.endswith('.csv'):
+            data = read_frame(full_file_path, index_col=None)
+        else:
+            data = pd.read_csv(full_file_path)
+        # The columnar copy stores dates as datetime64; parse the CSV's strings to match
+        if 'Date' in data.columns:
+            data['Date'] = pd.to_datetime(data['Date'])
         logging.info(f"Data successfully loaded from: {full_file_path}")
         return data
     except Exception as e:
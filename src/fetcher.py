@@ -1,24 +1,49 @@
+import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
-import wbdata
+from datetime import date, datetime
 from pathlib import Path
+from src.storage import target_path, write_frame
+
+try:
+    import wbdata
+except ImportError:
+    wbdata = None  # Only cached/offline fetches are possible
 
 class WorldBankDataFetcher:
     """
     A class to fetch and process economic indicator data from the World Bank.
     """
     
-    def __init__(self, start_date, end_date):
+    def __init__(self, start_date, end_date, cache_dir="data/raw_cache", offline=False,
+                 client=None, provisional_years=2, request_timeout=60, max_retries=3, backoff=1.0):
         """
         Initialize the fetcher with a date range.
         
         Args:
             start_date (str): Start date for data retrieval (YYYY-MM-DD format).
             end_date (str): End date for data retrieval (YYYY-MM-DD format).
+            cache_dir (str): Directory for cached raw indicator responses (None disables caching).
+            offline (bool): Serve only from the cache and never call the API.
+            client (object): Object providing ``get_dataframe`` like ``wbdata`` (default: ``wbdata``).
+            provisional_years (int): Number of most recent years treated as provisional and re-fetched.
+            request_timeout (float): Seconds to wait for one API request (None waits forever).
+            max_retries (int): Number of retries after a failed or timed-out request.
+            backoff (float): Initial retry delay in seconds; doubled after each retry.
         """
         self.start_date = start_date
         self.end_date = end_date
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.offline = offline
+        self.client = client if client is not None else wbdata
+        self.provisional_years = provisional_years
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.changed_indicators = set()  # Indicators whose data changed in this run
         self.setup_logging()
         
     def setup_logging(self):
@@ -39,31 +64,135 @@ class WorldBankDataFetcher:
         self.logger = logging.getLogger(__name__)
         self.logger.info("Logging initialized.")
     
+    def _cache_paths(self, indicator_code, country):
+        """
+        Return the (data, metadata) cache file paths for an indicator request.
+        """
+        key = f"{indicator_code}_{country}_{self.start_date}_{self.end_date}"
+        return self.cache_dir / f"{key}.csv", self.cache_dir / f"{key}.json"
+    
+    def _load_cache(self, indicator_code, indicator_name, country):
+        """
+        Load a cached raw response.
+        
+        Returns:
+            tuple: (pd.DataFrame indexed by 'date', set of provisional years), or (None, set()).
+        """
+        if self.cache_dir is None:
+            return None, set()
+        data_path, meta_path = self._cache_paths(indicator_code, country)
+        if not data_path.exists() or not meta_path.exists():
+            return None, set()
+        data = pd.read_csv(data_path, dtype={'date': str}).set_index('date')
+        data.columns = [indicator_name]
+        meta = json.loads(meta_path.read_text())
+        return data, set(meta.get('provisional_years', []))
+    
+    def _save_cache(self, indicator_code, country, data, provisional):
+        """
+        Save a raw response and the years still considered provisional.
+        """
+        if self.cache_dir is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data_path, meta_path = self._cache_paths(indicator_code, country)
+        data.to_csv(data_path, index_label='date')
+        meta_path.write_text(json.dumps({
+            'provisional_years': sorted(provisional),
+            'fetched_at': datetime.now().isoformat(timespec='seconds'),
+        }))
+    
+    def _years_to_fetch(self, cached, provisional):
+        """
+        Return the requested years that are missing from the cache or still provisional.
+        """
+        start_year = pd.to_datetime(self.start_date).year
+        end_year = pd.to_datetime(self.end_date).year
+        wanted = set(range(start_year, end_year + 1))
+        if cached is None:
+            return sorted(wanted)
+        final = {int(year) for year, value in cached.iloc[:, 0].items() if pd.notna(value)}
+        return sorted(wanted - (final - provisional))
+    
+    def _get_dataframe(self, *args, **kwargs):
+        """
+        Call the API client with a per-request timeout, retrying with exponential backoff.
+        """
+        for attempt in range(self.max_retries + 1):
+            executor = ThreadPoolExecutor(max_workers=1)
+            try:
+                future = executor.submit(self.client.get_dataframe, *args, **kwargs)
+                return future.result(timeout=self.request_timeout)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                self.logger.warning(f"Request failed ({type(e).__name__}: {e}); retrying in {delay:.1f}s...")
+                time.sleep(delay)
+            finally:
+                executor.shutdown(wait=False)  # Don't block on a timed-out request
+    
     def fetch_indicator_data(self, indicator_code, indicator_name, country='WLD'):
         """
         Fetch data for a specific economic indicator from the World Bank API.
         
+        Raw responses are cached on disk; only years that are missing from the
+        cache or still provisional are requested from the API.
+        
         Args:
             indicator_code (str): World Bank indicator code.
             indicator_name (str): Descriptive name for the indicator.
             country (str): Country code (default: 'WLD' for global data).
         
         Returns:
-            pd.DataFrame: Fetched and processed data.
+            pd.DataFrame: Fetched and processed data, or None if there is none (e.g. offline with no cache).
         """
         try:
-            self.logger.info(f"Fetching data for {indicator_name} ({indicator_code})...")
-            data = wbdata.get_dataframe(
+            cached, provisional = self._load_cache(indicator_code, indicator_name, country)
+            years = self._years_to_fetch(cached, provisional)
+            if not years:
+                self.logger.info(f"Using cached {indicator_name} data; nothing to refresh.")
+                return cached
+            if self.offline:
+                if cached is None:
+                    self.logger.warning(f"Offline mode: no cached {indicator_name} data; skipping it.")
+                else:
+                    self.logger.warning(f"Offline mode: serving cached {indicator_name} data without years {years}.")
+                return cached
+            
+            # Fetch only the span of years that needs refreshing
+            fetch_start = max(pd.to_datetime(self.start_date), pd.Timestamp(years[0], 1, 1))
+            fetch_end = min(pd.to_datetime(self.end_date), pd.Timestamp(years[-1], 12, 31))
+            self.logger.info(f"Fetching data for {indicator_name} ({indicator_code}) "
+                             f"for {fetch_start.year}-{fetch_end.year}...")
+            data = self._get_dataframe(
                 {indicator_code: indicator_name},
                 country=country,
-                date=(self.start_date, self.end_date))
+                date=(fetch_start.strftime('%Y-%m-%d'), fetch_end.strftime('%Y-%m-%d')))
             
             if data is not None and not data.empty:
                 self.logger.info(f"Successfully fetched {indicator_name} data.")
                 # Explicitly rename the column to the indicator name
                 data = data.rename(columns={indicator_name: indicator_name})
+                data.index = data.index.astype(str)
+                if cached is not None:
+                    merged = data.combine_first(cached)
+                    if merged.sort_index().equals(cached.sort_index()):
+                        data = cached
+                    else:
+                        data = merged.sort_index(ascending=False)
+                        self.changed_indicators.add(indicator_name)
+                else:
+                    self.changed_indicators.add(indicator_name)
+                
+                # Recent years and gaps may still be revised upstream
+                last_final_year = date.today().year - self.provisional_years
+                provisional = {int(year) for year, value in data.iloc[:, 0].items()
+                               if int(year) > last_final_year or pd.isna(value)}
+                self._save_cache(indicator_code, country, data, provisional)
             else:
                 self.logger.warning(f"No data found for {indicator_name} ({indicator_code}).")
+                data = cached
             
             return data
         except Exception as e:
@@ -112,24 +241,60 @@ class WorldBankDataFetcher:
     
     def save_data(self, df, indicator_name):
         """
-        Save processed data to a CSV file.
+        Save processed data in the configured storage format (see src.storage).
         
         Args:
             df (pd.DataFrame): Processed data.
             indicator_name (str): Indicator name.
         """
         try:
-            output_dir = Path("data")
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = output_dir / f"{indicator_name}_cleaned_data_daily.csv"
-            df.to_csv(output_path, index=False)
+            output_path = write_frame(df, Path("data") / f"{indicator_name}_cleaned_data_daily.csv")
             self.logger.info(f"Successfully saved {indicator_name} data to {output_path}.")
         except Exception as e:
             self.logger.error(f"Error saving {indicator_name} data: {str(e)}")
     
-def main():
+    def process_and_save(self, raw_data, indicator_name):
+        """
+        Process and save one indicator, skipping outputs whose upstream data has not changed.
+        
+        Args:
+            raw_data (pd.DataFrame): Raw fetched data.
+            indicator_name (str): Indicator name.
+        """
+        # The file save_data writes, i.e. the CSV when the columnar engine is not installed
+        output_path = target_path(Path("data") / f"{indicator_name}_cleaned_data_daily.csv")
+        if indicator_name not in self.changed_indicators and output_path.exists():
+            self.logger.info(f"{indicator_name} is unchanged; keeping {output_path}.")
+            return
+        
+        processed_data = self.process_data(raw_data, indicator_name)
+        
+        if not processed_data.empty:
+            self.save_data(processed_data, indicator_name)
+    
+    def fetch_all(self, indicators, max_workers=4):
+        """
+        Fetch indicators concurrently, processing and saving each one as soon as it arrives.
+        
+        Args:
+            indicators (dict): Indicator code -> {'name': ..., 'country': ...}.
+            max_workers (int): Maximum number of concurrent API requests.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.fetch_indicator_data, indicator_code, info['name'], info['country']): info
+                for indicator_code, info in indicators.items()
+            }
+            for future in as_completed(futures):
+                info = futures[future]
+                self.process_and_save(future.result(), info['name'])
+    
+def main(max_workers=4):
     """
     Main function to fetch, process, and save economic indicator data.
+    
+    Args:
+        max_workers (int): Maximum number of concurrent API requests.
     """
     indicators = {
         'NY.GDP.MKTP.CD': {'name': 'GDP', 'country': 'WLD'},
@@ -139,18 +304,7 @@ def main():
     }
     
     fetcher = WorldBankDataFetcher('1987-05-20', '2022-11-14')
-    
-    for indicator_code, info in indicators.items():
-        raw_data = fetcher.fetch_indicator_data(
-            indicator_code,
-            info['name'],
-            info['country']
-        )
-        
-        processed_data = fetcher.process_data(raw_data, info['name'])
-        
-        if not processed_data.empty:
-            fetcher.save_data(processed_data, info['name'])
+    fetcher.fetch_all(indicators, max_workers=max_workers)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,138 @@
+import argparse
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.storage import read_frame
+
+logger = logging.getLogger(__name__)
+
+# File layout: a 128-byte header, then n int64 epoch-day dates, then n float64 prices
+MAGIC = b'BRENTPX1'
+VERSION = 2
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('reserved', '<u4'),
+    ('n_rows', '<u8'),
+    ('dates_offset', '<u8'),
+    ('prices_offset', '<u8'),
+    ('digest', 'S64'),  # data_digest of the dates and prices, as hex
+    ('padding', 'V24'),
+])
+HEADER_SIZE = HEADER_DTYPE.itemsize  # 128 bytes
+
+
+def data_digest(dates, prices):
+    """
+    Return the SHA-256 hex digest of a date and a price column.
+
+    Args:
+        dates (np.ndarray): Dates as int64 (or datetime64, hashed by its integer value).
+        prices (np.ndarray): Prices.
+
+    Returns:
+        str: The digest; the store records it so readers need not rehash the data.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(np.asarray(dates).view('<i8')).tobytes())
+    digest.update(np.ascontiguousarray(prices, dtype='<f8').tobytes())
+    return digest.hexdigest()
+
+
+class PriceStore:
+    """
+    Read-only, memory-mapped view of a price store file.
+
+    The arrays are backed by the OS page cache, so every process that opens
+    the same file shares one copy of the data.
+    """
+
+    def __init__(self, path):
+        """
+        Open a price store.
+
+        Args:
+            path (str or Path): File written by build_price_store.
+        """
+        self.path = Path(path)
+        header = np.fromfile(self.path, dtype=HEADER_DTYPE, count=1)
+        if len(header) != 1 or header['magic'][0] != MAGIC:
+            raise ValueError(f"Not a price store file: {self.path}")
+        if header['version'][0] != VERSION:
+            raise ValueError(f"Unsupported price store version {header['version'][0]} in {self.path}")
+
+        n_rows = int(header['n_rows'][0])
+        self.digest = header['digest'][0].decode('ascii')
+        self.epoch_days = np.memmap(self.path, dtype='<i8', mode='r',
+                                    offset=int(header['dates_offset'][0]), shape=(n_rows,))
+        self.prices = np.memmap(self.path, dtype='<f8', mode='r',
+                                offset=int(header['prices_offset'][0]), shape=(n_rows,))
+
+    def __len__(self):
+        return len(self.prices)
+
+    @property
+    def dates(self):
+        """The dates as a zero-copy datetime64[D] view."""
+        return self.epoch_days.view('datetime64[D]')
+
+    def to_frame(self):
+        """
+        Return the prices as a DataFrame with a 'Date' DatetimeIndex.
+
+        The price column wraps the memory map without copying; only the
+        dates are converted to datetime64[ns].
+        """
+        index = pd.DatetimeIndex(self.dates.astype('datetime64[ns]'), name='Date')
+        return pd.DataFrame(self.prices[:, None], index=index, columns=['Price'], copy=False)
+
+
+def build_price_store(source_path, output_path):
+    """
+    Build a price store file from the Brent price data.
+
+    The file is written next to the target and renamed into place, so
+    processes that have the old file mapped keep a consistent view.
+
+    Args:
+        source_path (str or Path): BrentOilPrices data file (CSV or a columnar copy, see src.storage).
+        output_path (str or Path): Destination store file.
+
+    Returns:
+        Path: The written file.
+    """
+    data = read_frame(source_path).sort_index()
+    dates = data.index.values.astype('datetime64[D]').astype('<i8')
+    prices = data['Price'].to_numpy(dtype='<f8')
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header['magic'] = MAGIC
+    header['version'] = VERSION
+    header['n_rows'] = len(prices)
+    header['dates_offset'] = HEADER_SIZE
+    header['prices_offset'] = HEADER_SIZE + dates.nbytes
+    header['digest'] = data_digest(dates, prices).encode('ascii')
+
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(dates.tobytes())
+        f.write(prices.tobytes())
+    os.replace(tmp_path, output_path)
+    logger.info(f"Built price store with {len(prices)} rows at {output_path}.")
+    return output_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the memory-mapped Brent price store.")
+    parser.add_argument("source", nargs="?", default="data/BrentOilPrices.csv")
+    parser.add_argument("output", nargs="?", default="data/BrentOilPrices.bin")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    build_price_store(args.source, args.output)
@@ -0,0 +1,149 @@
+import argparse
+import importlib.util
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Storage format for the cleaned data files: 'parquet', 'feather' or 'csv'
+DATA_FORMAT = os.environ.get("BRENT_DATA_FORMAT", "parquet")
+
+_EXTENSIONS = {'parquet': '.parquet', 'feather': '.feather', 'csv': '.csv'}
+_ENGINES = {'parquet': ('pyarrow', 'fastparquet'), 'feather': ('pyarrow',), 'csv': ()}
+
+
+def format_available(fmt):
+    """
+    Check whether a storage format can be used in this environment.
+
+    Args:
+        fmt (str): 'parquet', 'feather' or 'csv'.
+
+    Returns:
+        bool: True if the format's engine is installed.
+    """
+    if fmt not in _EXTENSIONS:
+        raise ValueError(f"Unsupported data format: {fmt}")
+    engines = _ENGINES[fmt]
+    return not engines or any(importlib.util.find_spec(engine) for engine in engines)
+
+
+def resolve_path(path, fmt):
+    """
+    Return the path of a data file in the given format, e.g. data/GDP.csv -> data/GDP.parquet.
+    """
+    path = Path(path)
+    if path.suffix in _EXTENSIONS.values():
+        return path.with_suffix(_EXTENSIONS[fmt])
+    return path.with_name(path.name + _EXTENSIONS[fmt])
+
+
+def target_path(path, fmt=None):
+    """
+    Return the file write_frame produces for a path: the selected format's, or the CSV when its engine is missing.
+    """
+    fmt = fmt or DATA_FORMAT
+    return resolve_path(path, fmt if format_available(fmt) else 'csv')
+
+
+def write_frame(df, path, fmt=None, index_col='Date'):
+    """
+    Write a DataFrame in the selected format, falling back to CSV if its engine is missing.
+
+    Args:
+        df (pd.DataFrame): Data to write; a named index is stored as a column.
+        path (str or Path): Target path (the extension is replaced to match the format).
+        fmt (str): 'parquet', 'feather' or 'csv' (default: DATA_FORMAT).
+        index_col (str): Date column converted to datetime64 before writing.
+
+    Returns:
+        Path: The file that was written.
+    """
+    fmt = fmt or DATA_FORMAT
+    if not format_available(fmt):
+        logger.warning(f"No engine available for {fmt}; writing CSV instead.")
+        fmt = 'csv'
+
+    frame = df.reset_index() if df.index.name is not None else df
+    output_path = resolve_path(path, fmt)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if fmt == 'csv':
+        frame.to_csv(output_path, index=False)
+    else:
+        if index_col in frame.columns and not pd.api.types.is_datetime64_any_dtype(frame[index_col]):
+            frame = frame.assign(**{index_col: pd.to_datetime(frame[index_col])})
+        frame = frame.reset_index(drop=True)
+        if fmt == 'parquet':
+            frame.to_parquet(output_path, index=False)
+        else:
+            frame.to_feather(output_path)
+    return output_path
+
+
+def read_frame(path, fmt=None, index_col='Date'):
+    """
+    Read a data file in the selected format, falling back to the CSV version
+    when the columnar copy is missing, older than the CSV, or unreadable here.
+
+    Args:
+        path (str or Path): Path of the data file (any supported extension).
+        fmt (str): Preferred format (default: DATA_FORMAT).
+        index_col (str or None): Date column to parse and use as the index; None keeps it as a column.
+
+    Returns:
+        pd.DataFrame: The loaded data.
+    """
+    fmt = fmt or DATA_FORMAT
+    columnar_path = resolve_path(path, fmt)
+    csv_path = resolve_path(path, 'csv')
+    # A CSV written after the columnar copy (e.g. a manual update) takes precedence
+    columnar_fresh = columnar_path.exists() and (
+        not csv_path.exists() or columnar_path.stat().st_mtime >= csv_path.stat().st_mtime)
+    if fmt != 'csv' and columnar_fresh and format_available(fmt):
+        frame = pd.read_parquet(columnar_path) if fmt == 'parquet' else pd.read_feather(columnar_path)
+    else:
+        if not csv_path.exists():
+            raise FileNotFoundError(f"File not found: {csv_path}")
+        frame = pd.read_csv(csv_path)
+        if index_col is not None and index_col in frame.columns:
+            frame[index_col] = pd.to_datetime(frame[index_col])
+
+    if index_col is not None and index_col in frame.columns:
+        frame = frame.set_index(index_col)
+    return frame
+
+
+def convert_data_dir(data_dir="data", fmt=None):
+    """
+    Write a columnar copy of every CSV file in a directory.
+
+    Args:
+        data_dir (str or Path): Directory containing the CSV files.
+        fmt (str): Target format (default: DATA_FORMAT).
+
+    Returns:
+        list: The files that were written.
+    """
+    fmt = fmt or DATA_FORMAT
+    written = []
+    for csv_path in sorted(Path(data_dir).glob("*.csv")):
+        frame = read_frame(csv_path, fmt='csv', index_col=None)
+        if 'Date' in frame.columns:
+            frame['Date'] = pd.to_datetime(frame['Date'])
+        output_path = write_frame(frame, csv_path, fmt)
+        logger.info(f"Converted {csv_path} -> {output_path}")
+        written.append(output_path)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the CSV files in data/ to a columnar format.")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--format", default=DATA_FORMAT, choices=sorted(_EXTENSIONS))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    convert_data_dir(args.data_dir, args.format)
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from scripts.event_impact import compute_event_impacts, event_changes_wide
+
+EVENTS = {
+    '2000-01-05': 'Before the data',
+    '2000-03-18': 'Weekend event',
+    '2000-06-01': 'Middle',
+    '2001-02-20': 'After the data',
+}
+HORIZONS = (30, 90, 45)
+
+
+def make_prices(seed=0):
+    """Business-day prices with a few missing days, like the Brent dataset."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2000-01-03', '2000-12-29')
+    index = index.delete(rng.choice(len(index), size=20, replace=False))
+    return pd.DataFrame({'Price': 25 + np.cumsum(rng.normal(size=len(index)))}, index=index)
+
+
+def loop_changes(df, events, horizons):
+    """The per-horizon boolean-mask lookups compute_event_impacts replaced."""
+    rows = []
+    for date_str, event_name in events.items():
+        event_date = pd.to_datetime(date_str)
+        row = {"Event": event_name, "Date": date_str}
+        for days in horizons:
+            try:
+                nearest_before = df.index[df.index <= event_date - timedelta(days=days)][-1]
+                nearest_after = df.index[df.index >= event_date + timedelta(days=days)][0]
+                price_before = df.loc[nearest_before, 'Price']
+                price_after = df.loc[nearest_after, 'Price']
+                change = ((price_after - price_before) / price_before) * 100
+            except (IndexError, KeyError):
+                change = np.nan
+            row[days] = change
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def test_matches_per_horizon_loop():
+    df = make_prices()
+    expected = loop_changes(df, EVENTS, HORIZONS)
+    actual = event_changes_wide(compute_event_impacts(df, EVENTS, HORIZONS))
+
+    assert list(actual['Event']) == list(expected['Event'])
+    assert list(actual.columns[2:]) == ['Change_1M', 'Change_3M', 'Change_45D']
+    for column, days in zip(actual.columns[2:], HORIZONS):
+        np.testing.assert_allclose(actual[column].to_numpy(dtype='float64'), expected[days].to_numpy(dtype='float64'),
+                                   rtol=1e-12, equal_nan=True, err_msg=column)
+
+
+def test_unsorted_index_matches_sorted():
+    df = make_prices(seed=1)
+    shuffled = df.sample(frac=1.0, random_state=0)
+
+    sorted_changes = compute_event_impacts(df, EVENTS, HORIZONS)['Change']
+    shuffled_changes = compute_event_impacts(shuffled, EVENTS, HORIZONS)['Change']
+
+    np.testing.assert_allclose(shuffled_changes, sorted_changes, equal_nan=True)
+
+
+def test_zero_price_before_is_nan():
+    df = make_prices()
+    df.loc[df.index <= pd.Timestamp('2000-05-02'), 'Price'] = 0.0
+
+    impacts = compute_event_impacts(df, {'2000-06-01': 'Middle'}, (30,))
+
+    assert impacts['Price_Before'].iloc[0] == 0.0
+    assert np.isnan(impacts['Change'].iloc[0])
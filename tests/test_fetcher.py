@@ -0,0 +1,102 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.fetcher import WorldBankDataFetcher
+
+START_DATE, END_DATE = '2015-01-01', '2020-12-31'
+
+
+class FakeClient:
+    """Stands in for wbdata: yearly values indexed by year strings, newest first."""
+
+    def __init__(self, values, delays=()):
+        self.values = dict(values)
+        self.delays = list(delays)  # Seconds to stall on each call, for timeout tests
+        self.calls = []
+
+    def get_dataframe(self, indicators, country, date):
+        self.calls.append(date)
+        if self.delays:
+            time.sleep(self.delays.pop(0))
+        (name,) = indicators.values()
+        first, last = int(date[0][:4]), int(date[1][:4])
+        years = [year for year in sorted(self.values, reverse=True) if first <= year <= last]
+        return pd.DataFrame({name: [self.values[year] for year in years]},
+                            index=pd.Index([str(year) for year in years], name='date'))
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # The fetcher writes logs/fetcher.log
+
+
+def make_fetcher(tmp_path, client, **kwargs):
+    kwargs.setdefault('provisional_years', 0)
+    return WorldBankDataFetcher(START_DATE, END_DATE, cache_dir=tmp_path / "cache", client=client,
+                                backoff=0.0, **kwargs)
+
+
+def test_cache_hit_skips_the_api(tmp_path):
+    values = {year: float(year) for year in range(2015, 2021)}
+    first = make_fetcher(tmp_path, FakeClient(values))
+    fetched = first.fetch_indicator_data('NY.GDP.MKTP.CD', 'GDP')
+    assert first.changed_indicators == {'GDP'}
+
+    client = FakeClient(values)
+    second = make_fetcher(tmp_path, client)
+    cached = second.fetch_indicator_data('NY.GDP.MKTP.CD', 'GDP')
+
+    assert client.calls == []
+    assert second.changed_indicators == set()
+    np.testing.assert_allclose(cached['GDP'].sort_index(), fetched['GDP'].sort_index())
+
+
+def test_provisional_year_is_refetched(tmp_path):
+    values = {year: float(year) for year in range(2015, 2020)}
+    values[2020] = np.nan  # Not published yet
+    make_fetcher(tmp_path, FakeClient(values)).fetch_indicator_data('NY.GDP.MKTP.CD', 'GDP')
+
+    values[2020] = 2020.0
+    client = FakeClient(values)
+    fetcher = make_fetcher(tmp_path, client)
+    data = fetcher.fetch_indicator_data('NY.GDP.MKTP.CD', 'GDP')
+
+    assert client.calls == [('2020-01-01', '2020-12-31')]
+    assert fetcher.changed_indicators == {'GDP'}
+    assert data.loc['2020', 'GDP'] == 2020.0
+    assert data.loc['2015', 'GDP'] == 2015.0
+
+
+def test_offline_serves_cache_and_never_calls_the_api(tmp_path):
+    values = {year: float(year) for year in range(2015, 2020)}
+    values[2020] = np.nan
+    make_fetcher(tmp_path, FakeClient(values)).fetch_indicator_data('NY.GDP.MKTP.CD', 'GDP')
+
+    client = FakeClient(values)
+    fetcher = make_fetcher(tmp_path, client, offline=True)
+
+    assert fetcher.fetch_indicator_data('NY.GDP.MKTP.CD', 'GDP').loc['2019', 'GDP'] == 2019.0
+    assert fetcher.fetch_indicator_data('FP.CPI.TOTL.ZG', 'CPI') is None  # Nothing cached
+    assert client.calls == []
+
+
+def test_timed_out_request_is_retried(tmp_path):
+    values = {year: float(year) for year in range(2015, 2021)}
+    client = FakeClient(values, delays=[1.0])
+    fetcher = make_fetcher(tmp_path, client, request_timeout=0.1, max_retries=2)
+
+    data = fetcher.fetch_indicator_data('NY.GDP.MKTP.CD', 'GDP')
+
+    assert len(client.calls) == 2
+    assert data.loc['2020', 'GDP'] == 2020.0
+
+
+def test_gives_up_after_max_retries(tmp_path):
+    client = FakeClient({2020: 1.0}, delays=[1.0, 1.0])
+    fetcher = make_fetcher(tmp_path, client, request_timeout=0.1, max_retries=1)
+
+    assert fetcher.fetch_indicator_data('NY.GDP.MKTP.CD', 'GDP') is None
+    assert len(client.calls) == 2
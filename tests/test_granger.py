@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa import stattools
+
+from scripts.granger import DIRECTIONS, batch_granger_causality
+
+MAX_LAG = 6
+
+
+def make_data(n_rows=400, seed=0):
+    """A price driven by lagged GDP, a CPI driven by the lagged price, and an unrelated indicator with gaps."""
+    rng = np.random.default_rng(seed)
+    gdp = np.cumsum(rng.normal(size=n_rows))
+    price = np.zeros(n_rows)
+    cpi = np.zeros(n_rows)
+    for t in range(2, n_rows):
+        price[t] = 0.5 * price[t - 1] + 0.4 * gdp[t - 2] + rng.normal()
+        cpi[t] = 0.3 * cpi[t - 1] + 0.6 * price[t - 1] + rng.normal()
+    noise = rng.normal(size=n_rows)
+    noise[150:170] = np.nan  # A different set of valid rows than the other indicators
+    index = pd.date_range('2000-01-01', periods=n_rows, freq='D')
+    return pd.DataFrame({'Price': price, 'GDP': gdp, 'CPI': cpi, 'Noise': noise}, index=index)
+
+
+def statsmodels_ftest(data, caused, causing, lag, skip=0):
+    """The ssr F-test of statsmodels' grangercausalitytests for one lag order."""
+    frame = data[[caused, causing]].dropna().iloc[skip:]
+    tests = stattools.grangercausalitytests(frame, maxlag=[lag], verbose=False)[lag][0]
+    f_stat, p_value, df_resid, _ = tests['ssr_ftest']
+    return f_stat, p_value, df_resid
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+def test_matches_statsmodels_at_max_lag():
+    data = make_data()
+    results = batch_granger_causality(data, max_lag=MAX_LAG)
+
+    for i, indicator in enumerate(results.indicators):
+        for direction, (caused, causing) in enumerate([('Price', indicator), (indicator, 'Price')]):
+            expected_f, expected_p, expected_df = statsmodels_ftest(data, caused, causing, MAX_LAG)
+            assert results.f_stat[i, -1, direction] == pytest.approx(expected_f, rel=1e-6)
+            assert results.p_value[i, -1, direction] == pytest.approx(expected_p, rel=1e-6, abs=1e-12)
+            assert results.df_resid[i, -1] == expected_df
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+def test_lower_lags_match_statsmodels_on_the_common_sample():
+    # Every lag order is estimated on rows MAX_LAG onwards; statsmodels does the same for lag p
+    # once the first MAX_LAG - p rows are dropped
+    data = make_data(seed=1)
+    results = batch_granger_causality(data, indicators=['GDP', 'CPI'], max_lag=MAX_LAG)
+
+    for i, indicator in enumerate(results.indicators):
+        for lag in range(1, MAX_LAG + 1):
+            for direction, (caused, causing) in enumerate([('Price', indicator), (indicator, 'Price')]):
+                expected_f, expected_p, _ = statsmodels_ftest(data, caused, causing, lag, skip=MAX_LAG - lag)
+                assert results.f_stat[i, lag - 1, direction] == pytest.approx(expected_f, rel=1e-6)
+                assert results.p_value[i, lag - 1, direction] == pytest.approx(expected_p, rel=1e-6, abs=1e-12)
+
+
+def test_detects_the_simulated_directions():
+    results = batch_granger_causality(make_data(), max_lag=MAX_LAG)
+    p_value = dict(zip(results.indicators, results.p_value[:, -1, :]))
+
+    assert DIRECTIONS[0] == 'indicator->price'
+    assert p_value['GDP'][0] < 1e-3
+    assert p_value['CPI'][1] < 1e-3
+
+
+def test_parallel_blocks_match_serial():
+    data = make_data()
+    serial = batch_granger_causality(data, max_lag=MAX_LAG, chunk_size=1)
+    parallel = batch_granger_causality(data, max_lag=MAX_LAG, chunk_size=1, n_jobs=2)
+
+    np.testing.assert_allclose(parallel.f_stat, serial.f_stat)
+    np.testing.assert_allclose(parallel.p_value, serial.p_value)
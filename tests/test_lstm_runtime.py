@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from scripts.lstm_runtime import PARITY_TOLERANCE, NumpyLSTM, export_lstm_model, load_lstm_runtime
+
+
+def build_model(n_features, steps, stacked=False, activation='relu'):
+    """A small model shaped like the dashboard's (AdaptingModel) or the sequence model's (analyzer)."""
+    tf.keras.utils.set_random_seed(0)
+    layers = [tf.keras.Input(shape=(steps, n_features))]
+    if stacked:
+        layers.append(tf.keras.layers.LSTM(8, return_sequences=True))
+    layers += [tf.keras.layers.LSTM(8, activation=activation), tf.keras.layers.Dense(1)]
+    return tf.keras.Sequential(layers)
+
+
+@pytest.mark.parametrize("n_features, steps, stacked, activation", [
+    (10, 1, False, 'relu'),  # AdaptingModel.PricePredictor
+    (1, 20, True, 'tanh'),   # analyzer.build_lstm_model
+])
+def test_numpy_lstm_matches_keras(n_features, steps, stacked, activation):
+    model = build_model(n_features, steps, stacked, activation)
+    x = np.random.default_rng(0).uniform(0.0, 1.0, size=(64, steps, n_features))
+
+    expected = model.predict(x, verbose=0)
+    actual = NumpyLSTM.from_keras(model).predict_on_batch(x)
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=PARITY_TOLERANCE)
+
+
+def test_run_in_pieces_matches_predict():
+    model = build_model(1, 20, stacked=True, activation='tanh')
+    runtime = NumpyLSTM.from_keras(model)
+    x = np.random.default_rng(1).uniform(0.0, 1.0, size=(8, 20, 1))
+
+    _, states = runtime.run(x[:, :15])
+    out, _ = runtime.run(x[:, 15:], states)
+
+    np.testing.assert_allclose(out, runtime.predict_on_batch(x), rtol=0, atol=1e-12)
+
+
+def test_exported_runtime_matches_keras(tmp_path):
+    from sklearn.preprocessing import MinMaxScaler
+
+    rng = np.random.default_rng(2)
+    X_scaler = MinMaxScaler().fit(rng.normal(size=(100, 10)))
+    y_scaler = MinMaxScaler().fit(rng.normal(size=(100, 1)))
+    model = build_model(10, 1)
+    export_lstm_model(model, X_scaler, y_scaler, tmp_path / "lstm_model.npz")
+
+    runtime, X_params, y_params = load_lstm_runtime(tmp_path / "lstm_model.npz")
+    X = rng.normal(size=(32, 10))
+    x = X_scaler.transform(X)[:, None, :]
+
+    np.testing.assert_allclose(X_params.transform(X), X_scaler.transform(X))
+    np.testing.assert_allclose(runtime.predict_on_batch(x), model.predict(x, verbose=0), rtol=0, atol=PARITY_TOLERANCE)
+    y = model.predict(x, verbose=0)
+    np.testing.assert_allclose(y_params.inverse_transform(y), y_scaler.inverse_transform(y))
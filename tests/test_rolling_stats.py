@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.rolling_stats import compensated_cumsum, rolling_statistics
+
+WINDOWS = (7, 30, 180, 365)
+
+
+def pandas_statistics(x, y, window, min_periods=None):
+    """The same statistics from pandas' rolling windows."""
+    x, y = pd.Series(x), pd.Series(y)
+    x_rolling = x.rolling(window, min_periods=min_periods)
+    y_rolling = y.rolling(window, min_periods=min_periods)
+    return {
+        'mean_x': x_rolling.mean(),
+        'mean_y': y_rolling.mean(),
+        'std_x': x_rolling.std(),
+        'std_y': y_rolling.std(),
+        'cov': x_rolling.cov(y),
+        'corr': x_rolling.corr(y),
+    }
+
+
+def assert_matches_pandas(x, y, windows, names, min_periods=None, rtol=1e-8, atol=1e-10):
+    result = rolling_statistics(x, y, windows, min_periods)
+    for i, window in enumerate(windows):
+        expected = pandas_statistics(x, y, window, min_periods)
+        for name in names:
+            np.testing.assert_allclose(getattr(result, name)[i, :, 0], expected[name].to_numpy(),
+                                       rtol=rtol, atol=atol, err_msg=f"{name}, window {window}")
+
+
+def test_matches_pandas():
+    rng = np.random.default_rng(0)
+    y = 60 + np.cumsum(rng.normal(size=2000))
+    x = 0.3 * y + rng.normal(size=2000)
+    assert_matches_pandas(x, y, WINDOWS, ['mean_x', 'mean_y', 'std_x', 'std_y', 'cov', 'corr'])
+
+
+def test_correlation_with_nan_gaps_matches_pandas():
+    # Windows touching a missing value in either series are NaN, as in pandas with the default min_periods
+    rng = np.random.default_rng(1)
+    y = 60 + np.cumsum(rng.normal(size=3000))
+    x = np.cumsum(rng.normal(size=3000)) - 0.5 * y
+    x[500:540] = np.nan
+    y[1200] = np.nan
+    x[2990:] = np.nan
+    assert_matches_pandas(x, y, WINDOWS, ['cov', 'corr'])
+
+
+def test_min_periods_with_shared_gaps_matches_pandas():
+    rng = np.random.default_rng(2)
+    y = 60 + np.cumsum(rng.normal(size=1500))
+    x = 2.0 * y + rng.normal(scale=5.0, size=1500)
+    gaps = np.zeros(1500, dtype=bool)
+    gaps[[10, 11, 12, 400, 1000]] = True
+    gaps[700:760] = True
+    x[gaps] = np.nan
+    y[gaps] = np.nan
+    assert_matches_pandas(x, y, (30, 90, 180), ['mean_x', 'mean_y', 'std_x', 'std_y', 'cov', 'corr'],
+                          min_periods=20)
+
+
+def test_long_offset_series_matches_pandas():
+    # A level far from the global mean and long prefix sums: the case the compensated sums are for
+    rng = np.random.default_rng(3)
+    n_rows = 1_000_000
+    level = 1e6 + 1e4 * np.sin(np.arange(n_rows) / 20000.0)
+    y = level + np.cumsum(rng.normal(size=n_rows)) * 0.01
+    x = 0.5 * level + rng.normal(size=n_rows)
+    assert_matches_pandas(x, y, (30, 180, 365), ['mean_x', 'mean_y', 'std_x', 'std_y', 'corr'],
+                          rtol=1e-6, atol=1e-8)
+
+
+def test_several_indicators_at_once():
+    rng = np.random.default_rng(4)
+    y = 60 + np.cumsum(rng.normal(size=800))
+    x = np.column_stack([y + rng.normal(size=800), -y + rng.normal(scale=3.0, size=800), rng.normal(size=800)])
+    result = rolling_statistics(x, y, (30, 180))
+    for j in range(x.shape[1]):
+        single = rolling_statistics(x[:, j], y, (30, 180))
+        np.testing.assert_allclose(result.corr[:, :, j], single.corr[:, :, 0], rtol=1e-12, equal_nan=True)
+
+
+def test_compensated_cumsum_recovers_lost_digits():
+    x = np.array([1e16, 1.0, 1.0, -1e16, 1.0])
+    prefix, correction = compensated_cumsum(x)
+    assert prefix[-1] + correction[-1] == pytest.approx(3.0)